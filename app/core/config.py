@@ -11,11 +11,115 @@ class Settings(BaseSettings):
     # You can override this with a PostgreSQL URL via the DATABASE_URL env var.
     database_url: str = "sqlite:///./app.db"
 
+    # Engine profile: "auto" picks "sqlite" or "postgres" from the URL;
+    # "default" uses SQLAlchemy's stock settings.
+    db_profile: str = "auto"
+    # sqlite profile pragmas, applied to every new connection.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    # Connection pool (sqlite and postgres profiles). Sync routes hold a
+    # threadpool thread (40 by default) while waiting for a connection, so
+    # size + overflow below that can deadlock under load.
+    db_pool_size: int = 10
+    db_max_overflow: int = 30
+    db_pool_timeout_seconds: int = 30
+    # postgres profile only.
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    db_statement_timeout_ms: int = 30_000
+    # Serve videos/courses/progress from async routers on an AsyncSession
+    # (aiosqlite / asyncpg, derived from DATABASE_URL).
+    db_async: bool = False
+    # Run create_all when a worker starts. Turn off where workers should not
+    # issue DDL and run `python -m app.db.migrations` on deploy instead.
+    db_create_schema_on_startup: bool = True
+
     jwt_secret: str = "dev-secret-key"
     jwt_algorithm: str = "HS256"
     jwt_exp_minutes: int = 60 * 24
 
+    # bcrypt cost factor; stored hashes with a different cost are re-hashed on login.
+    bcrypt_rounds: int = 12
+    # Hashing runs in a process pool; requests beyond workers + queue get a 503.
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 32
+
+    # Verified tokens and their users are cached per worker for this long.
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_entries: int = 10_000
+
     openai_api_key: str | None = None
+    # Point the OpenAI client at a compatible server, e.g. a local stub.
+    openai_base_url: str | None = None
+
+    # Limits for async AI calls: concurrent upstream requests, per-attempt
+    # deadline, retries (with jittered backoff) and the circuit breaker.
+    ai_max_concurrency: int = 8
+    ai_call_timeout_seconds: float = 10.0
+    ai_max_attempts: int = 3
+    ai_retry_base_seconds: float = 0.25
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_reset_seconds: float = 30.0
+
+    # Generated summaries/quizzes are cached in memory and in ai_cache_entries.
+    ai_cache_memory_entries: int = 1024
+    ai_cache_ttl_seconds: int = 7 * 24 * 3600
+    ai_cache_max_rows: int = 100_000
+
+    # How often each worker reloads its in-memory recommendation index so it
+    # picks up uploads and counter changes made by other workers (0 disables).
+    recommendation_index_refresh_seconds: int = 300
+    # Per-user recommendations from videos completed together. Scoring reads
+    # at most max_history of the user's latest completions and max_neighbors
+    # per video, so its cost doesn't grow with the progress table. The model
+    # is rebuilt in the background every refresh_seconds, or sooner once
+    # max_pending completions have been applied incrementally.
+    recommendation_cf_max_history: int = 50
+    recommendation_cf_max_neighbors: int = 100
+    recommendation_cf_refresh_seconds: int = 900
+    recommendation_cf_max_pending: int = 50_000
+    # Content similarity for GET /videos/{id}/similar: hashed TF-IDF vectors
+    # of title, description and tags in a memory-mapped file shared by the
+    # workers on a host (default app/storage/similarity). A missing index is
+    # built in the background at startup; rebuild it offline with
+    # `python -m app.services.similarity`.
+    similarity_index_dir: str | None = None
+    similarity_dimensions: int = 512
+
+    # View/like counters are buffered in memory and written in batches.
+    counter_flush_interval_seconds: float = 1.0
+    counter_flush_max_pending: int = 1000
+    # Videos whose running totals each worker keeps to answer increments
+    # without a read; least recently counted ones are dropped beyond this.
+    counter_known_max_entries: int = 100_000
+
+    # Flushed view/like counts are also added to per-video activity buckets
+    # of this many seconds; every refresh_seconds one worker folds the new
+    # activity into the decayed scores behind GET /videos/trending (0 turns
+    # the background refresh off).
+    trending_bucket_seconds: int = 3600
+    trending_refresh_seconds: float = 60.0
+
+    # Serialized bodies for GET /videos/{id}, /courses/{id} and
+    # /courses/user/{id}, kept per worker. Writes on any worker invalidate
+    # them everywhere through the response_cache_invalidations table.
+    response_cache_max_entries: int = 10_000
+    response_cache_ttl_seconds: int = 30
+
+    # Fraction of requests whose latency, response size and SQL are recorded
+    # for /metrics (0 turns request instrumentation off). A request running
+    # one statement this many times is counted as a likely N+1.
+    metrics_sample_rate: float = 1.0
+    metrics_repeated_query_threshold: int = 10
+
+    max_upload_bytes: int = 200 * 1024 * 1024
+
+    # Keep per-(user, course) completed/total rows up to date on progress
+    # writes so course dashboards don't aggregate raw progress.
+    maintain_course_progress_summaries: bool = True
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+from app.core.metrics import COUNT_BUCKETS, SIZE_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+UNMATCHED = "<unmatched>"
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled.", ("method",))
+RESPONSE_BYTES = registry.histogram(
+    "http_response_size_bytes", "Size of HTTP response bodies.", ("method", "route"), buckets=SIZE_BUCKETS
+)
+REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), buckets=COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route")
+)
+QUERY_SECONDS = registry.histogram("db_query_duration_seconds", "Execution time of SQL statements run by HTTP requests.")
+N_PLUS_ONE = registry.counter(
+    "http_request_repeated_queries_total",
+    "Requests that ran one SQL statement at least METRICS_REPEATED_QUERY_THRESHOLD times (likely N+1).",
+    ("method", "route"),
+)
+OPENAI_SECONDS = registry.histogram(
+    "openai_request_duration_seconds", "Latency of OpenAI API calls.", ("operation", "outcome")
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: StatementCounter = field(default_factory=StatementCounter)
+
+
+# Set for the duration of a sampled request; the threadpool running sync
+# handlers inherits it, so statements are attributed to the right request.
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+_warned: set[tuple[str, str]] = set()
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or getattr(route, "path_format", None) or UNMATCHED
+
+
+# Pure ASGI middleware (BaseHTTPMiddleware would buffer streamed responses).
+# Every request is counted in flight, but only a METRICS_SAMPLE_RATE fraction
+# is timed and has its SQL attributed; the rest pass straight through.
+class MetricsMiddleware:
+    def __init__(self, app, sample_rate: float | None = None) -> None:
+        self.app = app
+        self.sample_rate = settings.metrics_sample_rate if sample_rate is None else sample_rate
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or self.sample_rate <= 0:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        if random.random() >= self.sample_rate:
+            REQUESTS_IN_FLIGHT.inc(method)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                REQUESTS_IN_FLIGHT.dec(method)
+            return
+
+        status = [500]
+        size = [0]
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                size[0] += len(message.get("body", b""))
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        REQUESTS_IN_FLIGHT.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec(method)
+            current_request.reset(token)
+            route = route_template(scope)
+            REQUEST_SECONDS.observe(elapsed, method, route, str(status[0]))
+            RESPONSE_BYTES.observe(size[0], method, route)
+            REQUEST_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+            _check_repeated(method, route, stats)
+
+
+def _check_repeated(method: str, route: str, stats: RequestStats) -> None:
+    if not stats.statements:
+        return
+    statement, count = stats.statements.most_common(1)[0]
+    if count < settings.metrics_repeated_query_threshold:
+        return
+    N_PLUS_ONE.inc(method, route)
+    # Warn once per route and statement; the counter keeps the rate.
+    if (route, statement) not in _warned:
+        _warned.add((route, statement))
+        logger.warning("%s %s ran the same statement %d times (N+1?): %s", method, route, count, statement[:200])
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_request.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current_request.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    stats.statements[statement] += 1
+    QUERY_SECONDS.observe(elapsed)
+
+
+def _discard_query_start(context) -> None:
+    # A failed statement never reaches after_cursor_execute.
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if current_request.get() is not None and started:
+        started.pop()
+
+
+def install_sql_hooks() -> None:
+    # Listening on the Engine class covers every engine, including the sync
+    # engine behind the async one.
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _discard_query_start)
+
+
+@contextmanager
+def openai_timer(operation: str):
+    outcome = "error"
+    started = time.perf_counter()
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OPENAI_SECONDS.observe(time.perf_counter() - started, operation, outcome)
@@ -1,3 +1,7 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
@@ -6,8 +10,20 @@ from passlib.context import CryptContext
 
 from app.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
+# Pinning min/max to the configured cost makes verify_and_update() hand back a
+# fresh hash whenever a stored one was made with a different cost.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+
+class PasswordHasherBusy(Exception):
+    pass
 
 
 def hash_password(password: str) -> str:
@@ -18,6 +34,61 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+# bcrypt is CPU-bound, so request handlers hand it to a small process pool
+# instead of burning their own worker's GIL. Submissions beyond the pool size
+# plus a short queue are refused so a login storm fails fast instead of
+# piling up behind the hasher.
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.password_hash_workers + settings.password_hash_queue_size)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # The pool starts on the first login, by which point the counter,
+            # trending and similarity threads are running; forking a
+            # multi-threaded process can copy a held lock into the child, so
+            # the hashers are spawned fresh instead.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+async def _run_in_pool(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> tuple[bool, str | None]:
+    return await _run_in_pool(verify_and_update_password, password, hashed)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.jwt_exp_minutes))
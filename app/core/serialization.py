@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def serialize(adapter: TypeAdapter, value: Any) -> bytes:
+    # One validation pass reading ORM attributes, then pydantic-core writes the
+    # JSON bytes directly, skipping FastAPI's dump-to-dicts and json.dumps.
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def json_response(adapter: TypeAdapter, value: Any, status_code: int = 200) -> Response:
+    # FastAPI passes Response objects through untouched, so the route's
+    # response_model is left to document the schema and is not re-validated.
+    return Response(serialize(adapter, value), status_code=status_code, media_type="application/json")
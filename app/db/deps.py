@@ -1,34 +1,119 @@
+import time
+import uuid
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import get_settings
 from app.core.security import decode_token
-from app.db.session import SessionLocal
 from app.db import models
+from app.db import session as db_session
 
 security = HTTPBearer(auto_error=False)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: uuid.UUID
+    name: str
+    email: str
+    role: str
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(id=user.id, name=user.name, email=user.email, role=user.role)
+
+
+# Verified tokens (signature -> user id) and the users they resolve to, so warm
+# requests skip both JWT verification and the users lookup.
+token_cache: TTLCache[str, str] = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+principal_cache: TTLCache[str, Principal] = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+
+
+def invalidate_user(user_id: uuid.UUID | str) -> None:
+    principal_cache.pop(str(user_id))
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: models.User) -> None:
+    invalidate_user(target.id)
 
 
 def get_db():
-    db = SessionLocal()
+    db = db_session.SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: Session = Depends(get_db),
-) -> models.User:
+async def get_async_db():
+    if db_session.AsyncSessionLocal is None:
+        raise RuntimeError("Async database access is disabled; set DB_ASYNC=true")
+    async with db_session.AsyncSessionLocal() as db:
+        yield db
+
+
+def _token_user_id(credentials: HTTPAuthorizationCredentials | None) -> str:
     if not credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    token = credentials.credentials
+    signature = token.rsplit(".", 1)[-1]
+    user_id = token_cache.get(signature)
+    if user_id is None:
+        try:
+            payload = decode_token(token)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        user_id = payload.get("sub")
+        if not user_id:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        # Never keep a token cached past its own expiry.
+        expires_in = payload.get("exp", 0) - time.time()
+        token_cache.set(signature, user_id, ttl=min(settings.auth_cache_ttl_seconds, expires_in))
+    return user_id
+
+
+def _user_statement(user_id: str):
     try:
-        payload = decode_token(credentials.credentials)
+        return select(models.User).where(models.User.id == uuid.UUID(user_id))
     except ValueError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
 
-    user = db.query(models.User).filter(models.User.id == payload.get("sub")).first()
+def _cache_principal(user_id: str, user: models.User | None) -> Principal:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: Session = Depends(get_db),
+) -> Principal:
+    user_id = _token_user_id(credentials)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal(user_id, db.scalars(_user_statement(user_id)).first())
+    return principal
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    user_id = _token_user_id(credentials)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal(user_id, (await db.scalars(_user_statement(user_id))).first())
+    return principal
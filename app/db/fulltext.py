@@ -0,0 +1,58 @@
+from sqlalchemy import DDL, Table, event
+
+# Full-text index over videos.title/description/transcript. SQLite gets an
+# external-content FTS5 table kept in sync by triggers; Postgres gets a
+# generated, weighted tsvector column with a GIN index. Neither is mapped on
+# the model, so they're created here right after the videos table.
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+        title, description, transcript,
+        content='videos', content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS videos_fts_ai AFTER INSERT ON videos BEGIN
+        INSERT INTO videos_fts(rowid, title, description, transcript)
+        VALUES (new.rowid, new.title, new.description, new.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS videos_fts_ad AFTER DELETE ON videos BEGIN
+        INSERT INTO videos_fts(videos_fts, rowid, title, description, transcript)
+        VALUES ('delete', old.rowid, old.title, old.description, old.transcript);
+    END
+    """,
+    # Only text changes touch the index; counter updates don't.
+    """
+    CREATE TRIGGER IF NOT EXISTS videos_fts_au AFTER UPDATE OF title, description, transcript ON videos BEGIN
+        INSERT INTO videos_fts(videos_fts, rowid, title, description, transcript)
+        VALUES ('delete', old.rowid, old.title, old.description, old.transcript);
+        INSERT INTO videos_fts(rowid, title, description, transcript)
+        VALUES (new.rowid, new.title, new.description, new.transcript);
+    END
+    """,
+]
+
+SQLITE_REBUILD = "INSERT INTO videos_fts(videos_fts) VALUES ('rebuild')"
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE videos ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(transcript, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_videos_search_vector ON videos USING GIN (search_vector)",
+]
+
+DIALECT_DDL = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}
+
+
+def register(table: Table) -> None:
+    for dialect, statements in DIALECT_DDL.items():
+        for statement in statements:
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect=dialect))
@@ -0,0 +1,209 @@
+"""Schema creation plus one-off migrations that ``create_all`` can't express.
+
+Creates any missing tables, then runs the backfills. Deployments that turn off
+DB_CREATE_SCHEMA_ON_STARTUP run this before starting workers.
+
+    python -m app.db.migrations [--drop-array]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, func, inspect, insert, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db import fulltext, models
+from app.db.session import Base, engine as default_engine
+from app.services.progress import refresh_course_summaries
+from app.services.tags import normalize_tags
+
+logger = logging.getLogger(__name__)
+
+
+def create_schema(engine: Engine) -> None:
+    # Creates missing tables, indexes and the full-text index; existing tables
+    # are left as they are.
+    Base.metadata.create_all(bind=engine)
+
+
+def _release_legacy_column(conn, table: str, column: str, drop: bool) -> None:
+    # The models no longer write the legacy arrays, so a NOT NULL left on one
+    # fails every INSERT. SQLite can't change a column's constraints, so the
+    # column is dropped there either way.
+    if drop or conn.dialect.name == "sqlite":
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+    else:
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL"))
+
+
+def migrate_course_videos(engine: Engine, drop_array: bool = False) -> int:
+    # Backfill course_videos from the legacy micro_courses.video_ids array,
+    # keeping array order as position. Entries that don't parse or point at a
+    # missing video are dropped, since the new table enforces the foreign key.
+    Base.metadata.create_all(bind=engine, tables=[models.CourseVideo.__table__])
+    columns = {column["name"] for column in inspect(engine).get_columns("micro_courses")}
+    if "video_ids" not in columns:
+        return 0
+
+    migrated = 0
+    with engine.begin() as conn:
+        done = set(conn.execute(select(models.CourseVideo.course_id).distinct()).scalars())
+        known = set(conn.execute(select(models.Video.id)).scalars())
+        for course_id, video_ids in conn.execute(text("SELECT id, video_ids FROM micro_courses")):
+            course_id = course_id if isinstance(course_id, uuid.UUID) else uuid.UUID(str(course_id))
+            if course_id in done or not video_ids:
+                continue
+            rows, seen = [], set()
+            for raw in video_ids:
+                try:
+                    video_id = uuid.UUID(str(raw))
+                except ValueError:
+                    video_id = None
+                if video_id not in known:
+                    logger.warning("Course %s references unknown video %r; skipping", course_id, raw)
+                    continue
+                if video_id in seen:
+                    continue
+                seen.add(video_id)
+                rows.append({"course_id": course_id, "video_id": video_id, "position": len(rows)})
+            if rows:
+                conn.execute(insert(models.CourseVideo), rows)
+                migrated += 1
+        _release_legacy_column(conn, "micro_courses", "video_ids", drop_array)
+
+    # Totals now count only videos that exist, so rebuild the summaries.
+    with Session(engine) as db:
+        refresh_course_summaries(db)
+        db.commit()
+    return migrated
+
+
+def migrate_video_tags(engine: Engine, drop_array: bool = False) -> int:
+    # Backfill tags/video_tags from the legacy videos.tags array, normalizing
+    # names and computing tags.video_count in the same pass.
+    Base.metadata.create_all(bind=engine, tables=[models.Tag.__table__, models.VideoTag.__table__])
+    columns = {column["name"] for column in inspect(engine).get_columns("videos")}
+    if "tags" not in columns:
+        return 0
+
+    migrated = 0
+    with engine.begin() as conn:
+        done = set(conn.execute(select(models.VideoTag.video_id).distinct()).scalars())
+        tag_ids = dict(conn.execute(select(models.Tag.name, models.Tag.id)).all())
+        added: dict[uuid.UUID, int] = {}
+        for video_id, tags in conn.execute(text("SELECT id, tags FROM videos")):
+            video_id = video_id if isinstance(video_id, uuid.UUID) else uuid.UUID(str(video_id))
+            names = normalize_tags(tags or [])
+            if video_id in done or not names:
+                continue
+            rows = []
+            for position, name in enumerate(names):
+                if name not in tag_ids:
+                    tag_ids[name] = uuid.uuid4()
+                    conn.execute(insert(models.Tag), [{"id": tag_ids[name], "name": name, "video_count": 0}])
+                rows.append({"video_id": video_id, "tag_id": tag_ids[name], "position": position})
+                added[tag_ids[name]] = added.get(tag_ids[name], 0) + 1
+            conn.execute(insert(models.VideoTag), rows)
+            migrated += 1
+
+        table = models.Tag.__table__
+        for tag_id, count in added.items():
+            conn.execute(update(table).where(table.c.id == tag_id).values(video_count=table.c.video_count + count))
+        _release_legacy_column(conn, "videos", "tags", drop_array)
+    return migrated
+
+
+def migrate_video_search(engine: Engine) -> None:
+    # Adds videos.transcript and the full-text index to a database created
+    # before they existed, then indexes the rows already there.
+    columns = {column["name"] for column in inspect(engine).get_columns("videos")}
+    statements = fulltext.DIALECT_DDL.get(engine.dialect.name, [])
+    with engine.begin() as conn:
+        if "transcript" not in columns:
+            conn.execute(text("ALTER TABLE videos ADD COLUMN transcript TEXT"))
+        for statement in statements:
+            conn.execute(text(statement))
+        if engine.dialect.name == "sqlite":
+            conn.execute(text(fulltext.SQLITE_REBUILD))
+
+
+def migrate_feed_indexes(engine: Engine) -> None:
+    # The (created_at, id) indexes behind the keyset-paginated feed were added
+    # to the model after the videos table existed, and create_all doesn't add
+    # indexes to existing tables.
+    with engine.begin() as conn:
+        for index in models.Video.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def migrate_progress_history_index(engine: Engine) -> None:
+    # ix_progress_user_history came after the progress table; see
+    # migrate_feed_indexes.
+    index = next(index for index in models.Progress.__table__.indexes if index.name == "ix_progress_user_history")
+    with engine.begin() as conn:
+        index.create(conn, checkfirst=True)
+
+
+def migrate_progress_unique(engine: Engine) -> int:
+    # The progress upsert needs ux_progress_user_video, which create_all
+    # doesn't add to an existing table. Older rows may repeat a (user, video)
+    # pair, so collapse each pair to its completed (then newest) row first.
+    index = next(index for index in models.Progress.__table__.indexes if index.name == "ux_progress_user_video")
+    if index.name in {existing["name"] for existing in inspect(engine).get_indexes("progress")}:
+        return 0
+
+    table = models.Progress.__table__
+    removed = 0
+    with engine.begin() as conn:
+        pairs = conn.execute(
+            select(table.c.user_id, table.c.video_id).group_by(table.c.user_id, table.c.video_id).having(func.count() > 1)
+        ).all()
+        for user_id, video_id in pairs:
+            rows = conn.execute(
+                select(table.c.id, table.c.completed, table.c.updated_at).where(
+                    table.c.user_id == user_id, table.c.video_id == video_id
+                )
+            ).all()
+            keep = max(rows, key=lambda row: (bool(row.completed), row.updated_at or datetime.min))
+            stale = [row.id for row in rows if row.id != keep.id]
+            conn.execute(delete(table).where(table.c.id.in_(stale)))
+            removed += len(stale)
+        index.create(conn)
+
+    if removed:
+        # Duplicates were counted more than once in the course summaries.
+        with Session(engine) as db:
+            refresh_course_summaries(db)
+            db.commit()
+    return removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--drop-array", action="store_true", help="drop the legacy array columns once backfilled instead of making them nullable"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    create_schema(default_engine)
+    print("Schema is up to date.")
+    migrated = migrate_course_videos(default_engine, drop_array=args.drop_array)
+    print(f"Backfilled course_videos for {migrated} course(s).")
+    migrated = migrate_video_tags(default_engine, drop_array=args.drop_array)
+    print(f"Backfilled video_tags for {migrated} video(s).")
+    migrate_video_search(default_engine)
+    print("Full-text search index is in place.")
+    migrate_feed_indexes(default_engine)
+    print("Feed indexes are in place.")
+    removed = migrate_progress_unique(default_engine)
+    print(f"Removed {removed} duplicate progress row(s); ux_progress_user_video is in place.")
+    migrate_progress_history_index(default_engine)
+    print("Progress history index is in place.")
+
+
+if __name__ == "__main__":
+    main()
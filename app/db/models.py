@@ -1,10 +1,11 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ARRAY, Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from app.db import fulltext
 from app.db.session import Base
 
 
@@ -28,18 +29,90 @@ class User(Base, TimestampMixin):
 
 class Video(Base, TimestampMixin):
     __tablename__ = "videos"
+    __table_args__ = (
+        # Keyset pagination for the feed walks (created_at, id) in descending order.
+        Index("ix_videos_created_at_id", "created_at", "id"),
+        Index("ix_videos_skill_level_created_at_id", "skill_level", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     creator_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    tags = Column(ARRAY(String), nullable=False, default=list)
+    transcript = Column(Text, nullable=True)
     skill_level = Column(String(50), nullable=False)
     video_url = Column(String(500), nullable=False)
     views = Column(Integer, default=0)
     likes = Column(Integer, default=0)
 
     creator = relationship("User", back_populates="videos")
+    video_tags = relationship(
+        "VideoTag",
+        order_by="VideoTag.position",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+
+    @property
+    def tags(self) -> list[str]:
+        return [entry.tag.name for entry in self.video_tags]
+
+
+fulltext.register(Video.__table__)
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Always stored lower-cased and stripped; see app.services.tags.normalize_tags.
+    name = Column(String(64), unique=True, nullable=False)
+    # Number of videos carrying the tag, kept up to date on write.
+    video_count = Column(Integer, nullable=False, default=0, index=True)
+
+
+class VideoTag(Base):
+    __tablename__ = "video_tags"
+    __table_args__ = (Index("ix_video_tags_tag_id_video_id", "tag_id", "video_id"),)
+
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(UUID(as_uuid=True), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, nullable=False)
+
+    tag = relationship("Tag", lazy="joined")
+
+
+class VideoActivityBucket(Base):
+    __tablename__ = "video_activity_buckets"
+
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    # UTC start of the bucket, truncated to TRENDING_BUCKET_SECONDS.
+    bucket_start = Column(DateTime, primary_key=True, index=True)
+    views = Column(Integer, nullable=False, default=0)
+    likes = Column(Integer, nullable=False, default=0)
+    # How much of views/likes is already folded into video_trending_scores.
+    scored_views = Column(Integer, nullable=False, default=0)
+    scored_likes = Column(Integer, nullable=False, default=0)
+
+
+class VideoTrendingScore(Base):
+    __tablename__ = "video_trending_scores"
+    __table_args__ = (Index("ix_video_trending_scores_period_score", "period", "score", "video_id"),)
+
+    # Trending window name, e.g. "day"; see app.services.trending.WINDOWS.
+    period = Column(String(16), primary_key=True)
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    # Forward-decayed relative to trending_state.epoch, so rows never need
+    # rewriting just because time passed.
+    score = Column(Float, nullable=False)
+
+
+class TrendingState(Base):
+    __tablename__ = "trending_state"
+
+    id = Column(Integer, primary_key=True)
+    epoch = Column(DateTime, nullable=False)
+    refreshed_at = Column(DateTime, nullable=True)
 
 
 class MicroCourse(Base, TimestampMixin):
@@ -49,14 +122,47 @@ class MicroCourse(Base, TimestampMixin):
     creator_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    video_ids = Column(ARRAY(String), default=list)
     learners_enrolled = Column(Integer, default=0)
 
     creator = relationship("User", back_populates="courses")
+    course_videos = relationship(
+        "CourseVideo",
+        order_by="CourseVideo.position",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+
+    @property
+    def video_ids(self) -> list[str]:
+        return [str(entry.video_id) for entry in self.course_videos]
+
+    @property
+    def videos(self) -> list["Video"]:
+        return [entry.video for entry in self.course_videos]
+
+
+class CourseVideo(Base):
+    __tablename__ = "course_videos"
+    __table_args__ = (
+        Index("ux_course_videos_course_position", "course_id", "position", unique=True),
+        # Reverse lookup: which courses contain a video (progress summaries).
+        Index("ix_course_videos_video_id", "video_id"),
+    )
+
+    course_id = Column(UUID(as_uuid=True), ForeignKey("micro_courses.id", ondelete="CASCADE"), primary_key=True)
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, nullable=False)
+
+    video = relationship("Video")
 
 
 class Progress(Base):
     __tablename__ = "progress"
+    __table_args__ = (
+        Index("ux_progress_user_video", "user_id", "video_id", unique=True),
+        # A user's latest completions, for personal recommendations.
+        Index("ix_progress_user_history", "user_id", "completed", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -64,3 +170,39 @@ class Progress(Base):
     video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id"), nullable=False)
     completed = Column(Boolean, default=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CourseProgressSummary(Base):
+    __tablename__ = "course_progress_summaries"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    course_id = Column(UUID(as_uuid=True), ForeignKey("micro_courses.id"), primary_key=True)
+    completed = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class AICacheEntry(Base):
+    __tablename__ = "ai_cache_entries"
+
+    key = Column(String(64), primary_key=True)
+    kind = Column(String(20), nullable=False)
+    payload = Column(Text, nullable=False)
+    upstream_ms = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ResponseCacheInvalidation(Base):
+    # Append-only log shared by every worker's response cache: a cached body
+    # is stale once any of its tags has a row with a larger id than the one
+    # it was stored at. AUTOINCREMENT keeps SQLite from reusing pruned ids.
+    __tablename__ = "response_cache_invalidations"
+    __table_args__ = (
+        Index("ix_response_cache_invalidations_tag_id", "tag", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    tag = Column(String(128), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
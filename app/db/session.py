@@ -1,19 +1,123 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
 
-# Use a slightly different engine configuration for SQLite so it
-# works cleanly in a local single-process dev setup.
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(
-        settings.database_url, future=True, connect_args={"check_same_thread": False}
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    # sqlite:///app.db -> sqlite+aiosqlite:///app.db, postgresql+psycopg2://... -> postgresql+asyncpg://...
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _pool_args(url: str, settings: Settings) -> dict:
+    # In-memory SQLite uses a single shared connection, not a sized pool.
+    if url.startswith("sqlite") and make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+
+
+def _sqlite_engine(url: str, settings: Settings, factory=create_engine):
+    # check_same_thread is off because connections are handed between
+    # threadpool threads; the pool still gives each one to a single thread.
+    pool_args = _pool_args(url, settings)
+    if pool_args and factory is create_async_engine:
+        # aiosqlite defaults to NullPool, i.e. a new connection (and pragma
+        # round) per session.
+        pool_args["poolclass"] = AsyncAdaptedQueuePool
+    engine = factory(
+        url,
+        future=True,
+        connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+        **pool_args,
     )
-else:
-    engine = create_engine(settings.database_url, future=True)
+
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def set_pragmas(dbapi_connection, _record):
+        # WAL lets readers run alongside the single writer, and with
+        # synchronous=NORMAL a commit no longer fsyncs the main database.
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        # Negative cache_size is in KiB rather than pages.
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+        cursor.close()
+
+    return engine
+
+
+def _postgres_engine(url: str, settings: Settings, factory=create_engine):
+    timeout = str(int(settings.db_statement_timeout_ms))
+    if factory is create_async_engine:
+        connect_args = {"server_settings": {"statement_timeout": timeout}}
+    else:
+        connect_args = {"options": f"-c statement_timeout={timeout}"}
+    return factory(
+        url,
+        future=True,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        connect_args=connect_args,
+        **_pool_args(url, settings),
+    )
+
+
+def _default_engine(url: str, settings: Settings, factory=create_engine):
+    if url.startswith("sqlite"):
+        return factory(url, future=True, connect_args={"check_same_thread": False})
+    return factory(url, future=True)
+
+
+ENGINE_PROFILES = {
+    "sqlite": _sqlite_engine,
+    "postgres": _postgres_engine,
+    "default": _default_engine,
+}
+
+
+def _profile_builder(url: str, profile: str):
+    if profile == "auto":
+        profile = "sqlite" if url.startswith("sqlite") else "postgres"
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}; expected one of auto, {', '.join(ENGINE_PROFILES)}")
+    return ENGINE_PROFILES[profile]
+
+
+def create_engine_for(url: str, profile: str = "auto", settings: Settings = settings) -> Engine:
+    return _profile_builder(url, profile)(url, settings)
+
+
+def create_async_engine_for(url: str, profile: str = "auto", settings: Settings = settings) -> AsyncEngine:
+    url = async_url(url)
+    return _profile_builder(url, profile)(url, settings, factory=create_async_engine)
+
+
+engine = create_engine_for(settings.database_url, settings.db_profile)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# The async engine only exists when DB_ASYNC is on, so aiosqlite/asyncpg are
+# only needed by deployments that use it.
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker | None = None
+if settings.db_async:
+    async_engine = create_async_engine_for(settings.database_url, settings.db_profile)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
@@ -0,0 +1,15 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# INSERT ... ON CONFLICT is dialect-specific in SQLAlchemy.
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(db: Session):
+    insert = DIALECT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        raise NotImplementedError(f"Upserts are not supported on {db.get_bind().dialect.name}")
+    return insert
@@ -1,18 +1,50 @@
-import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import get_settings
-from app.db.session import Base, engine
-from app.routers import ai, auth, courses, progress, videos
+from app.core.instrumentation import MetricsMiddleware, install_sql_hooks
+from app.core.metrics import registry
+from app.core.security import shutdown_password_pool
+from app.db import session as db_session
+from app.db.migrations import create_schema
+from app.db.session import engine
+from app.routers import ai, auth
+from app.services.counters import counter_buffer
+from app.services.metrics import register_collectors
+from app.services.similarity import similarity_index
+from app.services.storage import STORAGE_ROOT
+from app.services.trending import trending_scorer
 
 settings = get_settings()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup happens here rather than at import, so importing the app
+    # (tests, tooling, the startup benchmark) never touches the database.
+    if settings.db_create_schema_on_startup:
+        create_schema(engine)
+    counter_buffer.start()
+    trending_scorer.start()
+    # Builds in a background thread if no worker has published the index yet.
+    similarity_index.ensure_built()
+    try:
+        yield
+    finally:
+        trending_scorer.stop()
+        # Write out any buffered view/like counts before the worker exits.
+        counter_buffer.stop()
+        shutdown_password_pool()
+        if db_session.async_engine is not None:
+            await db_session.async_engine.dispose()
+
+
+# Routes without a precompiled adapter still get orjson instead of json.dumps.
+app = FastAPI(title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,18 +53,35 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.metrics_sample_rate > 0:
+    app.add_middleware(MetricsMiddleware)
+    install_sql_hooks()
+register_collectors()
 
-static_videos_path = os.path.join(os.path.dirname(__file__), "storage", "videos")
-os.makedirs(static_videos_path, exist_ok=True)
-app.mount("/static/videos", StaticFiles(directory=static_videos_path), name="videos")
+app.mount("/static/videos", StaticFiles(directory=STORAGE_ROOT), name="videos")
 
 app.include_router(auth.router)
-app.include_router(videos.router)
-app.include_router(courses.router)
-app.include_router(progress.router)
+# Only the router set in use is imported.
+if settings.db_async:
+    from app.routers import courses_async, progress_async, videos_async
+
+    app.include_router(videos_async.router)
+    app.include_router(courses_async.router)
+    app.include_router(progress_async.router)
+else:
+    from app.routers import courses, progress, videos
+
+    app.include_router(videos.router)
+    app.include_router(courses.router)
+    app.include_router(progress.router)
 app.include_router(ai.router)
 
 
 @app.get("/")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
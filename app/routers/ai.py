@@ -1,26 +1,51 @@
+import asyncio
+
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.db.deps import get_db
 from app.schemas import ai as ai_schema
 from app.services import ai as ai_service
+from app.services import ai_async
+from app.services.ai_cache import ai_cache
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
 
 @router.post("/generate-summary", response_model=ai_schema.SummaryResponse)
-def create_summary(payload: ai_schema.SummaryRequest):
-    result = ai_service.generate_summary(payload.title, payload.tags, payload.transcript)
+async def create_summary(payload: ai_schema.SummaryRequest):
+    result = await ai_async.generate_summary(payload.title, payload.tags, payload.transcript)
     return ai_schema.SummaryResponse(**result)
 
 
+@router.post("/generate-summary/batch", response_model=ai_schema.SummaryBatchResponse)
+async def create_summary_batch(payload: ai_schema.SummaryBatchRequest):
+    results = await asyncio.gather(
+        *(ai_async.generate_summary(item.title, item.tags, item.transcript) for item in payload.items)
+    )
+    return ai_schema.SummaryBatchResponse(results=[ai_schema.SummaryResponse(**result) for result in results])
+
+
 @router.post("/generate-quiz", response_model=ai_schema.QuizResponse)
-def create_quiz(payload: ai_schema.QuizRequest):
-    questions = ai_service.generate_quiz(payload.topic, payload.tags)
+async def create_quiz(payload: ai_schema.QuizRequest):
+    questions = await ai_async.generate_quiz(payload.topic, payload.tags)
     return ai_schema.QuizResponse(questions=questions)
 
 
+@router.post("/generate-quiz/batch", response_model=ai_schema.QuizBatchResponse)
+async def create_quiz_batch(payload: ai_schema.QuizBatchRequest):
+    results = await asyncio.gather(*(ai_async.generate_quiz(item.topic, item.tags) for item in payload.items))
+    return ai_schema.QuizBatchResponse(results=[ai_schema.QuizResponse(questions=questions) for questions in results])
+
+
 @router.post("/recommend-feed", response_model=ai_schema.RecommendationResponse)
-def recommend_feed(payload: ai_schema.RecommendationRequest, db: Session = Depends(get_db)):
-    videos = ai_service.recommend_videos(db, payload.recent_tags)
+async def recommend_feed(payload: ai_schema.RecommendationRequest, db: Session = Depends(get_db)):
+    videos = await run_in_threadpool(ai_service.recommend_videos, db, payload.recent_tags, user_id=payload.user_id)
+    videos = await ai_async.rerank_videos(payload.recent_tags, videos)
     return ai_schema.RecommendationResponse(video_ids=[video.id for video in videos])
+
+
+@router.get("/cache-stats")
+def cache_stats():
+    return {**ai_cache.stats(), "circuit": ai_async.breaker.state}
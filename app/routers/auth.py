@@ -1,9 +1,8 @@
-from datetime import datetime, timezone
-
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import PasswordHasherBusy, create_access_token, hash_password_async, verify_password_async
 from app.db import models
 from app.db.deps import get_db
 from app.schemas import auth as auth_schema
@@ -12,29 +11,63 @@ from app.schemas import user as user_schema
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+# The handlers are async so that waiting on the bcrypt process pool does not
+# pin a threadpool slot; the short DB calls still run in the threadpool.
+def _find_user(db: Session, email: str) -> models.User | None:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def _commit(db: Session, user: models.User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=user_schema.UserResponse)
-def register_user(payload: user_schema.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == payload.email).first()
+async def register_user(payload: user_schema.UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(_find_user, db, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    try:
+        password_hash = await hash_password_async(payload.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
     user = models.User(
         name=payload.name,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         role=payload.role,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_commit, db, user)
     return user
 
 
 @router.post("/login", response_model=auth_schema.TokenResponse)
-def login_user(payload: user_schema.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login_user(payload: user_schema.UserLogin, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, payload.email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    try:
+        valid, new_hash = await verify_password_async(payload.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     token = create_access_token({"sub": str(user.id), "role": user.role, "name": user.name})
+    if new_hash:
+        # The configured bcrypt cost changed since this hash was made.
+        user.password_hash = new_hash
+        await run_in_threadpool(_commit, db, user)
     return auth_schema.TokenResponse(access_token=token)
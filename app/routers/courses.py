@@ -1,15 +1,30 @@
 import uuid
-from typing import List
+from typing import List, Literal, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
+from app.core.serialization import serialize
 from app.db import models
 from app.db.deps import get_current_user, get_db
 from app.schemas import course as course_schema
+from app.services.courses import build_course, course_statement, existing_videos_statement, parse_video_ids
+from app.services.progress import refresh_course_summaries
+from app.services.response_cache import (
+    cached_response,
+    course_tag,
+    creator_courses_tag,
+    response_cache,
+    video_tag,
+)
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+course_adapter = TypeAdapter(course_schema.CourseResponse)
+expanded_course_adapter = TypeAdapter(course_schema.CourseWithVideos)
+course_list_adapter = TypeAdapter(List[course_schema.CourseResponse])
+
 
 @router.post("/create", response_model=course_schema.CourseResponse)
 def create_course(payload: course_schema.CourseCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
@@ -19,26 +34,56 @@ def create_course(payload: course_schema.CourseCreate, db: Session = Depends(get
     if str(current_user.id) != str(payload.creator_id):
         raise HTTPException(status_code=403, detail="Cannot create course for another creator")
 
-    course = models.MicroCourse(
-        creator_id=payload.creator_id,
-        title=payload.title,
-        description=payload.description,
-        video_ids=payload.video_ids,
-    )
+    try:
+        video_ids = parse_video_ids(payload.video_ids)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid video id")
+    found = set(db.scalars(existing_videos_statement(video_ids))) if video_ids else set()
+    missing = [str(video_id) for video_id in video_ids if video_id not in found]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown video ids: {', '.join(missing)}")
+
+    course = build_course(payload.creator_id, payload.title, payload.description, video_ids)
     db.add(course)
+    db.flush()
+    # Learners may already have progress on some of these videos.
+    refresh_course_summaries(db, course_id=course.id)
     db.commit()
+    response_cache.invalidate(db, course_tag(course.id), creator_courses_tag(course.creator_id))
     db.refresh(course)
     return course
 
 
-@router.get("/{course_id}", response_model=course_schema.CourseResponse)
-def get_course(course_id: uuid.UUID, db: Session = Depends(get_db)):
-    course = db.query(models.MicroCourse).filter(models.MicroCourse.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    return course
+def store_course(key: str, course: models.MicroCourse, expanded: bool, since: int):
+    if not expanded:
+        return response_cache.store(key, serialize(course_adapter, course), [course_tag(course.id)], since)
+    # Expanded bodies embed each video's counters, so they go stale with them.
+    tags = [course_tag(course.id), *(video_tag(video.id) for video in course.videos)]
+    return response_cache.store(key, serialize(expanded_course_adapter, course), tags, since)
+
+
+@router.get("/{course_id}", response_model=Union[course_schema.CourseWithVideos, course_schema.CourseResponse])
+def get_course(
+    course_id: uuid.UUID,
+    request: Request,
+    expand: Literal["videos"] | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    key = course_tag(course_id) + ("?expand=videos" if expand == "videos" else "")
+    entry, since = response_cache.lookup(db, key)
+    if entry is None:
+        course = db.scalars(course_statement(course_id, expand_videos=expand == "videos")).unique().first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        entry = store_course(key, course, expand == "videos", since)
+    return cached_response(request, entry)
 
 
 @router.get("/user/{creator_id}", response_model=List[course_schema.CourseResponse])
-def get_courses_for_user(creator_id: uuid.UUID, db: Session = Depends(get_db)):
-    return db.query(models.MicroCourse).filter(models.MicroCourse.creator_id == creator_id).all()
+def get_courses_for_user(creator_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    key = creator_courses_tag(creator_id)
+    entry, since = response_cache.lookup(db, key)
+    if entry is None:
+        courses = db.query(models.MicroCourse).filter(models.MicroCourse.creator_id == creator_id).all()
+        entry = response_cache.store(key, serialize(course_list_adapter, courses), (), since)
+    return cached_response(request, entry)
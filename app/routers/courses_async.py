@@ -0,0 +1,81 @@
+import uuid
+from typing import List, Literal, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.serialization import serialize
+from app.db import models
+from app.db.deps import get_async_db, get_current_user_async
+from app.routers.courses import course_list_adapter, store_course
+from app.schemas import course as course_schema
+from app.services.courses import build_course, course_statement, existing_videos_statement, parse_video_ids
+from app.services.progress import refresh_course_summaries
+from app.services.response_cache import (
+    cached_response,
+    course_tag,
+    creator_courses_tag,
+    response_cache,
+)
+
+# Same routes as app.routers.courses, served on an AsyncSession when DB_ASYNC is on.
+router = APIRouter(prefix="/courses", tags=["courses"])
+
+
+@router.post("/create", response_model=course_schema.CourseResponse)
+async def create_course(
+    payload: course_schema.CourseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if current_user.role != "creator":
+        raise HTTPException(status_code=403, detail="Only creators can create courses")
+
+    if str(current_user.id) != str(payload.creator_id):
+        raise HTTPException(status_code=403, detail="Cannot create course for another creator")
+
+    try:
+        video_ids = parse_video_ids(payload.video_ids)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid video id")
+    found = set(await db.scalars(existing_videos_statement(video_ids))) if video_ids else set()
+    missing = [str(video_id) for video_id in video_ids if video_id not in found]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown video ids: {', '.join(missing)}")
+
+    course = build_course(payload.creator_id, payload.title, payload.description, video_ids)
+    db.add(course)
+    await db.flush()
+    # Learners may already have progress on some of these videos.
+    await db.run_sync(refresh_course_summaries, course_id=course.id)
+    await db.commit()
+    await db.run_sync(response_cache.invalidate, course_tag(course.id), creator_courses_tag(course.creator_id))
+    return course
+
+
+@router.get("/{course_id}", response_model=Union[course_schema.CourseWithVideos, course_schema.CourseResponse])
+async def get_course(
+    course_id: uuid.UUID,
+    request: Request,
+    expand: Literal["videos"] | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    key = course_tag(course_id) + ("?expand=videos" if expand == "videos" else "")
+    entry, since = await db.run_sync(response_cache.lookup, key)
+    if entry is None:
+        course = (await db.scalars(course_statement(course_id, expand_videos=expand == "videos"))).unique().first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        entry = store_course(key, course, expand == "videos", since)
+    return cached_response(request, entry)
+
+
+@router.get("/user/{creator_id}", response_model=List[course_schema.CourseResponse])
+async def get_courses_for_user(creator_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = creator_courses_tag(creator_id)
+    entry, since = await db.run_sync(response_cache.lookup, key)
+    if entry is None:
+        courses = (await db.scalars(select(models.MicroCourse).where(models.MicroCourse.creator_id == creator_id))).all()
+        entry = response_cache.store(key, serialize(course_list_adapter, courses), (), since)
+    return cached_response(request, entry)
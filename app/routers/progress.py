@@ -1,13 +1,28 @@
 import uuid
+from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.core.serialization import json_response
 from app.db import models
 from app.db.deps import get_current_user, get_db
 from app.schemas import progress as progress_schema
+from app.services.cooccurrence import cooccurrence_model
+from app.services.progress import (
+    completed_video_ids,
+    course_progress_rows,
+    course_progress_statement,
+    refresh_course_summaries,
+    upsert_statement,
+)
 
 router = APIRouter(prefix="/progress", tags=["progress"])
+settings = get_settings()
+
+course_progress_list_adapter = TypeAdapter(List[progress_schema.CourseProgress])
 
 
 @router.post("/update", response_model=progress_schema.ProgressResponse)
@@ -15,27 +30,26 @@ def update_progress(payload: progress_schema.ProgressUpdate, db: Session = Depen
     if str(current_user.id) != str(payload.user_id):
         raise HTTPException(status_code=403, detail="Cannot update other user progress")
 
-    record = (
-        db.query(models.Progress)
-        .filter(
-            models.Progress.user_id == payload.user_id,
-            models.Progress.video_id == payload.video_id,
-        )
-        .first()
-    )
-    if record:
-        record.completed = payload.completed
-    else:
-        record = models.Progress(
-            user_id=payload.user_id,
-            course_id=payload.course_id,
-            video_id=payload.video_id,
-            completed=payload.completed,
-        )
-        db.add(record)
+    record = db.execute(upsert_statement(db, [payload]).returning(models.Progress)).scalar_one()
+    # Build the response before commit expires the instance, saving a reload.
+    response = progress_schema.ProgressResponse.model_validate(record, from_attributes=True)
+    refresh_course_summaries(db, user_id=payload.user_id, video_ids=[payload.video_id])
+    db.commit()
+    if payload.completed:
+        cooccurrence_model.record(payload.user_id, [payload.video_id])
+    return response
+
+
+@router.post("/batch", response_model=progress_schema.ProgressBatchResponse)
+def update_progress_batch(payload: progress_schema.ProgressBatch, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    if any(str(event.user_id) != str(current_user.id) for event in payload.events):
+        raise HTTPException(status_code=403, detail="Cannot update other user progress")
+
+    result = db.execute(upsert_statement(db, payload.events))
+    refresh_course_summaries(db, user_id=current_user.id, video_ids={event.video_id for event in payload.events})
     db.commit()
-    db.refresh(record)
-    return record
+    cooccurrence_model.record(current_user.id, completed_video_ids(payload.events))
+    return {"applied": result.rowcount}
 
 
 @router.get("/user/{user_id}/course/{course_id}")
@@ -43,10 +57,23 @@ def get_progress(user_id: uuid.UUID, course_id: uuid.UUID, db: Session = Depends
     if str(current_user.id) != str(user_id):
         raise HTTPException(status_code=403, detail="Cannot view other user progress")
 
-    progress = (
-        db.query(models.Progress)
-        .filter(models.Progress.user_id == user_id, models.Progress.course_id == course_id)
-        .all()
-    )
-    completed = sum(1 for record in progress if record.completed)
-    return {"completed": completed, "total": len(progress)}
+    row = db.execute(course_progress_statement(user_id, course_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return {"completed": row.completed, "total": row.total}
+
+
+@router.get("/user/{user_id}/courses", response_model=List[progress_schema.CourseProgress])
+def get_course_progress_overview(user_id: uuid.UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    if str(current_user.id) != str(user_id):
+        raise HTTPException(status_code=403, detail="Cannot view other user progress")
+
+    if settings.maintain_course_progress_summaries:
+        rows = (
+            db.query(models.CourseProgressSummary)
+            .filter(models.CourseProgressSummary.user_id == user_id)
+            .all()
+        )
+    else:
+        rows = db.execute(course_progress_rows(user_id=user_id)).all()
+    return json_response(course_progress_list_adapter, rows)
@@ -0,0 +1,94 @@
+import uuid
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.serialization import json_response
+from app.db import models
+from app.db.deps import get_async_db, get_current_user_async
+from app.routers.progress import course_progress_list_adapter
+from app.schemas import progress as progress_schema
+from app.services.cooccurrence import cooccurrence_model
+from app.services.progress import (
+    completed_video_ids,
+    course_progress_rows,
+    course_progress_statement,
+    refresh_course_summaries,
+    upsert_statement,
+)
+
+# Same routes as app.routers.progress, served on an AsyncSession when DB_ASYNC is on.
+router = APIRouter(prefix="/progress", tags=["progress"])
+settings = get_settings()
+
+
+@router.post("/update", response_model=progress_schema.ProgressResponse)
+async def update_progress(
+    payload: progress_schema.ProgressUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if str(current_user.id) != str(payload.user_id):
+        raise HTTPException(status_code=403, detail="Cannot update other user progress")
+
+    record = (await db.execute(upsert_statement(db, [payload]).returning(models.Progress))).scalar_one()
+    response = progress_schema.ProgressResponse.model_validate(record, from_attributes=True)
+    await db.run_sync(refresh_course_summaries, user_id=payload.user_id, video_ids=[payload.video_id])
+    await db.commit()
+    if payload.completed:
+        cooccurrence_model.record(payload.user_id, [payload.video_id])
+    return response
+
+
+@router.post("/batch", response_model=progress_schema.ProgressBatchResponse)
+async def update_progress_batch(
+    payload: progress_schema.ProgressBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if any(str(event.user_id) != str(current_user.id) for event in payload.events):
+        raise HTTPException(status_code=403, detail="Cannot update other user progress")
+
+    result = await db.execute(upsert_statement(db, payload.events))
+    await db.run_sync(
+        refresh_course_summaries, user_id=current_user.id, video_ids={event.video_id for event in payload.events}
+    )
+    await db.commit()
+    cooccurrence_model.record(current_user.id, completed_video_ids(payload.events))
+    return {"applied": result.rowcount}
+
+
+@router.get("/user/{user_id}/course/{course_id}")
+async def get_progress(
+    user_id: uuid.UUID,
+    course_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if str(current_user.id) != str(user_id):
+        raise HTTPException(status_code=403, detail="Cannot view other user progress")
+
+    row = (await db.execute(course_progress_statement(user_id, course_id))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return {"completed": row.completed, "total": row.total}
+
+
+@router.get("/user/{user_id}/courses", response_model=List[progress_schema.CourseProgress])
+async def get_course_progress_overview(
+    user_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if str(current_user.id) != str(user_id):
+        raise HTTPException(status_code=403, detail="Cannot view other user progress")
+
+    if settings.maintain_course_progress_summaries:
+        summaries = select(models.CourseProgressSummary).where(models.CourseProgressSummary.user_id == user_id)
+        rows = (await db.scalars(summaries)).all()
+    else:
+        rows = (await db.execute(course_progress_rows(user_id=user_id))).all()
+    return json_response(course_progress_list_adapter, rows)
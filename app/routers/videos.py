@@ -1,25 +1,45 @@
 import os
 import uuid
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.core.serialization import json_response, serialize
 from app.db import models
 from app.db.deps import get_current_user, get_db
 from app.schemas import video as video_schema
+from app.services.counters import counter_buffer
+from app.services.media import VideoFileResponse
+from app.services.pagination import InvalidCursor
+from app.services.recommendations import recommendation_index
+from app.services.response_cache import cached_response, response_cache, video_tag
+from app.services.search import SearchUnavailable, search_page, search_statement
+from app.services.similarity import similarity_index
+from app.services.storage import VIDEO_EXTENSIONS, UploadTooLarge, resolve_stored_file, store_stream
+from app.services.tags import normalize_tags, parse_tag_list, set_video_tags, trending_tags_statement
+from app.services.trending import epoch_statement, trending_items, trending_statement
+from app.services.videos import feed_page, feed_statement, similar_items
 
 router = APIRouter(prefix="/videos", tags=["videos"])
+settings = get_settings()
 
-STORAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "storage", "videos"))
-os.makedirs(STORAGE_ROOT, exist_ok=True)
+video_adapter = TypeAdapter(video_schema.VideoResponse)
+feed_page_adapter = TypeAdapter(video_schema.VideoFeedPage)
+video_list_adapter = TypeAdapter(List[video_schema.VideoResponse])
+tag_counts_adapter = TypeAdapter(List[video_schema.TagCount])
+search_page_adapter = TypeAdapter(video_schema.VideoSearchPage)
+similar_videos_adapter = TypeAdapter(List[video_schema.SimilarVideo])
+trending_videos_adapter = TypeAdapter(List[video_schema.TrendingVideo])
 
 
 @router.post("/upload", response_model=video_schema.VideoResponse)
 def upload_video(
     title: str = Form(...),
     description: str | None = Form(None),
+    transcript: str | None = Form(None),
     tags: str = Form(""),
     skill_level: str = Form(...),
     creator=Depends(get_current_user),
@@ -29,46 +49,149 @@ def upload_video(
     if creator.role != "creator":
         raise HTTPException(status_code=403, detail="Only creators can upload videos")
 
-    if file.content_type not in ("video/mp4", "video/webm", "video/quicktime"):
+    if file.content_type not in VIDEO_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Unsupported video format")
 
-    filename = f"{uuid.uuid4()}.mp4"
-    filepath = os.path.join(STORAGE_ROOT, filename)
-    contents = file.file.read()
-    with open(filepath, "wb") as buffer:
-        buffer.write(contents)
+    if file.size is not None and file.size > settings.max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Video file too large")
+    try:
+        stored = store_stream(file.file, VIDEO_EXTENSIONS[file.content_type], settings.max_upload_bytes)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="Video file too large")
 
     video = models.Video(
         creator_id=creator.id,
         title=title,
         description=description,
-        tags=[tag.strip() for tag in tags.split(",") if tag.strip()],
+        transcript=transcript,
         skill_level=skill_level,
-        video_url=f"/static/videos/{filename}",
+        video_url=f"/videos/stream/{stored.filename}",
     )
 
     db.add(video)
+    set_video_tags(db, video, parse_tag_list(tags))
     db.commit()
+    response_cache.invalidate(db, video_tag(video.id))
     db.refresh(video)
+    recommendation_index.add_video(video)
+    similarity_index.add_video(video)
     return video
 
 
+@router.get("/feed", response_model=List[video_schema.VideoResponse])
+def get_feed(limit: int = 15, db: Session = Depends(get_db)):
+    # The original unpaginated shape, kept for existing clients; new clients
+    # page through /videos/feed/page instead.
+    return json_response(video_list_adapter, db.scalars(feed_statement(limit).limit(limit)).all())
+
+
+@router.get("/feed/page", response_model=video_schema.VideoFeedPage)
+def get_feed_page(
+    limit: int = Query(15, ge=1, le=100),
+    cursor: str | None = None,
+    skill_level: str | None = None,
+    tag: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        statement = feed_statement(limit, cursor, skill_level, normalize_tags([tag]) if tag else None)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(feed_page_adapter, feed_page(db.scalars(statement).all(), limit))
+
+
+@router.get("", response_model=video_schema.VideoFeedPage)
+def list_videos_by_tags(
+    tags: str = Query(..., description="Comma-separated tag names"),
+    match: Literal["any", "all"] = "any",
+    limit: int = Query(15, ge=1, le=100),
+    cursor: str | None = None,
+    skill_level: str | None = None,
+    db: Session = Depends(get_db),
+):
+    names = parse_tag_list(tags)
+    if not names:
+        raise HTTPException(status_code=400, detail="At least one tag is required")
+    try:
+        statement = feed_statement(limit, cursor, skill_level, names, match_all=match == "all")
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(feed_page_adapter, feed_page(db.scalars(statement).all(), limit))
+
+
+@router.get("/tags/trending", response_model=List[video_schema.TagCount])
+def trending_tags(limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    return json_response(tag_counts_adapter, db.scalars(trending_tags_statement(limit)).all())
+
+
+# Served from the indexed score table the trending scorer maintains; raw
+# view/like counters are never read here.
+@router.get("/trending", response_model=List[video_schema.TrendingVideo])
+def trending_videos(
+    window: Literal["day", "week", "month"] = "day",
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    rows = db.execute(trending_statement(window, limit)).all()
+    return json_response(trending_videos_adapter, trending_items(rows, db.scalar(epoch_statement()), window))
+
+
+@router.get("/search", response_model=video_schema.VideoSearchPage)
+def search_videos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(15, ge=1, le=50),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        statement = search_statement(db.get_bind().dialect.name, q, limit, cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except SearchUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    if statement is None:
+        return {"items": [], "next_cursor": None}
+    return json_response(search_page_adapter, search_page(db.execute(statement).all(), limit))
+
+
+@router.api_route("/stream/{filename}", methods=["GET", "HEAD"])
+def stream_video(filename: str, request: Request):
+    path = resolve_stored_file(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Video file not found")
+    return VideoFileResponse(path, os.stat(path), request.headers)
+
+
 @router.get("/{video_id}", response_model=video_schema.VideoResponse)
-def get_video(video_id: uuid.UUID, db: Session = Depends(get_db)):
+def get_video(video_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    key = video_tag(video_id)
+    entry, since = response_cache.lookup(db, key)
+    if entry is None:
+        video = db.query(models.Video).filter(models.Video.id == video_id).first()
+        if not video:
+            raise HTTPException(status_code=404, detail="Video not found")
+        entry = response_cache.store(key, serialize(video_adapter, video), (), since)
+    return cached_response(request, entry)
+
+
+def similar_not_ready() -> Response:
+    # The index is still being built in the background; answer empty rather
+    # than make the request wait for it.
+    response = json_response(similar_videos_adapter, [])
+    response.headers["X-Similarity-Index"] = "building"
+    return response
+
+
+@router.get("/{video_id}/similar", response_model=List[video_schema.SimilarVideo])
+def similar_videos(video_id: uuid.UUID, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
     video = db.query(models.Video).filter(models.Video.id == video_id).first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
-    return video
-
-
-@router.get("/feed", response_model=List[video_schema.VideoResponse])
-def get_feed(limit: int = 15, db: Session = Depends(get_db)):
-    return (
-        db.query(models.Video)
-        .order_by(models.Video.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+    hits = similarity_index.similar(video, limit)
+    if hits is None:
+        return similar_not_ready()
+    rows = db.query(models.Video).filter(models.Video.id.in_([hit for hit, _ in hits])).all() if hits else []
+    return json_response(similar_videos_adapter, similar_items(hits, rows))
 
 
 class VideoIdPayload(BaseModel):
@@ -77,19 +200,19 @@ class VideoIdPayload(BaseModel):
 
 @router.post("/increment-view")
 def increment_view(payload: VideoIdPayload, db: Session = Depends(get_db)):
-    video = db.query(models.Video).filter(models.Video.id == payload.video_id).first()
-    if not video:
+    counts = counter_buffer.increment(db, payload.video_id, "views")
+    if counts is None:
         raise HTTPException(status_code=404, detail="Video not found")
-    video.views += 1
-    db.commit()
-    return {"status": "ok", "views": video.views}
+    views, likes = counts
+    recommendation_index.update_counts(payload.video_id, views, likes)
+    return {"status": "ok", "views": views}
 
 
 @router.post("/like")
 def like_video(payload: VideoIdPayload, db: Session = Depends(get_db)):
-    video = db.query(models.Video).filter(models.Video.id == payload.video_id).first()
-    if not video:
+    counts = counter_buffer.increment(db, payload.video_id, "likes")
+    if counts is None:
         raise HTTPException(status_code=404, detail="Video not found")
-    video.likes += 1
-    db.commit()
-    return {"status": "ok", "likes": video.likes}
+    views, likes = counts
+    recommendation_index.update_counts(payload.video_id, views, likes)
+    return {"status": "ok", "likes": likes}
@@ -0,0 +1,207 @@
+import uuid
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.serialization import json_response, serialize
+from app.db import models
+from app.db.deps import get_async_db, get_current_user_async
+from app.routers.videos import (
+    VideoIdPayload,
+    feed_page_adapter,
+    search_page_adapter,
+    similar_not_ready,
+    similar_videos_adapter,
+    stream_video,
+    tag_counts_adapter,
+    trending_videos_adapter,
+    video_adapter,
+    video_list_adapter,
+)
+from app.schemas import video as video_schema
+from app.services.counters import counter_buffer
+from app.services.pagination import InvalidCursor
+from app.services.recommendations import recommendation_index
+from app.services.response_cache import cached_response, response_cache, video_tag
+from app.services.search import SearchUnavailable, search_page, search_statement
+from app.services.similarity import similarity_index
+from app.services.storage import VIDEO_EXTENSIONS, UploadTooLarge, store_stream
+from app.services.tags import normalize_tags, parse_tag_list, set_video_tags, trending_tags_statement
+from app.services.trending import epoch_statement, trending_items, trending_statement
+from app.services.videos import feed_page, feed_statement, similar_items
+
+# Same routes as app.routers.videos, served on an AsyncSession when DB_ASYNC is on.
+router = APIRouter(prefix="/videos", tags=["videos"])
+settings = get_settings()
+
+
+@router.post("/upload", response_model=video_schema.VideoResponse)
+async def upload_video(
+    title: str = Form(...),
+    description: str | None = Form(None),
+    transcript: str | None = Form(None),
+    tags: str = Form(""),
+    skill_level: str = Form(...),
+    creator=Depends(get_current_user_async),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if creator.role != "creator":
+        raise HTTPException(status_code=403, detail="Only creators can upload videos")
+
+    if file.content_type not in VIDEO_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    if file.size is not None and file.size > settings.max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Video file too large")
+    try:
+        # Hashing and writing the file is blocking disk work.
+        stored = await run_in_threadpool(
+            store_stream, file.file, VIDEO_EXTENSIONS[file.content_type], settings.max_upload_bytes
+        )
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="Video file too large")
+
+    video = models.Video(
+        creator_id=creator.id,
+        title=title,
+        description=description,
+        transcript=transcript,
+        skill_level=skill_level,
+        video_url=f"/videos/stream/{stored.filename}",
+    )
+
+    db.add(video)
+    await db.run_sync(set_video_tags, video, parse_tag_list(tags))
+    await db.commit()
+    await db.run_sync(response_cache.invalidate, video_tag(video.id))
+    recommendation_index.add_video(video)
+    # Appending writes the memory-mapped index file.
+    await run_in_threadpool(similarity_index.add_video, video)
+    return video
+
+
+@router.get("/feed", response_model=List[video_schema.VideoResponse])
+async def get_feed(limit: int = 15, db: AsyncSession = Depends(get_async_db)):
+    return json_response(video_list_adapter, (await db.scalars(feed_statement(limit).limit(limit))).all())
+
+
+@router.get("/feed/page", response_model=video_schema.VideoFeedPage)
+async def get_feed_page(
+    limit: int = Query(15, ge=1, le=100),
+    cursor: str | None = None,
+    skill_level: str | None = None,
+    tag: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        statement = feed_statement(limit, cursor, skill_level, normalize_tags([tag]) if tag else None)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(feed_page_adapter, feed_page((await db.scalars(statement)).all(), limit))
+
+
+@router.get("", response_model=video_schema.VideoFeedPage)
+async def list_videos_by_tags(
+    tags: str = Query(..., description="Comma-separated tag names"),
+    match: Literal["any", "all"] = "any",
+    limit: int = Query(15, ge=1, le=100),
+    cursor: str | None = None,
+    skill_level: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    names = parse_tag_list(tags)
+    if not names:
+        raise HTTPException(status_code=400, detail="At least one tag is required")
+    try:
+        statement = feed_statement(limit, cursor, skill_level, names, match_all=match == "all")
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(feed_page_adapter, feed_page((await db.scalars(statement)).all(), limit))
+
+
+@router.get("/tags/trending", response_model=List[video_schema.TagCount])
+async def trending_tags(limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_async_db)):
+    return json_response(tag_counts_adapter, (await db.scalars(trending_tags_statement(limit))).all())
+
+
+@router.get("/trending", response_model=List[video_schema.TrendingVideo])
+async def trending_videos(
+    window: Literal["day", "week", "month"] = "day",
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = (await db.execute(trending_statement(window, limit))).all()
+    return json_response(trending_videos_adapter, trending_items(rows, await db.scalar(epoch_statement()), window))
+
+
+@router.get("/search", response_model=video_schema.VideoSearchPage)
+async def search_videos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(15, ge=1, le=50),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        statement = search_statement(db.get_bind().dialect.name, q, limit, cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except SearchUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    if statement is None:
+        return {"items": [], "next_cursor": None}
+    return json_response(search_page_adapter, search_page((await db.execute(statement)).all(), limit))
+
+
+# Serving the file touches no database, so the sync handler is shared.
+router.api_route("/stream/{filename}", methods=["GET", "HEAD"])(stream_video)
+
+
+@router.get("/{video_id}", response_model=video_schema.VideoResponse)
+async def get_video(video_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = video_tag(video_id)
+    entry, since = await db.run_sync(response_cache.lookup, key)
+    if entry is None:
+        video = (await db.scalars(select(models.Video).where(models.Video.id == video_id))).first()
+        if not video:
+            raise HTTPException(status_code=404, detail="Video not found")
+        entry = response_cache.store(key, serialize(video_adapter, video), (), since)
+    return cached_response(request, entry)
+
+
+@router.get("/{video_id}/similar", response_model=List[video_schema.SimilarVideo])
+async def similar_videos(video_id: uuid.UUID, limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_async_db)):
+    video = (await db.scalars(select(models.Video).where(models.Video.id == video_id))).first()
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    # Scoring is blocking numpy work.
+    hits = await run_in_threadpool(similarity_index.similar, video, limit)
+    if hits is None:
+        return similar_not_ready()
+    rows = (await db.scalars(select(models.Video).where(models.Video.id.in_([hit for hit, _ in hits])))).all() if hits else []
+    return json_response(similar_videos_adapter, similar_items(hits, rows))
+
+
+@router.post("/increment-view")
+async def increment_view(payload: VideoIdPayload, db: AsyncSession = Depends(get_async_db)):
+    # The buffer only reads the database the first time it sees a video.
+    counts = await db.run_sync(counter_buffer.increment, payload.video_id, "views")
+    if counts is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    views, likes = counts
+    recommendation_index.update_counts(payload.video_id, views, likes)
+    return {"status": "ok", "views": views}
+
+
+@router.post("/like")
+async def like_video(payload: VideoIdPayload, db: AsyncSession = Depends(get_async_db)):
+    counts = await db.run_sync(counter_buffer.increment, payload.video_id, "likes")
+    if counts is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    views, likes = counts
+    recommendation_index.update_counts(payload.video_id, views, likes)
+    return {"status": "ok", "likes": likes}
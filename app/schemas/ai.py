@@ -1,7 +1,9 @@
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+MAX_BATCH_SIZE = 50
 
 
 class SummaryRequest(BaseModel):
@@ -15,6 +17,14 @@ class SummaryResponse(BaseModel):
     key_points: List[str]
 
 
+class SummaryBatchRequest(BaseModel):
+    items: List[SummaryRequest] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+class SummaryBatchResponse(BaseModel):
+    results: List[SummaryResponse]
+
+
 class QuizRequest(BaseModel):
     topic: str
     tags: List[str]
@@ -30,6 +40,14 @@ class QuizResponse(BaseModel):
     questions: List[QuizQuestion]
 
 
+class QuizBatchRequest(BaseModel):
+    items: List[QuizRequest] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+class QuizBatchResponse(BaseModel):
+    results: List[QuizResponse]
+
+
 class RecommendationRequest(BaseModel):
     user_id: UUID | None = None
     recent_tags: List[str] = []
@@ -2,7 +2,9 @@ from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.video import VideoResponse
 
 
 class CourseBase(BaseModel):
@@ -21,5 +23,8 @@ class CourseResponse(CourseBase):
     learners_enrolled: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CourseWithVideos(CourseResponse):
+    videos: List[VideoResponse]
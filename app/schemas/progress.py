@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+MAX_BATCH_SIZE = 500
 
 
 class ProgressUpdate(BaseModel):
@@ -11,6 +14,14 @@ class ProgressUpdate(BaseModel):
     completed: bool
 
 
+class ProgressBatch(BaseModel):
+    events: List[ProgressUpdate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class ProgressBatchResponse(BaseModel):
+    applied: int
+
+
 class ProgressResponse(BaseModel):
     id: UUID
     user_id: UUID
@@ -19,5 +30,10 @@ class ProgressResponse(BaseModel):
     completed: bool
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CourseProgress(BaseModel):
+    course_id: UUID
+    completed: int
+    total: int
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class VideoBase(BaseModel):
@@ -28,5 +28,36 @@ class VideoResponse(VideoBase):
     likes: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class VideoFeedPage(BaseModel):
+    items: List[VideoResponse]
+    next_cursor: str | None = None
+
+
+class TagCount(BaseModel):
+    name: str
+    video_count: int
+
+
+class VideoSearchHit(BaseModel):
+    video: VideoResponse
+    score: float
+    snippet: str | None = None
+
+
+class VideoSearchPage(BaseModel):
+    items: List[VideoSearchHit]
+    next_cursor: str | None = None
+
+
+class SimilarVideo(BaseModel):
+    video: VideoResponse
+    score: float
+
+
+class TrendingVideo(BaseModel):
+    video: VideoResponse
+    # Decayed views/likes score as of the request.
+    score: float
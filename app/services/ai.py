@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import uuid
 from typing import List
 
-from openai import OpenAI, OpenAIError
 from sqlalchemy.orm import Session
 
-from app.core.config import get_settings
 from app.db import models
+from app.services.cooccurrence import cooccurrence_model
+from app.services.recommendations import recommendation_index
 
-settings = get_settings()
-client: OpenAI | None = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+MODEL = "gpt-4o-mini"
+# Personal recommendations fetch this many times the page in candidates.
+CANDIDATE_FACTOR = 2
+
+
+def openai_errors() -> tuple[type[Exception], ...]:
+    from openai import OpenAIError
+
+    return (OpenAIError,)
 
 
 def _fallback_summary(title: str, tags: List[str], transcript: str | None) -> dict:
@@ -20,25 +28,22 @@ def _fallback_summary(title: str, tags: List[str], transcript: str | None) -> di
     }
 
 
-def generate_summary(title: str, tags: List[str], transcript: str | None) -> dict:
-    if client:
-        prompt = (
-            "Summarize the following short educational reel. Provide 2 sentences and bullet key points.\n"
-            f"Title: {title}\nTags: {', '.join(tags)}\nTranscript: {transcript or 'Not provided'}"
-        )
-        try:
-            response = client.responses.create(
-                model="gpt-4o-mini",
-                input=[{"role": "user", "content": prompt}],
-            )
-            content = response.output[0].content[0].text if response.output else ""
-            lines = [line.strip("- ") for line in content.splitlines() if line.strip()]
-            summary = lines[0] if lines else "Concise summary pending."
-            key_points = lines[1:4] or ["Review the video to learn key ideas."]
-            return {"summary": summary, "key_points": key_points}
-        except OpenAIError:
-            pass
-    return _fallback_summary(title, tags, transcript)
+def summary_prompt(title: str, tags: List[str], transcript: str | None) -> str:
+    return (
+        "Summarize the following short educational reel. Provide 2 sentences and bullet key points.\n"
+        f"Title: {title}\nTags: {', '.join(tags)}\nTranscript: {transcript or 'Not provided'}"
+    )
+
+
+def response_text(response) -> str:
+    return response.output[0].content[0].text if response.output else ""
+
+
+def parse_summary(content: str) -> dict:
+    lines = [line.strip("- ") for line in content.splitlines() if line.strip()]
+    summary = lines[0] if lines else "Concise summary pending."
+    key_points = lines[1:4] or ["Review the video to learn key ideas."]
+    return {"summary": summary, "key_points": key_points}
 
 
 def _fallback_quiz(topic: str, tags: List[str]) -> List[dict]:
@@ -53,50 +58,98 @@ def _fallback_quiz(topic: str, tags: List[str]) -> List[dict]:
     ]
 
 
-def generate_quiz(topic: str, tags: List[str]) -> List[dict]:
-    if client:
-        prompt = (
-            "Create 3 concise MCQs with 4 options and answer key for the topic."
-            f"Topic: {topic}. Tags: {', '.join(tags)}"
+def quiz_prompt(topic: str, tags: List[str]) -> str:
+    return (
+        "Create 3 concise MCQs with 4 options and answer key for the topic."
+        f"Topic: {topic}. Tags: {', '.join(tags)}"
+    )
+
+
+def parse_quiz(content: str) -> List[dict]:
+    questions: List[dict] = []
+    for block in content.split("Question"):
+        if not block.strip():
+            continue
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        if not lines:
+            continue
+        question = lines[0]
+        options = [line.split(".", 1)[-1].strip() for line in lines[1:5]]
+        answer = lines[5].split(":", 1)[-1].strip() if len(lines) > 5 else options[0]
+        questions.append({"question": question, "options": options, "answer": answer})
+    return questions
+
+
+def rerank_prompt(recent_tags: List[str], videos: List[models.Video]) -> str:
+    return (
+        "Rank these video titles for a learner interested in the provided tags.\n"
+        f"Tags: {', '.join(recent_tags)}\n"
+        + "\n".join(f"- {video.id} :: {video.title}" for video in videos)
+    )
+
+
+def parse_rerank(content: str, videos: List[models.Video]) -> List[models.Video]:
+    ordered_ids: list[str] = []
+    for line in content.splitlines():
+        if "::" in line:
+            vid_id = line.split("::", 1)[0].strip("- ").strip()
+            ordered_ids.append(vid_id)
+    id_map = {str(video.id): video for video in videos}
+    re_ranked = [id_map[vid] for vid in ordered_ids if vid in id_map]
+    re_ranked.extend([video for video in videos if str(video.id) not in ordered_ids])
+    return re_ranked
+
+
+def recent_completions(db: Session, user_id: uuid.UUID, limit: int) -> List[uuid.UUID]:
+    # The user's latest completions, newest first, off ix_progress_user_history.
+    return [
+        video_id
+        for (video_id,) in db.query(models.Progress.video_id)
+        .filter(models.Progress.user_id == user_id, models.Progress.completed.is_(True))
+        .order_by(models.Progress.updated_at.desc())
+        .limit(limit)
+    ]
+
+
+def completed_among(db: Session, user_id: uuid.UUID, video_ids: List[uuid.UUID]) -> set[uuid.UUID]:
+    # Which of a handful of candidates the user has completed, probed through
+    # ux_progress_user_video rather than by loading their whole history.
+    if not video_ids:
+        return set()
+    return {
+        video_id
+        for (video_id,) in db.query(models.Progress.video_id).filter(
+            models.Progress.user_id == user_id,
+            models.Progress.completed.is_(True),
+            models.Progress.video_id.in_(video_ids),
         )
-        try:
-            response = client.responses.create(
-                model="gpt-4o-mini",
-                input=[{"role": "user", "content": prompt}],
-            )
-            content = response.output[0].content[0].text if response.output else ""
-            questions: List[dict] = []
-            for block in content.split("Question"):
-                if not block.strip():
-                    continue
-                lines = [line.strip() for line in block.splitlines() if line.strip()]
-                if not lines:
-                    continue
-                question = lines[0]
-                options = [line.split(".", 1)[-1].strip() for line in lines[1:5]]
-                answer = lines[5].split(":", 1)[-1].strip() if len(lines) > 5 else options[0]
-                questions.append({"question": question, "options": options, "answer": answer})
-            if questions:
-                return questions
-        except OpenAIError:
-            pass
-    return _fallback_quiz(topic, tags)
-
-
-def recommend_videos(db: Session, recent_tags: List[str], limit: int = 15) -> List[models.Video]:
-    videos = db.query(models.Video).all()
-    scored: list[tuple[models.Video, float]] = []
-    recent_set = set(tag.lower() for tag in recent_tags)
-    for video in videos:
-        tag_overlap = len(recent_set.intersection({tag.lower() for tag in (video.tags or [])}))
-        trend_score = (video.views * 0.001) + (video.likes * 0.01)
-        score = tag_overlap + trend_score
-        scored.append((video, score))
-
-    scored.sort(key=lambda pair: pair[1], reverse=True)
-    top = [video for video, _ in scored[:limit]]
-
-    if client and recent_tags:
-        try:
-            prompt = (
-                \"Rank these video titles for a learner interested in the provided tags.\\n\"\n                f\"Tags: {', '.join(recent_tags)}\\n\"\n                + \"\\n\".join(f\"- {video.id} :: {video.title}\" for video in top)\n            )\n            response = client.responses.create(\n                model=\"gpt-4o-mini\",\n                input=[{\"role\": \"user\", \"content\": prompt}],\n            )\n            content = response.output[0].content[0].text if response.output else \"\"\n            ordered_ids: list[str] = []\n            for line in content.splitlines():\n                if \"::\" in line:\n                    vid_id = line.split(\"::\", 1)[0].strip(\"- \").strip()\n                    ordered_ids.append(vid_id)\n            id_map = {str(video.id): video for video in top}\n            re_ranked = [id_map[vid] for vid in ordered_ids if vid in id_map]\n            re_ranked.extend([video for video in top if str(video.id) not in ordered_ids])\n            return re_ranked[:limit]\n        except OpenAIError:\n            pass\n    return top
+    }
+
+
+def _personal_top_k(db: Session, user_id: uuid.UUID, recent_tags: List[str], limit: int) -> List[uuid.UUID]:
+    history = recent_completions(db, user_id, cooccurrence_model.max_history)
+    if not history:
+        return recommendation_index.top_k(recent_tags, limit)
+    cooccurrence_model.ensure_fresh()
+    # Over-fetch so that videos completed before the history window can be
+    # dropped afterwards; co-occurrence picks come first, then (for too
+    # little signal, or no model yet) the tag/trend ranking.
+    wanted = limit * CANDIDATE_FACTOR
+    candidates = cooccurrence_model.recommend(history, history, wanted)
+    seen = set(history) | set(candidates)
+    candidates += [video_id for video_id in recommendation_index.top_k(recent_tags, wanted) if video_id not in seen]
+    done = completed_among(db, user_id, candidates)
+    return [video_id for video_id in candidates if video_id not in done][:limit]
+
+
+def recommend_videos(
+    db: Session, recent_tags: List[str], limit: int = 15, user_id: uuid.UUID | None = None
+) -> List[models.Video]:
+    recommendation_index.ensure_loaded(db)
+    if user_id is not None:
+        top_ids = _personal_top_k(db, user_id, recent_tags, limit)
+    else:
+        top_ids = recommendation_index.top_k(recent_tags, limit)
+    rows = db.query(models.Video).filter(models.Video.id.in_(top_ids)).all() if top_ids else []
+    by_id = {video.id: video for video in rows}
+    return [by_id[video_id] for video_id in top_ids if video_id in by_id]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, List, TypeVar
+
+from app.core.config import get_settings
+from app.core.instrumentation import openai_timer
+from app.db import models
+from app.services.ai import (
+    MODEL,
+    _fallback_quiz,
+    _fallback_summary,
+    openai_errors,
+    parse_quiz,
+    parse_rerank,
+    parse_summary,
+    quiz_prompt,
+    rerank_prompt,
+    response_text,
+    summary_prompt,
+)
+from app.services.ai_cache import ai_cache, make_key
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+def retryable_errors() -> tuple[type[BaseException], ...]:
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+    return (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError, asyncio.TimeoutError)
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+# Classic three-state breaker: after `failure_threshold` consecutive failures
+# calls are short-circuited for `reset_seconds`, then a single trial call is
+# let through to decide whether to close again.
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> bool:
+        # Returns True when this call took the half-open trial slot; only
+        # that caller may release it.
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise CircuitOpen("AI upstream circuit is open")
+        if state == "half-open":
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        self._trial_in_flight = False
+
+
+# Built lazily by the first AI call; the openai SDK takes ~0.5s to import.
+client: AsyncOpenAI | None = None
+_configured = False
+breaker = CircuitBreaker(settings.ai_breaker_failure_threshold, settings.ai_breaker_reset_seconds)
+_semaphore: asyncio.Semaphore | None = None
+
+
+def configure_client(http_client: httpx.AsyncClient | None = None, api_key: str | None = None) -> AsyncOpenAI | None:
+    # Retries are handled here (with jitter and the breaker), so the SDK's own
+    # retry loop is turned off. Tests pass an httpx client with a MockTransport.
+    global client, _configured
+    _configured = True
+    api_key = api_key or settings.openai_api_key
+    if not api_key:
+        client = None
+        return None
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=settings.openai_base_url,
+        http_client=http_client,
+        max_retries=0,
+        timeout=settings.ai_call_timeout_seconds,
+    )
+    return client
+
+
+def get_client() -> AsyncOpenAI | None:
+    if not _configured and settings.openai_api_key:
+        configure_client()
+    return client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.ai_max_concurrency)
+    return _semaphore
+
+
+async def _call_upstream(operation: str, call: Callable[[], Awaitable[T]]) -> T:
+    trial = breaker.before_call()
+    attempts = max(settings.ai_max_attempts, 1)
+    try:
+        for attempt in range(1, attempts + 1):
+            try:
+                async with _get_semaphore():
+                    with openai_timer(operation):
+                        result = await asyncio.wait_for(call(), timeout=settings.ai_call_timeout_seconds)
+            except retryable_errors():
+                if attempt == attempts:
+                    breaker.record_failure()
+                    raise
+                # Full jitter: sleep somewhere in [0, base * 2^attempt).
+                await asyncio.sleep(random.uniform(0, settings.ai_retry_base_seconds * 2**attempt))
+            except openai_errors():
+                breaker.record_failure()
+                raise
+            else:
+                breaker.record_success()
+                return result
+        raise AssertionError("unreachable")
+    finally:
+        # Also frees the slot when the trial call was cancelled.
+        if trial:
+            breaker.release_trial()
+
+
+async def _complete(operation: str, prompt: str) -> str:
+    response = await _call_upstream(
+        operation,
+        lambda: get_client().responses.create(model=MODEL, input=[{"role": "user", "content": prompt}])
+    )
+    return response_text(response)
+
+
+async def _summary_from_openai(title: str, tags: List[str], transcript: str | None) -> dict | None:
+    try:
+        return parse_summary(await _complete("summary", summary_prompt(title, tags, transcript)))
+    except (*openai_errors(), CircuitOpen, asyncio.TimeoutError) as exc:
+        logger.warning("AI summary failed, using fallback: %s", exc)
+        return None
+
+
+async def _quiz_from_openai(topic: str, tags: List[str]) -> List[dict] | None:
+    try:
+        return parse_quiz(await _complete("quiz", quiz_prompt(topic, tags))) or None
+    except (*openai_errors(), CircuitOpen, asyncio.TimeoutError) as exc:
+        logger.warning("AI quiz failed, using fallback: %s", exc)
+        return None
+
+
+async def generate_summary(title: str, tags: List[str], transcript: str | None) -> dict:
+    if get_client():
+        key = make_key("summary", MODEL, title=title, tags=tags, transcript=transcript)
+        result = await ai_cache.aget_or_compute(key, "summary", lambda: _summary_from_openai(title, tags, transcript))
+        if result is not None:
+            return result
+    return _fallback_summary(title, tags, transcript)
+
+
+async def generate_quiz(topic: str, tags: List[str]) -> List[dict]:
+    if get_client():
+        key = make_key("quiz", MODEL, topic=topic, tags=tags)
+        questions = await ai_cache.aget_or_compute(key, "quiz", lambda: _quiz_from_openai(topic, tags))
+        if questions:
+            return questions
+    return _fallback_quiz(topic, tags)
+
+
+async def rerank_videos(recent_tags: List[str], videos: List[models.Video]) -> List[models.Video]:
+    if not get_client() or not recent_tags or not videos:
+        return videos
+    try:
+        return parse_rerank(await _complete("rerank", rerank_prompt(recent_tags, videos)), videos)
+    except (*openai_errors(), CircuitOpen, asyncio.TimeoutError) as exc:
+        logger.warning("AI rerank failed, keeping the ranked order: %s", exc)
+        return videos
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db import models
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PRUNE_EVERY = 100
+
+
+def make_key(kind: str, model: str, **inputs: Any) -> str:
+    raw = json.dumps([kind, model, inputs], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# Two-tier cache for generated AI content: a per-worker LRU in front of the
+# ai_cache_entries table. Concurrent misses for the same key are coalesced so
+# only one of them calls upstream; the rest wait for its result.
+class AICache:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        memory_entries: int = 1024,
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_rows: int = 100_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        # Values are (payload, upstream seconds it originally cost).
+        self.memory: TTLCache[str, tuple[Any, float]] = TTLCache(memory_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self._ainflight: dict[str, asyncio.Future] = {}
+        self._stores = 0
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    async def aget_or_compute(self, key: str, kind: str, compute: Callable[[], Awaitable[Any | None]]) -> Any | None:
+        # `compute` returns None when upstream failed; that is passed through
+        # to every waiter but never cached. The database tier runs in a worker
+        # thread so the loop is never blocked on it.
+        cached = self.memory.get(key)
+        if cached is not None:
+            self._record_hit("memory", cached[1])
+            return cached[0]
+
+        future = self._ainflight.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            stored = await asyncio.to_thread(self._load, key)
+            if stored is not None:
+                self.memory.set(key, stored)
+                self._record_hit("store", stored[1])
+                value = stored[0]
+            else:
+                started = time.perf_counter()
+                value = await compute()
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.misses += 1
+                    self.upstream_seconds += elapsed
+                if value is not None:
+                    self.memory.set(key, (value, elapsed))
+                    await asyncio.to_thread(self._save, key, kind, value, elapsed)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark it retrieved so an exception nobody waited for is not logged.
+            future.exception()
+            raise
+        finally:
+            self._ainflight.pop(key, None)
+
+    def _record_hit(self, tier: str, upstream_seconds: float) -> None:
+        with self._lock:
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.store_hits += 1
+            self.saved_seconds += upstream_seconds
+
+    def _load(self, key: str) -> tuple[Any, float] | None:
+        db = self.session_factory()
+        try:
+            entry = db.get(models.AICacheEntry, key)
+            if entry is None or entry.expires_at <= datetime.utcnow():
+                return None
+            return json.loads(entry.payload), entry.upstream_ms / 1000
+        except SQLAlchemyError:
+            logger.exception("AI cache lookup failed")
+            return None
+        finally:
+            db.close()
+
+    def _save(self, key: str, kind: str, value: Any, upstream_seconds: float) -> None:
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            db.merge(
+                models.AICacheEntry(
+                    key=key,
+                    kind=kind,
+                    payload=json.dumps(value),
+                    upstream_ms=int(upstream_seconds * 1000),
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                )
+            )
+            db.commit()
+            with self._lock:
+                self._stores += 1
+                prune = self._stores % PRUNE_EVERY == 0
+            if prune:
+                self._prune(db)
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("AI cache write failed")
+        finally:
+            db.close()
+
+    def _prune(self, db: Session) -> None:
+        table = models.AICacheEntry
+        db.execute(delete(table).where(table.expires_at <= datetime.utcnow()))
+        excess = db.execute(select(func.count()).select_from(table)).scalar() - self.max_rows
+        if excess > 0:
+            oldest = select(table.key).order_by(table.created_at).limit(excess).scalar_subquery()
+            db.execute(delete(table).where(table.key.in_(oldest)))
+        db.commit()
+
+    def clear(self) -> None:
+        self.memory.clear()
+        db = self.session_factory()
+        try:
+            db.execute(delete(models.AICacheEntry))
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.memory_hits + self.store_hits) / lookups if lookups else 0.0,
+            "upstream_seconds": round(self.upstream_seconds, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+            "memory_size": len(self.memory),
+        }
+
+
+ai_cache = AICache(
+    memory_entries=settings.ai_cache_memory_entries,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    max_rows=settings.ai_cache_max_rows,
+)
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Upper bound on pairs materialized at once while counting co-occurrences.
+PAIR_CHUNK = 4_000_000
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    video_ids: list[uuid.UUID]
+    index: dict[uuid.UUID, int]
+    # Item-item matrix in CSR form: row i holds the videos completed by the
+    # same users as video i and how many users completed both, keeping the
+    # strongest max_neighbors per row.
+    indptr: np.ndarray
+    neighbors: np.ndarray
+    counts: np.ndarray
+    # Users who completed each video.
+    completions: np.ndarray
+    # Each user's latest completions (video indexes, newest first), capped
+    # at max_history.
+    histories: dict[uuid.UUID, np.ndarray]
+
+
+@dataclass
+class Delta:
+    # Completions recorded since the snapshot was read, kept by id so videos
+    # the snapshot has never seen can still be recommended.
+    pairs: dict[uuid.UUID, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    completions: Counter = field(default_factory=Counter)
+    histories: dict[uuid.UUID, list[uuid.UUID]] = field(default_factory=lambda: defaultdict(list))
+    events: int = 0
+
+
+def _group_bounds(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Start offset and length of each run of equal keys in a sorted array.
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, np.int64)
+    sizes = np.diff(np.r_[starts, len(keys)])
+    return starts, sizes
+
+
+def _pair_counts(users: np.ndarray, items: np.ndarray, n_items: int) -> tuple[np.ndarray, np.ndarray]:
+    # Counts every unordered pair of items completed by the same user.
+    # Returns (i * n_items + j with i < j, count).
+    starts, sizes = _group_bounds(users)
+    rank = np.arange(len(items)) - np.repeat(starts, sizes)
+    # Each element pairs with the elements after it in its user's group.
+    fanout = np.repeat(sizes, sizes) - 1 - rank
+    ends = np.cumsum(fanout)
+    keys, counts = [], []
+    begin = 0
+    while begin < len(items):
+        stop = int(np.searchsorted(ends, (ends[begin - 1] if begin else 0) + PAIR_CHUNK, side="right"))
+        stop = max(stop, begin + 1)
+        chunk_fanout = fanout[begin:stop]
+        total = int(chunk_fanout.sum())
+        if total:
+            positions = np.repeat(np.arange(begin, stop), chunk_fanout)
+            offsets = np.arange(total) - np.repeat(np.cumsum(chunk_fanout) - chunk_fanout, chunk_fanout)
+            left, right = items[positions], items[positions + 1 + offsets]
+            pair_keys = np.minimum(left, right).astype(np.int64) * n_items + np.maximum(left, right)
+            unique, pair_counts = np.unique(pair_keys, return_counts=True)
+            keys.append(unique)
+            counts.append(pair_counts)
+        begin = stop
+    if not keys:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    if len(keys) == 1:
+        return keys[0], counts[0]
+    unique, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    return unique, np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+
+
+def build_snapshot(
+    rows: Iterable[tuple[uuid.UUID, uuid.UUID]], max_history: int, max_neighbors: int
+) -> Snapshot:
+    # `rows` are completed (user_id, video_id) pairs grouped by user, newest
+    # first within each user.
+    user_ids: list[uuid.UUID] = []
+    user_index: dict[uuid.UUID, int] = {}
+    video_ids: list[uuid.UUID] = []
+    index: dict[uuid.UUID, int] = {}
+    users, items = [], []
+    for user_id, video_id in rows:
+        user = user_index.get(user_id)
+        if user is None:
+            user = user_index[user_id] = len(user_ids)
+            user_ids.append(user_id)
+        item = index.get(video_id)
+        if item is None:
+            item = index[video_id] = len(video_ids)
+            video_ids.append(video_id)
+        users.append(user)
+        items.append(item)
+    users_array = np.asarray(users, dtype=np.int32)
+    items_array = np.asarray(items, dtype=np.int32)
+    n_items = len(video_ids)
+    completions = np.bincount(items_array, minlength=n_items).astype(np.float32)
+
+    # Only each user's latest max_history completions form pairs, which
+    # bounds the work per user however long their history is.
+    starts, sizes = _group_bounds(users_array)
+    keep = np.arange(len(items_array)) - np.repeat(starts, sizes) < max_history
+    users_array, items_array = users_array[keep], items_array[keep]
+    starts, sizes = _group_bounds(users_array)
+    histories = {user_ids[users_array[start]]: items_array[start : start + size] for start, size in zip(starts, sizes)}
+
+    keys, counts = _pair_counts(users_array, items_array, n_items)
+    first, second = np.divmod(keys, n_items)
+    rows_array = np.concatenate([first, second])
+    cols = np.concatenate([second, first])
+    counts = np.concatenate([counts, counts])
+
+    # Strongest neighbors first within each row, then cut each row.
+    order = np.lexsort((-counts, rows_array))
+    rows_array, cols, counts = rows_array[order], cols[order], counts[order]
+    row_starts = np.searchsorted(rows_array, np.arange(n_items))
+    keep = np.arange(len(rows_array)) - row_starts[rows_array] < max_neighbors
+    rows_array, cols, counts = rows_array[keep], cols[keep], counts[keep]
+    indptr = np.zeros(n_items + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows_array, minlength=n_items), out=indptr[1:])
+    return Snapshot(
+        video_ids=video_ids,
+        index=index,
+        indptr=indptr,
+        neighbors=cols.astype(np.int32),
+        counts=counts.astype(np.float32),
+        completions=completions,
+        histories=histories,
+    )
+
+
+# Item-item collaborative filtering over "completed together": a video scores
+# for a user by how often it was completed alongside the user's own recent
+# completions, cosine-normalized by both videos' popularity. The matrix is
+# rebuilt from the progress table in a background thread; completions in
+# between are applied incrementally to a small Delta that scoring adds in.
+class CoOccurrenceModel:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_history: int = 50,
+        max_neighbors: int = 100,
+        refresh_seconds: float = 900,
+        max_pending: int = 50_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_history = max_history
+        self.max_neighbors = max_neighbors
+        self.refresh_seconds = refresh_seconds
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._snapshot: Snapshot | None = None
+        self._built_at: float | None = None
+        # Deltas consulted by scoring; new completions go to the last one.
+        # While a rebuild runs, the one before it covers what the rebuild may
+        # not have read yet.
+        self._deltas: list[Delta] = [Delta()]
+        self._building: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def _needs_rebuild(self) -> bool:
+        if self._building is not None:
+            return False
+        if self._built_at is None:
+            return True
+        if self.refresh_seconds and time.monotonic() - self._built_at > self.refresh_seconds:
+            return True
+        return self._deltas[-1].events >= self.max_pending
+
+    def ensure_fresh(self) -> None:
+        # Never blocks a request: the rebuild runs in the background and
+        # callers keep using the previous snapshot (or none) meanwhile.
+        with self._lock:
+            if not self._needs_rebuild():
+                return
+            self._deltas.append(Delta())
+            self._building = threading.Thread(target=self._rebuild_in_background, name="cooccurrence-build", daemon=True)
+            self._building.start()
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            with self.session_factory() as db:
+                snapshot = self.build(db)
+        except Exception:
+            logger.exception("Rebuilding the co-occurrence model failed")
+            with self._lock:
+                # Fold the retired delta back so its completions still count.
+                old, current = self._deltas[0], self._deltas[-1]
+                for video_id, row in current.pairs.items():
+                    old.pairs[video_id].update(row)
+                old.completions.update(current.completions)
+                for user_id, videos in current.histories.items():
+                    old.histories[user_id].extend(videos)
+                old.events += current.events
+                self._deltas = [old]
+                self._building = None
+                # Back off for a full interval rather than retrying per request.
+                self._built_at = time.monotonic()
+            return
+        with self._lock:
+            self._snapshot = snapshot
+            self._deltas = [self._deltas[-1]]
+            self._built_at = time.monotonic()
+            self._building = None
+
+    def build(self, db: Session) -> Snapshot:
+        statement = (
+            select(models.Progress.user_id, models.Progress.video_id)
+            .where(models.Progress.completed.is_(True))
+            .order_by(models.Progress.user_id, models.Progress.updated_at.desc())
+        )
+        started = time.perf_counter()
+        snapshot = build_snapshot(db.execute(statement), self.max_history, self.max_neighbors)
+        logger.info(
+            "Co-occurrence model: %d videos, %d pairs in %.2fs",
+            len(snapshot.video_ids),
+            len(snapshot.neighbors),
+            time.perf_counter() - started,
+        )
+        return snapshot
+
+    def load(self, db: Session) -> None:
+        # Synchronous rebuild, for scripts and benchmarks.
+        snapshot = self.build(db)
+        with self._lock:
+            self._snapshot = snapshot
+            self._deltas = [Delta()]
+            self._built_at = time.monotonic()
+
+    def _recent(self, user_id: uuid.UUID) -> list[uuid.UUID]:
+        recent: list[uuid.UUID] = []
+        for delta in reversed(self._deltas):
+            recent.extend(reversed(delta.histories.get(user_id, ())))
+        snapshot = self._snapshot
+        if snapshot is not None and user_id in snapshot.histories:
+            recent.extend(snapshot.video_ids[item] for item in snapshot.histories[user_id])
+        return recent[: self.max_history]
+
+    def record(self, user_id: uuid.UUID, video_ids: Iterable[uuid.UUID]) -> None:
+        # Called once completions are committed. Each new completion pairs
+        # with the user's recent ones, as the rebuild would pair them.
+        with self._lock:
+            if self._snapshot is None and self._building is None and self._built_at is None:
+                # Nothing built yet; the first build reads these from the table.
+                return
+            delta = self._deltas[-1]
+            recent = self._recent(user_id)
+            for video_id in dict.fromkeys(video_ids):
+                if video_id in recent:
+                    continue
+                for other in recent:
+                    delta.pairs[video_id][other] += 1
+                    delta.pairs[other][video_id] += 1
+                delta.completions[video_id] += 1
+                delta.histories[user_id].append(video_id)
+                delta.events += 1
+                recent.insert(0, video_id)
+                del recent[self.max_history :]
+
+    def recommend(self, history: Sequence[uuid.UUID], exclude: Iterable[uuid.UUID], limit: int) -> list[uuid.UUID]:
+        # `history` is the user's completions, newest first. Returns up to
+        # `limit` video ids by descending score, none of them in `exclude`.
+        snapshot = self._snapshot
+        if snapshot is None or limit <= 0 or not history:
+            return []
+        history = list(history[: self.max_history])
+        # Delta rows touching the history, with delta-adjusted popularity for
+        # every video they mention. This work is bounded by the history, not by
+        # how many completions are pending. The vectorized part below keeps the
+        # snapshot's popularity until the next rebuild.
+        unseen: dict[uuid.UUID, float] = defaultdict(float)
+        boosts: list[tuple[int, float]] = []
+        with self._lock:
+            deltas = list(self._deltas)
+
+            def popularity(video_id: uuid.UUID) -> float:
+                item = snapshot.index.get(video_id)
+                count = float(snapshot.completions[item]) if item is not None else 0.0
+                return count + sum(delta.completions.get(video_id, 0) for delta in deltas)
+
+            for source in history:
+                for delta in deltas:
+                    row = delta.pairs.get(source)
+                    if not row:
+                        continue
+                    source_count = popularity(source)
+                    for video_id, count in row.items():
+                        weight = count / math.sqrt(max(source_count * popularity(video_id), 1.0))
+                        item = snapshot.index.get(video_id)
+                        if item is None:
+                            unseen[video_id] += weight
+                        else:
+                            boosts.append((item, weight))
+
+        n_items = len(snapshot.video_ids)
+        rows = np.asarray([snapshot.index[video_id] for video_id in history if video_id in snapshot.index], dtype=np.int64)
+        starts, ends = snapshot.indptr[rows], snapshot.indptr[rows + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        cols = snapshot.neighbors[positions]
+        sources = np.repeat(rows, lengths)
+        completions = snapshot.completions
+        weights = snapshot.counts[positions] / np.sqrt(completions[sources] * completions[cols])
+        scores = np.bincount(cols, weights=weights, minlength=n_items)
+        for item, weight in boosts:
+            scores[item] += weight
+
+        excluded = set(exclude)
+        excluded.update(history)
+        for video_id in excluded:
+            item = snapshot.index.get(video_id)
+            if item is not None:
+                scores[item] = 0
+            unseen.pop(video_id, None)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        best = [(float(scores[item]), -int(item), snapshot.video_ids[item]) for item in candidates]
+        best += [(score, -n_items, video_id) for video_id, score in unseen.items()]
+        return [video_id for _, _, video_id in heapq.nlargest(limit, best)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._built_at = None
+            self._deltas = [Delta()]
+
+
+cooccurrence_model = CoOccurrenceModel(
+    max_history=settings.recommendation_cf_max_history,
+    max_neighbors=settings.recommendation_cf_max_neighbors,
+    refresh_seconds=settings.recommendation_cf_refresh_seconds,
+    max_pending=settings.recommendation_cf_max_pending,
+)
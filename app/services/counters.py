@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.response_cache import response_cache, video_tag
+from app.services.trending import record_activity
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FIELDS = ("views", "likes")
+
+
+# Write-behind buffer for video view/like counters. Events are summed per video
+# in memory and applied by a background thread as one executemany of
+# ``UPDATE videos SET views = views + :delta ...``, so increments are never lost
+# to read-modify-write races and hot rows see one write per flush.
+class CounterBuffer:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = 1.0,
+        max_pending: int = 1000,
+        max_known: int = 100_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_known = max_known
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[uuid.UUID, list[int]] = {}
+        self._pending_events = 0
+        # Best-known totals: last value read from the database plus everything
+        # buffered since. LRU-bounded so it doesn't grow with the catalog; an
+        # evicted video is simply read again on its next increment.
+        self._known: OrderedDict[uuid.UUID, list[int]] = OrderedDict()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending_events(self) -> int:
+        return self._pending_events
+
+    def increment(self, db: Session, video_id: uuid.UUID, field: str, amount: int = 1) -> tuple[int, int] | None:
+        index = FIELDS.index(field)
+        with self._lock:
+            known = self._known.get(video_id)
+        if known is None:
+            row = db.query(models.Video.views, models.Video.likes).filter(models.Video.id == video_id).first()
+            if row is None:
+                return None
+            with self._lock:
+                known = self._known.get(video_id)
+                if known is None:
+                    # Deltas still buffered aren't in the database yet.
+                    pending = self._pending.get(video_id, (0, 0))
+                    known = self._remember(video_id, [(row.views or 0) + pending[0], (row.likes or 0) + pending[1]])
+
+        with self._lock:
+            if video_id in self._known:
+                self._known.move_to_end(video_id)
+            known[index] += amount
+            pending = self._pending.setdefault(video_id, [0, 0])
+            pending[index] += amount
+            self._pending_events += 1
+            totals = (known[0], known[1])
+            should_flush = self._pending_events >= self.max_pending
+
+        if should_flush:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+        return totals
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                flushed_events, self._pending_events = self._pending_events, 0
+            if not batch:
+                return 0
+
+            table = models.Video.__table__
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam("video_id"))
+                .values(
+                    views=func.coalesce(table.c.views, 0) + bindparam("delta_views"),
+                    likes=func.coalesce(table.c.likes, 0) + bindparam("delta_likes"),
+                )
+            )
+            params = [
+                {"video_id": video_id, "delta_views": deltas[0], "delta_likes": deltas[1]}
+                for video_id, deltas in batch.items()
+            ]
+            db = self.session_factory()
+            try:
+                try:
+                    db.execute(statement, params)
+                    record_activity(db, batch, datetime.utcnow())
+                    fresh = db.execute(
+                        select(table.c.id, table.c.views, table.c.likes).where(table.c.id.in_(list(batch)))
+                    ).all()
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    self._requeue(batch, flushed_events)
+                    raise
+                response_cache.invalidate(db, *(video_tag(video_id) for video_id in batch))
+            finally:
+                db.close()
+            # Re-sync best-known totals with the database so increments made by
+            # other workers show up, keeping anything buffered during the flush.
+            with self._lock:
+                for video_id, views, likes in fresh:
+                    if video_id in self._known:
+                        pending = self._pending.get(video_id, (0, 0))
+                        self._known[video_id] = [(views or 0) + pending[0], (likes or 0) + pending[1]]
+            return flushed_events
+
+    def _remember(self, video_id: uuid.UUID, totals: list[int]) -> list[int]:
+        # Caller holds self._lock.
+        self._known[video_id] = totals
+        while len(self._known) > self.max_known:
+            self._known.popitem(last=False)
+        return totals
+
+    def _requeue(self, batch: dict[uuid.UUID, list[int]], events: int) -> None:
+        with self._lock:
+            for video_id, deltas in batch.items():
+                pending = self._pending.setdefault(video_id, [0, 0])
+                pending[0] += deltas[0]
+                pending[1] += deltas[1]
+            self._pending_events += events
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="counter-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush video counters; will retry")
+
+
+counter_buffer = CounterBuffer(
+    flush_interval=settings.counter_flush_interval_seconds,
+    max_pending=settings.counter_flush_max_pending,
+    max_known=settings.counter_known_max_entries,
+)
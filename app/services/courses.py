@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import uuid
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from app.db import models
+
+
+# Shared by the sync and async course routers.
+def parse_video_ids(raw_ids: Iterable[str]) -> list[uuid.UUID]:
+    # dict.fromkeys keeps the first position of any repeated video. Raises
+    # ValueError for ids that aren't UUIDs.
+    return list(dict.fromkeys(uuid.UUID(video_id) for video_id in raw_ids))
+
+
+def existing_videos_statement(video_ids: list[uuid.UUID]):
+    return select(models.Video.id).where(models.Video.id.in_(video_ids))
+
+
+def build_course(creator_id: uuid.UUID, title: str, description: str | None, video_ids: list[uuid.UUID]) -> models.MicroCourse:
+    return models.MicroCourse(
+        creator_id=creator_id,
+        title=title,
+        description=description,
+        course_videos=[
+            models.CourseVideo(video_id=video_id, position=position) for position, video_id in enumerate(video_ids)
+        ],
+    )
+
+
+def course_statement(course_id: uuid.UUID, expand_videos: bool = False):
+    statement = select(models.MicroCourse).where(models.MicroCourse.id == course_id)
+    if expand_videos:
+        # Course, ordered entries and videos in a single joined SELECT.
+        statement = statement.options(
+            joinedload(models.MicroCourse.course_videos).joinedload(models.CourseVideo.video)
+        )
+    return statement
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import re
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+MAX_RANGES = 16
+CONTENT_ADDRESSED = re.compile(r"[0-9a-f]{64}")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header: str, size: int) -> list[tuple[int, int]]:
+    # Returns inclusive (start, end) byte ranges. An empty list means the header
+    # should be ignored and the whole file served, as RFC 9110 allows for
+    # malformed or unsupported range requests.
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return []
+
+    ranges: list[tuple[int, int]] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        if not sep:
+            return []
+        try:
+            if not first.strip():
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last.strip() else max(start, size - 1)
+                if start < 0 or end < start:
+                    return []
+                end = min(end, size - 1)
+        except ValueError:
+            return []
+        if start >= size:
+            continue
+        ranges.append((start, end))
+
+    if len(ranges) > MAX_RANGES:
+        return []
+    if not ranges:
+        raise RangeNotSatisfiable(f"bytes */{size}")
+    return ranges
+
+
+def file_etag(path: str, stat_result: os.stat_result) -> tuple[str, bool]:
+    # Uploaded videos are named by their SHA-256, which makes a strong ETag and
+    # lets them be cached forever. Anything else falls back to size + mtime.
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if CONTENT_ADDRESSED.fullmatch(stem):
+        return f'"{stem}"', True
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"', False
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    # Weak comparison, as required for If-None-Match.
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def if_range_allows(header: str | None, etag: str, stat_result: os.stat_result) -> bool:
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith(('"', "W/")):
+        return header == etag and not etag.startswith("W/")
+    try:
+        return int(parsedate_to_datetime(header).timestamp()) >= int(stat_result.st_mtime)
+    except (TypeError, ValueError):
+        return False
+
+
+class VideoFileResponse(Response):
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, stat_result: os.stat_result, request_headers: Headers) -> None:
+        self.path = path
+        self.background = None
+        self.media_type = guess_type(path)[0] or "application/octet-stream"
+        size = stat_result.st_size
+        etag, immutable = file_etag(path, stat_result)
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": "public, max-age=31536000, immutable" if immutable else "public, max-age=3600",
+        }
+        # Each part is (preamble, start, end); preamble is only used for
+        # multipart/byteranges responses.
+        self.parts: list[tuple[bytes, int, int]] = []
+        self.epilogue = b""
+
+        ranges: list[tuple[int, int]] = []
+        self.status_code = 200
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            self.status_code = 304
+        elif request_headers.get("range") and if_range_allows(request_headers.get("if-range"), etag, stat_result):
+            try:
+                ranges = parse_range_header(request_headers["range"], size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+                headers["content-range"] = f"bytes */{size}"
+                headers["content-length"] = "0"
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            headers["content-length"] = str(end - start + 1)
+            self.parts = [(b"", start, end)]
+        elif ranges:
+            self.status_code = 206
+            boundary = uuid.uuid4().hex
+            part_type = self.media_type
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+            length = 0
+            for start, end in ranges:
+                preamble = (
+                    f"\r\n--{boundary}\r\n"
+                    f"Content-Type: {part_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode("latin-1")
+                self.parts.append((preamble, start, end))
+                length += len(preamble) + end - start + 1
+            self.epilogue = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            headers["content-length"] = str(length + len(self.epilogue))
+        elif self.status_code == 200:
+            headers["content-length"] = str(size)
+            if size:
+                self.parts = [(b"", 0, size - 1)]
+
+        if self.status_code in (304, 416):
+            self.media_type = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or not self.parts:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if self.status_code == 200 and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        zerocopy = "http.response.zerocopysend" in extensions
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for preamble, start, end in self.parts:
+                if preamble:
+                    await send({"type": "http.response.body", "body": preamble, "more_body": True})
+                if zerocopy:
+                    # Let the server sendfile() the range straight from the page cache.
+                    await send(
+                        {
+                            "type": "http.response.zerocopysend",
+                            "file": file.wrapped,
+                            "offset": start,
+                            "count": end - start + 1,
+                            "more_body": True,
+                        }
+                    )
+                    continue
+                await file.seek(start)
+                remaining = end - start + 1
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from app.core.metrics import registry
+from app.db import session as db_session
+from app.db.deps import principal_cache, token_cache
+from app.services import ai_async
+from app.services.ai_cache import ai_cache
+from app.services.counters import counter_buffer
+from app.services.response_cache import response_cache
+
+
+def _cache_stats() -> dict[str, dict]:
+    ai_stats = ai_cache.stats()
+    return {
+        "auth_token": token_cache.stats(),
+        "auth_principal": principal_cache.stats(),
+        "response": response_cache.stats(),
+        "ai": {
+            "hits": ai_stats["memory_hits"] + ai_stats["store_hits"],
+            "misses": ai_stats["misses"],
+            "size": ai_stats["memory_size"],
+        },
+    }
+
+
+def _cache_samples(field: str):
+    return [({"cache": name}, stats[field]) for name, stats in _cache_stats().items()]
+
+
+def _pool_samples():
+    pool = db_session.engine.pool
+    # Only QueuePool-style pools track checkouts.
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [({"state": "checked_out"}, pool.checkedout()), ({"state": "idle"}, pool.checkedin())]
+
+
+def register_collectors() -> None:
+    # Stats the caches and buffers already keep, read on every scrape.
+    registry.collector("app_cache_hits_total", "Cache lookups answered from the cache.", "counter", lambda: _cache_samples("hits"))
+    registry.collector("app_cache_misses_total", "Cache lookups that missed.", "counter", lambda: _cache_samples("misses"))
+    registry.collector("app_cache_entries", "Entries currently held in memory.", "gauge", lambda: _cache_samples("size"))
+    registry.collector(
+        "ai_cache_store_hits_total",
+        "AI cache hits served from ai_cache_entries rather than memory.",
+        "counter",
+        lambda: [({}, ai_cache.store_hits)],
+    )
+    registry.collector(
+        "ai_cache_coalesced_total",
+        "AI requests that waited on an identical in-flight upstream call.",
+        "counter",
+        lambda: [({}, ai_cache.coalesced)],
+    )
+    registry.collector(
+        "ai_cache_saved_seconds_total",
+        "Upstream time avoided by AI cache hits.",
+        "counter",
+        lambda: [({}, ai_cache.saved_seconds)],
+    )
+    registry.collector(
+        "ai_circuit_open",
+        "1 while the AI upstream circuit breaker is open.",
+        "gauge",
+        lambda: [({}, int(ai_async.breaker.state == "open"))],
+    )
+    registry.collector(
+        "counter_buffer_pending_events",
+        "View/like events buffered but not yet written.",
+        "gauge",
+        lambda: [({}, counter_buffer.pending_events)],
+    )
+    registry.collector("db_pool_connections", "Connections in the sync engine's pool.", "gauge", _pool_samples)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import and_, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.upserts import dialect_insert
+from app.schemas import progress as progress_schema
+
+settings = get_settings()
+
+
+def upsert_statement(db: Session, events: Iterable[progress_schema.ProgressUpdate]):
+    # One INSERT ... ON CONFLICT (user_id, video_id) DO UPDATE for the whole
+    # batch. A statement may not touch the same row twice, so only the last
+    # event per (user, video) is kept.
+    insert = dialect_insert(db)
+    now = datetime.utcnow()
+    latest = {(event.user_id, event.video_id): event for event in events}
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": event.user_id,
+            "course_id": event.course_id,
+            "video_id": event.video_id,
+            "completed": event.completed,
+            "updated_at": now,
+        }
+        for event in latest.values()
+    ]
+    statement = insert(models.Progress).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[models.Progress.user_id, models.Progress.video_id],
+        set_={"completed": statement.excluded.completed, "updated_at": statement.excluded.updated_at},
+    )
+
+
+def completed_video_ids(events: Iterable[progress_schema.ProgressUpdate]) -> list[uuid.UUID]:
+    # Like the upsert, only the last event per video counts.
+    latest = {event.video_id: event.completed for event in events}
+    return [video_id for video_id, completed in latest.items() if completed]
+
+
+def _completed_count():
+    return func.count(models.Progress.id).filter(models.Progress.completed.is_(True))
+
+
+def course_progress_statement(user_id: uuid.UUID, course_id: uuid.UUID):
+    # completed/total for one course in a single aggregate, measured against
+    # the course's own video list rather than whichever rows happen to exist.
+    return (
+        select(func.count(models.CourseVideo.video_id).label("total"), _completed_count().label("completed"))
+        .select_from(models.MicroCourse)
+        .outerjoin(models.CourseVideo, models.CourseVideo.course_id == models.MicroCourse.id)
+        .outerjoin(
+            models.Progress,
+            and_(models.Progress.user_id == user_id, models.Progress.video_id == models.CourseVideo.video_id),
+        )
+        .where(models.MicroCourse.id == course_id)
+        .group_by(models.MicroCourse.id)
+    )
+
+
+def course_progress_rows(user_id: uuid.UUID | None = None, course_id: uuid.UUID | None = None):
+    # (user_id, course_id, completed, total) for every course a user has
+    # progress in, grouped in the database.
+    totals = (
+        select(models.CourseVideo.course_id, func.count().label("total"))
+        .group_by(models.CourseVideo.course_id)
+        .subquery()
+    )
+    statement = (
+        select(
+            models.Progress.user_id,
+            models.CourseVideo.course_id,
+            _completed_count().label("completed"),
+            totals.c.total,
+        )
+        .select_from(models.Progress)
+        .join(models.CourseVideo, models.CourseVideo.video_id == models.Progress.video_id)
+        .join(totals, totals.c.course_id == models.CourseVideo.course_id)
+        .group_by(models.Progress.user_id, models.CourseVideo.course_id, totals.c.total)
+    )
+    if user_id is not None:
+        statement = statement.where(models.Progress.user_id == user_id)
+    if course_id is not None:
+        statement = statement.where(models.CourseVideo.course_id == course_id)
+    return statement
+
+
+def refresh_course_summaries(db: Session, user_id: uuid.UUID | None = None, video_ids=None, course_id=None) -> None:
+    # Recompute course_progress_summaries rows touched by a progress write (a
+    # user + the videos they reported) or by a new course, as one
+    # INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+    if not settings.maintain_course_progress_summaries:
+        return
+    source = course_progress_rows(user_id=user_id, course_id=course_id)
+    if video_ids is not None:
+        touched = select(models.CourseVideo.course_id).where(models.CourseVideo.video_id.in_(list(video_ids)))
+        source = source.where(models.CourseVideo.course_id.in_(touched))
+    source = source.add_columns(literal(datetime.utcnow()).label("updated_at"))
+
+    table = models.CourseProgressSummary.__table__
+    statement = dialect_insert(db)(table).from_select(
+        ["user_id", "course_id", "completed", "total", "updated_at"], source
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.course_id],
+        set_={
+            "completed": statement.excluded.completed,
+            "total": statement.excluded.total,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    db.execute(statement)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+
+settings = get_settings()
+
+
+def trend_score(views: int | None, likes: int | None) -> float:
+    return ((views or 0) * 0.001) + ((likes or 0) * 0.01)
+
+
+# In-process tag -> video id postings with precomputed trend scores. Ranking
+# matches the original full-scan scorer (tag overlap + trend score), with ties
+# broken by the order videos were first seen.
+class RecommendationIndex:
+    def __init__(self, refresh_seconds: float = 0) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._loaded_at: float | None = None
+        self._postings: dict[str, set[uuid.UUID]] = defaultdict(set)
+        self._tags: dict[uuid.UUID, frozenset[str]] = {}
+        self._trend: dict[uuid.UUID, float] = {}
+        self._seq: dict[uuid.UUID, int] = {}
+        # Sorted by (-trend, seq) so non-matching videos can be walked best-first.
+        self._by_trend: list[tuple[float, int, uuid.UUID]] = []
+
+    def __len__(self) -> int:
+        return len(self._seq)
+
+    def _is_stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return bool(self.refresh_seconds) and time.monotonic() - self._loaded_at > self.refresh_seconds
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._is_stale():
+            self.load(db)
+
+    def load(self, db: Session) -> None:
+        rows = db.query(models.Video.id, models.Video.views, models.Video.likes).all()
+        tags: dict[uuid.UUID, list[str]] = defaultdict(list)
+        for video_id, name in db.query(models.VideoTag.video_id, models.Tag.name).join(models.Tag):
+            tags[video_id].append(name)
+        with self._lock:
+            self._clear()
+            for video_id, views, likes in rows:
+                self._upsert(video_id, tags.get(video_id, ()), trend_score(views, likes))
+            self._loaded_at = time.monotonic()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+            self._loaded_at = None
+
+    def _clear(self) -> None:
+        self._postings.clear()
+        self._tags.clear()
+        self._trend.clear()
+        self._seq.clear()
+        self._by_trend.clear()
+
+    def add_video(self, video: models.Video) -> None:
+        self.upsert(video.id, video.tags, video.views, video.likes)
+
+    def upsert(self, video_id: uuid.UUID, tags: Iterable[str], views: int | None, likes: int | None) -> None:
+        with self._lock:
+            if self._loaded_at is None:
+                # Not loaded yet; the first query will pick this video up from the database.
+                return
+            self._upsert(video_id, tags, trend_score(views, likes))
+
+    def update_counts(self, video_id: uuid.UUID, views: int | None, likes: int | None) -> None:
+        with self._lock:
+            if video_id not in self._seq:
+                return
+            self._set_trend(video_id, trend_score(views, likes))
+
+    def _upsert(self, video_id: uuid.UUID, tags: Iterable[str], score: float) -> None:
+        normalized = frozenset(tag.lower() for tag in tags)
+        for tag in self._tags.get(video_id, frozenset()) - normalized:
+            postings = self._postings[tag]
+            postings.discard(video_id)
+            if not postings:
+                del self._postings[tag]
+        for tag in normalized:
+            self._postings[tag].add(video_id)
+        self._tags[video_id] = normalized
+
+        if video_id not in self._seq:
+            self._seq[video_id] = len(self._seq)
+            self._trend[video_id] = score
+            bisect.insort(self._by_trend, (-score, self._seq[video_id], video_id))
+        else:
+            self._set_trend(video_id, score)
+
+    def _set_trend(self, video_id: uuid.UUID, score: float) -> None:
+        seq = self._seq[video_id]
+        old = self._trend[video_id]
+        if old == score:
+            return
+        position = bisect.bisect_left(self._by_trend, (-old, seq))
+        del self._by_trend[position]
+        self._trend[video_id] = score
+        bisect.insort(self._by_trend, (-score, seq, video_id))
+
+    def top_k(self, recent_tags: Iterable[str], limit: int) -> List[uuid.UUID]:
+        if limit <= 0:
+            return []
+        with self._lock:
+            overlap: dict[uuid.UUID, int] = defaultdict(int)
+            for tag in {tag.lower() for tag in recent_tags}:
+                for video_id in self._postings.get(tag, ()):
+                    overlap[video_id] += 1
+
+            entries = [
+                (count + self._trend[video_id], -self._seq[video_id], video_id)
+                for video_id, count in overlap.items()
+            ]
+            # Videos without any tag overlap score on trend alone, so the best of
+            # them are simply the first ``limit`` entries in trend order.
+            remaining = limit
+            for neg_trend, seq, video_id in self._by_trend:
+                if not remaining:
+                    break
+                if video_id in overlap:
+                    continue
+                entries.append((-neg_trend, -seq, video_id))
+                remaining -= 1
+
+            return [video_id for _, _, video_id in heapq.nlargest(limit, entries)]
+
+
+recommendation_index = RecommendationIndex(refresh_seconds=settings.recommendation_index_refresh_seconds)
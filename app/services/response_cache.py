@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Iterable, NamedTuple
+
+from fastapi import Request, Response
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db import models
+
+settings = get_settings()
+
+PRUNE_EVERY = 1000
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    tags: tuple[str, ...]
+    version: int
+
+
+def video_tag(video_id: Any) -> str:
+    return f"video:{video_id}"
+
+
+def course_tag(course_id: Any) -> str:
+    return f"course:{course_id}"
+
+
+def creator_courses_tag(creator_id: Any) -> str:
+    return f"creator-courses:{creator_id}"
+
+
+# Serialized JSON bodies for hot read endpoints, keyed by route and tagged with
+# the rows they were built from. The bodies live in each worker, but
+# invalidations go to the shared response_cache_invalidations log, and every
+# lookup checks an entry's tags against it, so a write on any worker is seen
+# by all of them on their next request. Entries remember the log position read
+# before their rows were loaded, which also covers a read that started before
+# a write committed but finished after it.
+class ResponseCache:
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.ttl = ttl
+        self.entries: TTLCache[str, CachedBody] = TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self._invalidations = 0
+
+    def lookup(self, db: Session, key: str) -> tuple[CachedBody | None, int]:
+        # Returns the entry if it is still valid, and the log position to pass
+        # to store() when the caller has to build the body itself. Both come
+        # from one indexed query.
+        table = models.ResponseCacheInvalidation.__table__
+        latest = select(func.max(table.c.id)).scalar_subquery()
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, db.scalar(select(latest)) or 0
+        touched = select(func.max(table.c.id)).where(table.c.tag.in_(entry.tags)).scalar_subquery()
+        position, last_touched = db.execute(select(latest, touched)).one()
+        if last_touched is not None and last_touched > entry.version:
+            self.entries.pop(key)
+            return None, position or 0
+        return entry, position or 0
+
+    def store(self, key: str, body: bytes, tags: Iterable[str], since: int) -> CachedBody:
+        entry = CachedBody(body, make_etag(body), (key, *tags), since)
+        self.entries.set(key, entry)
+        return entry
+
+    def invalidate(self, db: Session, *tags: str) -> None:
+        # Runs in its own transaction after the write has committed, so its
+        # ids are larger than any position a reader of the old rows saw.
+        if not tags:
+            return
+        table = models.ResponseCacheInvalidation.__table__
+        now = datetime.utcnow()
+        db.execute(insert(table), [{"tag": tag, "created_at": now} for tag in tags])
+        with self._lock:
+            self._invalidations += 1
+            prune = self._invalidations % PRUNE_EVERY == 0
+        if prune:
+            # Entries older than the TTL are gone from every worker, so older
+            # rows can no longer reject anything; the margin absorbs clock skew.
+            db.execute(delete(table).where(table.c.created_at < now - timedelta(seconds=2 * self.ttl)))
+        db.commit()
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        return {**self.entries.stats(), "invalidations": self._invalidations}
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def cached_response(request: Request, entry: CachedBody) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(settings.response_cache_max_entries, settings.response_cache_ttl_seconds)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import re
+import uuid
+
+from sqlalchemy import and_, column, func, literal_column, or_, select, table
+
+from app.db import models
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+MAX_TERMS = 8
+SNIPPET_TOKENS = 16
+HIGHLIGHT = ("<mark>", "</mark>")
+# BM25 column weights for title, description, transcript.
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+videos_fts = table("videos_fts", column("rowid"))
+
+
+class SearchUnavailable(Exception):
+    pass
+
+
+def query_terms(q: str) -> list[str]:
+    # Only word characters reach the index, so user input can never be parsed
+    # as FTS5 / tsquery syntax.
+    return TOKEN.findall(q.lower())[:MAX_TERMS]
+
+
+def _fts5_query(terms: list[str]) -> str:
+    # All terms must match; the last one is a prefix so results show up while
+    # the user is still typing.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _tsquery(terms: list[str]) -> str:
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+
+def _sqlite_search(terms: list[str]):
+    fts = literal_column("videos_fts")
+    # bm25() is lower-is-better, which is the order the cursor walks.
+    score = func.bm25(fts, *FTS_WEIGHTS)
+    snippet = func.snippet(fts, -1, HIGHLIGHT[0], HIGHLIGHT[1], "…", SNIPPET_TOKENS)
+    statement = (
+        select(models.Video, score.label("score"), snippet.label("snippet"))
+        .select_from(videos_fts)
+        .join(models.Video, literal_column("videos.rowid") == videos_fts.c.rowid)
+        .where(fts.op("MATCH")(_fts5_query(terms)))
+    )
+    return statement, score
+
+
+def _postgres_search(terms: list[str]):
+    vector = literal_column("videos.search_vector")
+    query = func.to_tsquery("english", _tsquery(terms))
+    # Negated so that, as with bm25(), lower is better.
+    score = -func.ts_rank_cd(vector, query)
+    document = func.concat_ws(" ", models.Video.title, models.Video.description, models.Video.transcript)
+    options = f"StartSel={HIGHLIGHT[0]}, StopSel={HIGHLIGHT[1]}, MaxWords={SNIPPET_TOKENS}, MinWords=5, MaxFragments=1"
+    snippet = func.ts_headline("english", document, query, options)
+    statement = (
+        select(models.Video, score.label("score"), snippet.label("snippet"))
+        .where(vector.op("@@")(query))
+    )
+    return statement, score
+
+
+DIALECT_SEARCH = {"sqlite": _sqlite_search, "postgresql": _postgres_search}
+
+
+def search_statement(dialect: str, q: str, limit: int, cursor: str | None = None):
+    # Returns None when the query has no searchable terms. Fetches one row past
+    # the page; see search_page.
+    build = DIALECT_SEARCH.get(dialect)
+    if build is None:
+        raise SearchUnavailable(f"Full-text search is not supported on {dialect}")
+    terms = query_terms(q)
+    if not terms:
+        return None
+    statement, score = build(terms)
+    if cursor:
+        try:
+            last_score, last_id = decode_cursor(cursor, 2)
+            last_score, last_id = float(last_score), uuid.UUID(last_id)
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursor("Malformed cursor") from exc
+        statement = statement.where(
+            or_(score > last_score, and_(score == last_score, models.Video.id > last_id))
+        )
+    return statement.order_by(score, models.Video.id).limit(limit + 1)
+
+
+def search_page(rows, limit: int) -> dict:
+    items = [{"video": video, "score": -score, "snippet": snippet} for video, score, snippet in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        video, score, _ = rows[limit - 1]
+        next_cursor = encode_cursor(score, str(video.id))
+    return {"items": items, "next_cursor": next_cursor}
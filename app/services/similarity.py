@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.session import SessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "storage", "similarity"))
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]{2,}")
+STOP_WORDS = frozenset(
+    "a an and are as at be by can for from how in into is it its of on or so that the this to was what when "
+    "why with you your".split()
+)
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+TAG_WEIGHT = 3
+
+# Videos featurized per pass when building, and matrix rows scored per
+# matrix-vector product when querying; both bound the scratch memory.
+BUILD_CHUNK = 10_000
+SCORE_BLOCK = 65_536
+MIN_CAPACITY = 1024
+UUID_BYTES = 16
+
+
+def _terms(text: str | None) -> list[str]:
+    return [term for term in TOKEN_PATTERN.findall((text or "").lower()) if term not in STOP_WORDS]
+
+
+def document_features(title: str | None, description: str | None, tags: Iterable[str]) -> Counter:
+    # Word unigrams and bigrams per field, whole tags, and the words of
+    # hyphenated tags so "python-basics" also matches a title about Python.
+    features: Counter = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+        terms = _terms(text)
+        for term in terms:
+            features[term] += weight
+        for first, second in zip(terms, terms[1:]):
+            features[f"{first} {second}"] += weight
+    for tag in tags:
+        features[f"#{tag}"] += TAG_WEIGHT
+        for part in _terms(tag.replace("-", " ")):
+            features[part] += DESCRIPTION_WEIGHT
+    return features
+
+
+def hashed_features(features: Counter, dimensions: int) -> tuple[np.ndarray, np.ndarray]:
+    # Signed feature hashing: colliding features cancel out on average instead
+    # of piling up. crc32 keeps bucket assignment stable across processes.
+    buckets: dict[int, int] = defaultdict(int)
+    for feature, count in features.items():
+        digest = zlib.crc32(feature.encode())
+        buckets[digest % dimensions] += count if digest & 0x80000000 else -count
+    columns = np.fromiter((b for b, v in buckets.items() if v), dtype=np.int32)
+    values = np.fromiter((v for v in buckets.values() if v), dtype=np.float32)
+    # Sublinear term frequency, keeping the hash sign.
+    return columns, np.sign(values) * (1 + np.log(np.abs(values)))
+
+
+def weigh(columns: np.ndarray, values: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    vector = np.zeros(len(idf), dtype=np.float32)
+    vector[columns] = values * idf[columns]
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def inverse_document_frequency(df: np.ndarray, documents: int) -> np.ndarray:
+    return (np.log((1 + documents) / (1 + df)) + 1).astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.argpartition(scores, -k)[-k:]
+
+
+@dataclass(frozen=True)
+class Mapping:
+    generation: int
+    dimensions: int
+    count: int
+    capacity: int
+    vectors: np.memmap
+    idf: np.ndarray
+    # Matrix row of each video, keyed by the 16 raw UUID bytes.
+    rows: dict[bytes, int]
+    ids: np.ndarray
+
+
+# Unit-length hashed TF-IDF vectors of every video's title, description and
+# tags, kept in a file that each worker memory-maps read-only, so all workers
+# on a host share one copy through the page cache. Uploads append a row in
+# place; once the preallocated rows run out the index is rebuilt from the
+# database into a new generation with half again as much room, which also
+# refreshes the IDF weights.
+class SimilarityIndex:
+    def __init__(
+        self,
+        root: str,
+        dimensions: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.root = root
+        self.dimensions = dimensions
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._mapping: Mapping | None = None
+        self._rebuilding = False
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.root, "index.json")
+
+    def _path(self, kind: str, generation: int) -> str:
+        return os.path.join(self.root, f"{kind}-{generation}.bin")
+
+    @contextlib.contextmanager
+    def _writer(self) -> Iterator[None]:
+        # One writer at a time across threads and, via flock, across workers.
+        os.makedirs(self.root, exist_ok=True)
+        with self._write_lock, open(os.path.join(self.root, ".lock"), "a+b") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict | None:
+        try:
+            with open(self.meta_path, "rb") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta: dict) -> None:
+        temporary = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(meta, handle)
+        os.replace(temporary, self.meta_path)
+
+    def _current(self) -> Mapping | None:
+        # index.json is a few bytes and replaced atomically, so it is re-read
+        # on every query; the matrix is only remapped when another worker (or
+        # this one) has published a new generation or appended rows.
+        meta = self._read_meta()
+        if meta is None:
+            return None
+        mapping = self._mapping
+        if mapping is not None and (meta["generation"], meta["count"]) == (mapping.generation, mapping.count):
+            return mapping
+        return self._open(meta)
+
+    def _open(self, meta: dict | None = None) -> Mapping | None:
+        if meta is None:
+            meta = self._read_meta()
+        if meta is None or meta["dimensions"] != self.dimensions:
+            return None
+        generation, count, capacity = meta["generation"], meta["count"], meta["capacity"]
+        previous = self._mapping
+        try:
+            if previous is not None and previous.generation == generation:
+                vectors, idf, ids, rows = previous.vectors, previous.idf, previous.ids, previous.rows
+                start = previous.count
+            else:
+                vectors = np.memmap(self._path("vectors", generation), dtype=np.float32, mode="r", shape=(capacity, self.dimensions))
+                ids = np.memmap(self._path("ids", generation), dtype=np.uint8, mode="r", shape=(capacity, UUID_BYTES))
+                idf = np.fromfile(self._path("idf", generation), dtype=np.float32)
+                rows, start = {}, 0
+        except (OSError, ValueError):
+            # A rebuild replaced this generation between reading index.json and opening it.
+            return self._mapping
+        raw = ids[start:count].tobytes()
+        for row in range(start, count):
+            offset = (row - start) * UUID_BYTES
+            rows[raw[offset : offset + UUID_BYTES]] = row
+        mapping = Mapping(generation, self.dimensions, count, capacity, vectors, idf, rows, ids)
+        with self._lock:
+            self._mapping = mapping
+        return mapping
+
+    def _load_rows(self, db: Session) -> Iterator[list[tuple[uuid.UUID, str, str | None, list[str]]]]:
+        tags: dict[uuid.UUID, list[str]] = defaultdict(list)
+        for video_id, name in db.execute(select(models.VideoTag.video_id, models.Tag.name).join(models.Tag)):
+            tags[video_id].append(name)
+        result = db.execute(
+            select(models.Video.id, models.Video.title, models.Video.description).execution_options(yield_per=BUILD_CHUNK)
+        )
+        for partition in result.partitions():
+            yield [(video_id, title, description, tags.get(video_id, [])) for video_id, title, description in partition]
+
+    def build(self, db: Session | None = None) -> None:
+        if db is None:
+            with self.session_factory() as session:
+                return self.build(session)
+        with self._writer():
+            self._build(db)
+
+    def _build(self, db: Session) -> None:
+        # Pass one hashes every document and counts document frequencies;
+        # pass two weighs, normalizes and writes them chunk by chunk.
+        chunks: list[tuple[list[bytes], np.ndarray, np.ndarray, np.ndarray]] = []
+        df = np.zeros(self.dimensions, dtype=np.int64)
+        documents = 0
+        for batch in self._load_rows(db):
+            ids, lengths, columns, values = [], [], [], []
+            for video_id, title, description, tags in batch:
+                cols, vals = hashed_features(document_features(title, description, tags), self.dimensions)
+                ids.append(video_id.bytes)
+                lengths.append(len(cols))
+                columns.append(cols)
+                values.append(vals)
+            flat_columns = np.concatenate(columns) if columns else np.zeros(0, np.int32)
+            df += np.bincount(flat_columns, minlength=self.dimensions)
+            chunks.append((ids, np.asarray(lengths), flat_columns, np.concatenate(values) if values else np.zeros(0, np.float32)))
+            documents += len(batch)
+        idf = inverse_document_frequency(df, documents)
+
+        previous = self._read_meta()
+        generation = previous["generation"] + 1 if previous else 1
+        capacity = documents + max(MIN_CAPACITY, documents // 2)
+        idf.tofile(self._path("idf", generation))
+        vectors = np.memmap(self._path("vectors", generation), dtype=np.float32, mode="w+", shape=(capacity, self.dimensions))
+        id_rows = np.memmap(self._path("ids", generation), dtype=np.uint8, mode="w+", shape=(capacity, UUID_BYTES))
+        start = 0
+        for ids, lengths, columns, values in chunks:
+            block = np.zeros((len(ids), self.dimensions), dtype=np.float32)
+            block[np.repeat(np.arange(len(ids)), lengths), columns] = values * idf[columns]
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            np.divide(block, norms, out=block, where=norms > 0)
+            vectors[start : start + len(ids)] = block
+            id_rows[start : start + len(ids)] = np.frombuffer(b"".join(ids), dtype=np.uint8).reshape(-1, UUID_BYTES)
+            start += len(ids)
+        vectors.flush()
+        id_rows.flush()
+        del vectors, id_rows
+
+        self._write_meta(
+            {"generation": generation, "dimensions": self.dimensions, "count": documents, "capacity": capacity}
+        )
+        self._open()
+        if previous:
+            # Workers still mapping the old files keep them alive until they reopen.
+            for kind in ("vectors", "ids", "idf"):
+                with contextlib.suppress(OSError):
+                    os.remove(self._path(kind, previous["generation"]))
+        logger.info("Built similarity index: %d videos, generation %d", documents, generation)
+
+    def ensure_built(self) -> Mapping | None:
+        # Never builds on the caller's thread: when no worker has published an
+        # index yet this starts a background build and returns None.
+        mapping = self._current()
+        if mapping is None:
+            self._rebuild_in_background(missing_only=True)
+        return mapping
+
+    def _build_if_missing(self) -> None:
+        with self._writer():
+            # Another worker may have built it while we waited for the lock.
+            if self._open() is None:
+                with self.session_factory() as db:
+                    self._build(db)
+
+    def add_video(self, video: models.Video) -> None:
+        self.add(video.id, video.title, video.description, video.tags)
+
+    def add(self, video_id: uuid.UUID, title: str | None, description: str | None, tags: Iterable[str]) -> None:
+        if self._current() is None:
+            # Not built yet; the background build reads it from the database.
+            return
+        with self._writer():
+            mapping = self._open()
+            if mapping is None or video_id.bytes in mapping.rows:
+                return
+            if mapping.count >= mapping.capacity:
+                # Full: the rebuild reads this (already committed) video from the database.
+                self._rebuild_in_background()
+                return
+            columns, values = hashed_features(document_features(title, description, tags), self.dimensions)
+            row = mapping.count
+            vectors = np.memmap(
+                self._path("vectors", mapping.generation), dtype=np.float32, mode="r+", shape=(mapping.capacity, self.dimensions)
+            )
+            ids = np.memmap(self._path("ids", mapping.generation), dtype=np.uint8, mode="r+", shape=(mapping.capacity, UUID_BYTES))
+            vectors[row] = weigh(columns, values, mapping.idf)
+            ids[row] = np.frombuffer(video_id.bytes, dtype=np.uint8)
+            vectors.flush()
+            ids.flush()
+            del vectors, ids
+            self._write_meta(
+                {"generation": mapping.generation, "dimensions": self.dimensions, "count": row + 1, "capacity": mapping.capacity}
+            )
+            self._open()
+
+    def _rebuild_in_background(self, missing_only: bool = False) -> None:
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run() -> None:
+            try:
+                if missing_only:
+                    self._build_if_missing()
+                else:
+                    self.build()
+            except Exception:
+                logger.exception("Similarity index rebuild failed")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=run, name="similarity-rebuild", daemon=True).start()
+
+    def similar(self, video: models.Video, limit: int) -> list[tuple[uuid.UUID, float]] | None:
+        # None means the index is still being built.
+        mapping = self.ensure_built()
+        if mapping is None:
+            return None
+        row = mapping.rows.get(video.id.bytes)
+        if row is not None and row < mapping.count:
+            query = np.array(mapping.vectors[row])
+        else:
+            # Uploaded after the last rebuild and not appended (yet): vectorize on the fly.
+            columns, values = hashed_features(document_features(video.title, video.description, video.tags), self.dimensions)
+            query = weigh(columns, values, mapping.idf)
+        return self.nearest(mapping, query, limit, exclude=row)
+
+    def nearest(self, mapping: Mapping, query: np.ndarray, limit: int, exclude: int | None = None) -> list[tuple[uuid.UUID, float]]:
+        if limit <= 0 or not query.any():
+            return []
+        # Block-wise matrix-vector products keep the scratch scores small and
+        # only ever touch the mapped pages; each block contributes its own top k.
+        keep = limit + 1
+        best_rows: list[np.ndarray] = []
+        best_scores: list[np.ndarray] = []
+        for start in range(0, mapping.count, SCORE_BLOCK):
+            scores = np.asarray(mapping.vectors[start : min(start + SCORE_BLOCK, mapping.count)] @ query)
+            top = _top_k(scores, keep)
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+        if not best_rows:
+            return []
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = np.lexsort((rows, -scores))
+        results = []
+        for position in order:
+            row, score = int(rows[position]), float(scores[position])
+            if row == exclude:
+                continue
+            if score <= 0 or len(results) == limit:
+                break
+            results.append((uuid.UUID(bytes=mapping.ids[row].tobytes()), round(score, 6)))
+        return results
+
+    def reset(self) -> None:
+        with self._lock:
+            self._mapping = None
+
+
+similarity_index = SimilarityIndex(
+    root=settings.similarity_index_dir or DEFAULT_ROOT,
+    dimensions=settings.similarity_dimensions,
+)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    similarity_index.build()
+
+
+if __name__ == "__main__":
+    main()
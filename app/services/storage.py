@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+STORAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "storage", "videos"))
+os.makedirs(STORAGE_ROOT, exist_ok=True)
+
+CHUNK_SIZE = 1024 * 1024
+
+VIDEO_EXTENSIONS = {
+    "video/mp4": ".mp4",
+    "video/webm": ".webm",
+    "video/quicktime": ".mov",
+}
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass
+class StoredFile:
+    filename: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+def store_stream(source: BinaryIO, extension: str, max_bytes: int, root: str = STORAGE_ROOT) -> StoredFile:
+    # Stream into a temp file in the storage directory (same filesystem, so the
+    # final rename is atomic), hashing and size-checking each chunk as it goes.
+    # Files are named by their SHA-256 so identical uploads share one copy.
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=root, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                buffer.write(chunk)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+
+        sha256 = digest.hexdigest()
+        filename = f"{sha256}{extension}"
+        final_path = os.path.join(root, filename)
+        deduplicated = os.path.exists(final_path)
+        if deduplicated:
+            os.unlink(temp_path)
+        else:
+            os.replace(temp_path, final_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return StoredFile(filename=filename, sha256=sha256, size=size, deduplicated=deduplicated)
+
+
+def resolve_stored_file(filename: str, root: str = STORAGE_ROOT) -> str | None:
+    if not filename or filename.startswith(".") or os.path.basename(filename) != filename:
+        return None
+    path = os.path.join(root, filename)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import uuid
+from typing import Iterable
+
+from sqlalchemy import and_, exists, select, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.upserts import dialect_insert
+
+MAX_TAG_LENGTH = 64
+
+
+def normalize_tags(tags: Iterable[str]) -> list[str]:
+    # Lower-cased, stripped, de-duplicated, first occurrence wins.
+    names = (tag.strip().lower()[:MAX_TAG_LENGTH] for tag in tags)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def parse_tag_list(raw: str | None) -> list[str]:
+    return normalize_tags((raw or "").split(","))
+
+
+def ensure_tags(db: Session, names: list[str]) -> dict[str, models.Tag]:
+    # Creates missing tags; ON CONFLICT DO NOTHING lets two uploads introduce
+    # the same tag concurrently.
+    if not names:
+        return {}
+    insert = dialect_insert(db)
+    db.execute(
+        insert(models.Tag)
+        .values([{"id": uuid.uuid4(), "name": name, "video_count": 0} for name in names])
+        .on_conflict_do_nothing(index_elements=[models.Tag.name])
+    )
+    return {tag.name: tag for tag in db.scalars(select(models.Tag).where(models.Tag.name.in_(names)))}
+
+
+def set_video_tags(db: Session, video: models.Video, tags: Iterable[str]) -> None:
+    # Replaces the video's tags and adjusts tags.video_count for whatever was
+    # added or removed, so popularity never needs a scan.
+    names = normalize_tags(tags)
+    found = ensure_tags(db, names)
+    wanted = [found[name] for name in names]
+    wanted_ids = {tag.id for tag in wanted}
+    current = {entry.tag_id: entry for entry in video.video_tags}
+
+    added = [tag.id for tag in wanted if tag.id not in current]
+    removed = [tag_id for tag_id in current if tag_id not in wanted_ids]
+    entries = []
+    for position, tag in enumerate(wanted):
+        entry = current.get(tag.id) or models.VideoTag(tag=tag)
+        entry.position = position
+        entries.append(entry)
+    # Assigning (rather than mutating) also marks the collection loaded on a
+    # new video, so reading video.tags later doesn't need a lazy load.
+    video.video_tags = entries
+
+    table = models.Tag.__table__
+    if added:
+        db.execute(update(table).where(table.c.id.in_(added)).values(video_count=table.c.video_count + 1))
+    if removed:
+        db.execute(update(table).where(table.c.id.in_(removed)).values(video_count=table.c.video_count - 1))
+
+
+def carries_tags(names: list[str], match_all: bool = False):
+    # Correlated EXISTS against video_tags' (video_id, tag_id) key, so a
+    # feed ordered by (created_at, id) keeps walking that index and stops
+    # after one page instead of sorting every tagged video.
+    def carries(subset: list[str]):
+        tag_ids = select(models.Tag.id).where(models.Tag.name.in_(subset))
+        return exists().where(models.VideoTag.video_id == models.Video.id, models.VideoTag.tag_id.in_(tag_ids))
+
+    if match_all:
+        return and_(*(carries([name]) for name in names))
+    return carries(names)
+
+
+def trending_tags_statement(limit: int):
+    return (
+        select(models.Tag)
+        .where(models.Tag.video_count > 0)
+        .order_by(models.Tag.video_count.desc(), models.Tag.name)
+        .limit(limit)
+    )
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Sequence
+
+from sqlalchemy import bindparam, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.db.upserts import dialect_insert
+from app.services.recommendations import trend_score
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Each window's score halves every quarter window, so activity a full window
+# old still counts 1/16 as much as activity now.
+WINDOWS = {
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+}
+HALF_LIVES = {name: window / 4 for name, window in WINDOWS.items()}
+# Scored buckets older than this are deleted.
+BUCKET_RETENTION = max(WINDOWS.values())
+# Stored scores grow by 2x per half-life since the epoch; moving the epoch
+# forward after this many of the shortest half-lives keeps them well inside
+# float range. Rows that have decayed below MIN_SCORE are dropped then.
+REBASE_AFTER_HALF_LIVES = 64
+MIN_SCORE = 1e-6
+
+EPOCH_ORIGIN = datetime(1970, 1, 1)
+STATE_ID = 1
+
+
+def bucket_start(moment: datetime, bucket_seconds: int) -> datetime:
+    elapsed = int((moment - EPOCH_ORIGIN).total_seconds())
+    return EPOCH_ORIGIN + timedelta(seconds=elapsed - elapsed % bucket_seconds)
+
+
+def growth(start: datetime, end: datetime, half_life: timedelta) -> float:
+    return 2.0 ** ((end - start) / half_life)
+
+
+def record_activity(db: Session, deltas: dict[uuid.UUID, list[int]], moment: datetime) -> None:
+    # Adds flushed view/like deltas to the videos' current bucket; runs in
+    # the counter buffer's flush transaction.
+    if not deltas:
+        return
+    table = models.VideoActivityBucket.__table__
+    statement = dialect_insert(db)(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.video_id, table.c.bucket_start],
+        set_={"views": table.c.views + statement.excluded.views, "likes": table.c.likes + statement.excluded.likes},
+    )
+    start = bucket_start(moment, settings.trending_bucket_seconds)
+    db.execute(
+        statement,
+        [
+            {"video_id": video_id, "bucket_start": start, "views": views, "likes": likes, "scored_views": 0, "scored_likes": 0}
+            for video_id, (views, likes) in deltas.items()
+        ],
+    )
+
+
+def trending_statement(window: str, limit: int):
+    score = models.VideoTrendingScore
+    return (
+        select(models.Video, score.score)
+        .join(score, score.video_id == models.Video.id)
+        .where(score.period == window)
+        .order_by(score.score.desc(), score.video_id)
+        .limit(limit)
+    )
+
+
+def epoch_statement():
+    return select(models.TrendingState.epoch).where(models.TrendingState.id == STATE_ID)
+
+
+def trending_items(rows: Sequence, epoch: datetime | None, window: str, now: datetime | None = None) -> list[dict]:
+    # Stored scores share one growth factor, so ranking never needs it; it is
+    # only divided out here to report the score as of now.
+    if epoch is None:
+        return []
+    factor = growth(now or datetime.utcnow(), epoch, HALF_LIVES[window])
+    return [{"video": video, "score": round(score * factor, 6)} for video, score in rows if score * factor >= MIN_SCORE]
+
+
+# Folds bucketed view/like activity into exponentially decayed per-window
+# scores (video_trending_scores). Scores use forward decay: an event at time t
+# adds trend_score * 2^((t - epoch) / half_life), so existing rows are only
+# ever incremented and their order is the decayed order at any moment. Each
+# refresh reads just the buckets that changed since the last one. Every
+# worker runs the loop; a compare-and-set on trending_state.refreshed_at lets
+# one of them do each refresh.
+class TrendingScorer:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        refresh_seconds: float = 60.0,
+        bucket_seconds: int = 3600,
+    ) -> None:
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self.bucket_seconds = bucket_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def refresh(self, now: datetime | None = None, force: bool = False) -> int | None:
+        # Returns the number of buckets scored, or None when another worker
+        # refreshed recently (or is refreshing right now).
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            state = self._state(db, now)
+            last = state.refreshed_at
+            if not force and last is not None and (now - last).total_seconds() < self.refresh_seconds / 2:
+                return None
+            claim = update(models.TrendingState).where(models.TrendingState.id == STATE_ID)
+            claim = claim.where(models.TrendingState.refreshed_at.is_(None) if last is None else models.TrendingState.refreshed_at == last)
+            if db.execute(claim.values(refreshed_at=now)).rowcount != 1:
+                db.rollback()
+                return None
+            epoch = self._rebase(db, state.epoch, now)
+            since = None if last is None else bucket_start(last, self.bucket_seconds) - timedelta(seconds=self.bucket_seconds)
+            scored = self._score(db, epoch, since)
+            bucket_table = models.VideoActivityBucket.__table__
+            db.execute(
+                delete(bucket_table).where(
+                    bucket_table.c.bucket_start < now - BUCKET_RETENTION,
+                    bucket_table.c.views == bucket_table.c.scored_views,
+                    bucket_table.c.likes == bucket_table.c.scored_likes,
+                )
+            )
+            db.commit()
+            return scored
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _state(self, db: Session, now: datetime) -> models.TrendingState:
+        state = db.get(models.TrendingState, STATE_ID)
+        if state is None:
+            db.execute(
+                dialect_insert(db)(models.TrendingState)
+                .values(id=STATE_ID, epoch=bucket_start(now, self.bucket_seconds), refreshed_at=None)
+                .on_conflict_do_nothing(index_elements=[models.TrendingState.id])
+            )
+            db.commit()
+            state = db.get(models.TrendingState, STATE_ID)
+        return state
+
+    def _rebase(self, db: Session, epoch: datetime, now: datetime) -> datetime:
+        if (now - epoch) / min(HALF_LIVES.values()) < REBASE_AFTER_HALF_LIVES:
+            return epoch
+        new_epoch = bucket_start(now, self.bucket_seconds)
+        table = models.VideoTrendingScore.__table__
+        for window, half_life in HALF_LIVES.items():
+            db.execute(
+                update(table).where(table.c.period == window).values(score=table.c.score * growth(new_epoch, epoch, half_life))
+            )
+        db.execute(delete(table).where(table.c.score < MIN_SCORE))
+        db.execute(update(models.TrendingState).where(models.TrendingState.id == STATE_ID).values(epoch=new_epoch))
+        return new_epoch
+
+    def _score(self, db: Session, epoch: datetime, since: datetime | None) -> int:
+        # A flush that started before the last refresh can still land in the
+        # bucket before it, hence ``since`` reaching one bucket further back.
+        table = models.VideoActivityBucket.__table__
+        statement = select(
+            table.c.video_id, table.c.bucket_start, table.c.views, table.c.likes, table.c.scored_views, table.c.scored_likes
+        ).where(or_(table.c.views != table.c.scored_views, table.c.likes != table.c.scored_likes))
+        if since is not None:
+            statement = statement.where(table.c.bucket_start >= since)
+        rows = db.execute(statement).all()
+        if not rows:
+            return 0
+
+        increments: dict[tuple[str, uuid.UUID], float] = defaultdict(float)
+        for video_id, start, views, likes, scored_views, scored_likes in rows:
+            delta = trend_score(views - scored_views, likes - scored_likes)
+            for window, half_life in HALF_LIVES.items():
+                increments[window, video_id] += delta * growth(epoch, start, half_life)
+
+        score_table = models.VideoTrendingScore.__table__
+        upsert = dialect_insert(db)(score_table)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[score_table.c.period, score_table.c.video_id],
+            set_={"score": score_table.c.score + upsert.excluded.score},
+        )
+        db.execute(
+            upsert,
+            [{"period": window, "video_id": video_id, "score": score} for (window, video_id), score in increments.items()],
+        )
+        # Marks what was read, not the current totals, so increments flushed
+        # since the select are picked up next time.
+        db.execute(
+            update(table)
+            .where(table.c.video_id == bindparam("b_video_id"), table.c.bucket_start == bindparam("b_start"))
+            .values(scored_views=bindparam("b_views"), scored_likes=bindparam("b_likes")),
+            [
+                {"b_video_id": video_id, "b_start": start, "b_views": views, "b_likes": likes}
+                for video_id, start, views, likes, _, _ in rows
+            ],
+        )
+        return len(rows)
+
+    def start(self) -> None:
+        if self._thread is not None or not self.refresh_seconds:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trending-scorer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh trending scores; will retry")
+
+
+trending_scorer = TrendingScorer(
+    refresh_seconds=settings.trending_refresh_seconds,
+    bucket_seconds=settings.trending_bucket_seconds,
+)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import select, tuple_
+
+from app.db import models
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.services.tags import carries_tags
+
+
+# Shared by the sync and async video routers.
+def feed_statement(
+    limit: int,
+    cursor: str | None = None,
+    skill_level: str | None = None,
+    tags: list[str] | None = None,
+    match_all: bool = False,
+):
+    # Fetches one row past the page so the caller knows whether to hand out a
+    # next cursor. Raises InvalidCursor for cursors we didn't issue. ``tags``
+    # must already be normalized.
+    statement = select(models.Video)
+    if skill_level:
+        statement = statement.where(models.Video.skill_level == skill_level)
+    if tags:
+        statement = statement.where(carries_tags(tags, match_all))
+    if cursor:
+        try:
+            created_at, video_id = decode_cursor(cursor, 2)
+            position = (datetime.fromisoformat(created_at), uuid.UUID(video_id))
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursor("Malformed cursor") from exc
+        statement = statement.where(tuple_(models.Video.created_at, models.Video.id) < tuple_(*position))
+    return statement.order_by(models.Video.created_at.desc(), models.Video.id.desc()).limit(limit + 1)
+
+
+def feed_page(rows: Sequence[models.Video], limit: int) -> dict:
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), str(last.id))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def similar_items(hits: Sequence[tuple[uuid.UUID, float]], rows: Sequence[models.Video]) -> list[dict]:
+    # Keeps the index's ranking; videos deleted since it was built are skipped.
+    by_id = {video.id: video for video in rows}
+    return [{"video": by_id[video_id], "score": score} for video_id, score in hits if video_id in by_id]
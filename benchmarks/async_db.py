@@ -0,0 +1,100 @@
+"""Sync (threadpool + Session) vs. async (AsyncSession) routers under load.
+
+Builds one app per path in-process, seeds --videos rows and keeps
+--concurrency requests in flight (a mix of /videos/{id} and /videos/feed)
+for --requests requests, with the response cache off so every request
+reaches the database. Reports requests/sec, failed requests and the
+traced Python memory peak per in-flight request.
+
+Once in-flight sync requests outnumber threadpool threads plus pool
+connections, threads block on pool checkout while the requests holding
+connections wait for a thread to serialize their response; those requests
+fail after DB_POOL_TIMEOUT_SECONDS (5 s here) and show up as errors.
+
+    python -m benchmarks.async_db --concurrency 10 50 200 --requests 5000
+"""
+from __future__ import annotations
+
+import os
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+# The async engine is only created when DB_ASYNC is on at import time.
+os.environ.setdefault("DB_ASYNC", "true")
+os.environ.setdefault("DB_POOL_TIMEOUT_SECONDS", "5")
+# Otherwise nearly every /videos/{id} is served from the response cache.
+os.environ.setdefault("RESPONSE_CACHE_MAX_ENTRIES", "0")
+use_scratch_database()
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from app.db.session import async_engine, engine
+from app.routers import videos, videos_async
+
+
+async def load(app: FastAPI, video_ids: list[uuid.UUID], concurrency: int, requests: int) -> dict:
+    rng = random.Random(concurrency)
+    paths = [f"/videos/{rng.choice(video_ids)}" if rng.random() < 0.8 else "/videos/feed" for _ in range(requests)]
+    queue = iter(paths)
+    errors = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for path in queue:
+            if (await client.get(path)).status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=None)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    return {
+        "concurrency": concurrency,
+        "requests_per_sec": round(requests / elapsed, 1),
+        "peak_kib_per_in_flight": round(peak / 1024 / concurrency, 1),
+        "errors": errors,
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    video_ids = seed_catalog(engine, args.videos).video_ids
+    apps = {"sync": FastAPI(), "async": FastAPI()}
+    apps["sync"].include_router(videos.router)
+    apps["async"].include_router(videos_async.router)
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            for name, app in apps.items():
+                results.append({"path": name, **await load(app, video_ids, concurrency, args.requests)})
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps({"requests": args.requests, "results": asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Per-event counter writes vs. the write-behind CounterBuffer.
+
+Runs the same burst of view events against both paths and reports events/sec
+and how many increments were lost.
+
+    python -m benchmarks.counters --threads 16 --events-per-thread 500 --videos 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+use_scratch_database()
+
+from sqlalchemy import func, select
+
+from app.db import models
+from app.db.session import SessionLocal, engine
+from app.services.counters import CounterBuffer
+
+
+def total_views(video_ids: list[uuid.UUID]) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.sum(models.Video.views)).where(models.Video.id.in_(video_ids))).scalar() or 0
+
+
+def legacy_event(video_id: uuid.UUID) -> None:
+    db = SessionLocal()
+    try:
+        video = db.query(models.Video).filter(models.Video.id == video_id).first()
+        video.views += 1
+        db.commit()
+    finally:
+        db.close()
+
+
+def buffered_event(buffer: CounterBuffer, video_id: uuid.UUID) -> None:
+    db = SessionLocal()
+    try:
+        buffer.increment(db, video_id, "views")
+    finally:
+        db.close()
+
+
+def run(name: str, event, video_ids: list[uuid.UUID], threads: int, per_thread: int, after=None) -> dict:
+    rng = random.Random(0)
+    plan = [[rng.choice(video_ids) for _ in range(per_thread)] for _ in range(threads)]
+    before = total_views(video_ids)
+    errors = 0
+
+    def worker(targets: list[uuid.UUID]) -> int:
+        failed = 0
+        for video_id in targets:
+            try:
+                event(video_id)
+            except Exception:
+                failed += 1
+        return failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        errors = sum(pool.map(worker, plan))
+    if after:
+        after()
+    elapsed = time.perf_counter() - started
+
+    sent = threads * per_thread
+    applied = total_views(video_ids) - before
+    return {
+        "path": name,
+        "threads": threads,
+        "events": sent,
+        "seconds": round(elapsed, 3),
+        "events_per_sec": round(sent / elapsed, 1),
+        "errors": errors,
+        "lost": sent - errors - applied,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--events-per-thread", type=int, default=500)
+    parser.add_argument("--videos", type=int, default=10)
+    args = parser.parse_args()
+
+    video_ids = seed_catalog(engine, args.videos).video_ids
+    results = []
+    for threads in args.threads:
+        results.append(run("per-event", legacy_event, video_ids, threads, args.events_per_thread))
+        buffer = CounterBuffer(flush_interval=0.5, max_pending=1000)
+        buffer.start()
+        results.append(
+            run("write-behind", lambda video_id: buffered_event(buffer, video_id), video_ids, threads, args.events_per_thread, after=buffer.stop)
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Rendering a course: one /videos/{id} call per entry vs. ?expand=videos.
+
+Seeds a course with --videos entries and times both ways of fetching the
+course and all of its videos, counting SQL statements per render. The
+response cache is cleared before each render so both paths hit the
+database.
+
+    python -m benchmarks.course_expand --videos 50 --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+use_scratch_database()
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.routers import courses, videos
+from app.services.response_cache import response_cache
+
+
+async def per_video(client: httpx.AsyncClient, course_id: uuid.UUID) -> None:
+    course = (await client.get(f"/courses/{course_id}")).raise_for_status().json()
+    for video_id in course["video_ids"]:
+        (await client.get(f"/videos/{video_id}")).raise_for_status()
+
+
+async def expanded(client: httpx.AsyncClient, course_id: uuid.UUID) -> None:
+    (await client.get(f"/courses/{course_id}", params={"expand": "videos"})).raise_for_status()
+
+
+async def measure(client: httpx.AsyncClient, render, course_id: uuid.UUID, repeat: int, statements: list[int]) -> dict:
+    await render(client, course_id)
+    samples = []
+    statements[0] = 0
+    for _ in range(repeat):
+        # Every render has to reach the database, not the response cache.
+        response_cache.clear()
+        started = time.perf_counter()
+        await render(client, course_id)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "queries_per_render": statements[0] / repeat,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    app = FastAPI()
+    app.include_router(courses.router)
+    app.include_router(videos.router)
+    course_id = seed_catalog(engine, args.videos, course=True).course_id
+
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            return {
+                "per_video": await measure(client, per_video, course_id, args.repeat, statements),
+                "expand_videos": await measure(client, expanded, course_id, args.repeat, statements),
+            }
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps({"videos": args.videos, "repeat": args.repeat, "results": asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
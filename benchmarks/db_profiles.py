@@ -0,0 +1,148 @@
+"""Concurrent read/write throughput for each database engine profile.
+
+Each profile gets a fresh database (a temporary SQLite file unless --url is
+given), seeded with --videos rows. --readers threads page through videos
+while --writers threads upsert progress and bump view counters, each writer
+committing per operation. Reports ops/sec and how many operations failed,
+e.g. with "database is locked".
+
+    python -m benchmarks.db_profiles --profiles default sqlite --seconds 5
+    python -m benchmarks.db_profiles --url postgresql+psycopg2://... --profiles default postgres
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.session import Base, create_engine_for
+from app.schemas.progress import ProgressUpdate
+from app.services.progress import upsert_statement
+
+
+def seed(engine, videos: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    video_ids = [uuid.uuid4() for _ in range(videos)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            [{"id": user_id, "name": "bench", "email": f"{user_id}@bench.local", "password_hash": "x", "role": "learner"}],
+        )
+        conn.execute(
+            insert(models.Video),
+            [
+                {
+                    "id": video_id,
+                    "creator_id": user_id,
+                    "title": f"Reel {i}",
+                    "skill_level": "beginner",
+                    "video_url": "/bench.mp4",
+                    "views": 0,
+                    "likes": 0,
+                }
+                for i, video_id in enumerate(video_ids)
+            ],
+        )
+    return user_id, video_ids
+
+
+def run_profile(url: str, profile: str, args: argparse.Namespace) -> dict:
+    engine = create_engine_for(url, profile)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    user_id, video_ids = seed(engine, args.videos)
+    deadline = time.perf_counter() + args.seconds
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def record(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def reader(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            db = Session()
+            try:
+                offset = rng.randrange(max(args.videos - 15, 1))
+                db.execute(select(models.Video).order_by(models.Video.created_at.desc()).offset(offset).limit(15)).all()
+                record("reads")
+            except OperationalError:
+                record("errors")
+            finally:
+                db.close()
+
+    def writer(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            video_id = rng.choice(video_ids)
+            db = Session()
+            try:
+                if rng.random() < 0.5:
+                    event = ProgressUpdate(user_id=user_id, video_id=video_id, completed=True)
+                    db.execute(upsert_statement(db, [event]))
+                else:
+                    table = models.Video.__table__
+                    db.execute(update(table).where(table.c.id == video_id).values(views=table.c.views + 1))
+                db.commit()
+                record("writes")
+            except OperationalError:
+                db.rollback()
+                record("errors")
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return {
+        "profile": profile,
+        "reads_per_sec": round(counts["reads"] / elapsed, 1),
+        "writes_per_sec": round(counts["writes"] / elapsed, 1),
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL; defaults to a fresh temporary SQLite file per profile")
+    parser.add_argument("--profiles", nargs="+", default=["default", "sqlite"])
+    parser.add_argument("--videos", type=int, default=1000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = []
+    for profile in args.profiles:
+        if args.url:
+            results.append(run_profile(args.url, profile, args))
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            results.append(run_profile(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile, args))
+    print(
+        json.dumps(
+            {"readers": args.readers, "writers": args.writers, "seconds": args.seconds, "results": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Keyset vs. OFFSET pagination for /videos/feed/page on a large seeded catalog.
+
+Seeds --rows videos into a scratch database (see benchmarks.fixtures) and
+times fetching a page at increasing depths with both strategies. Both run
+app.services.videos.feed_statement, the query behind the route: keyset with
+the cursor a client would hold at that depth, OFFSET by adding .offset().
+
+    python -m benchmarks.feed --rows 1000000 --depths 1 100 1000 10000 50000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+use_scratch_database()
+
+from sqlalchemy import select
+
+from app.db import models
+from app.db.session import SessionLocal, engine
+from app.services.pagination import encode_cursor
+from app.services.videos import feed_statement
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed_catalog(engine, args.rows)
+    ordering = (models.Video.created_at.desc(), models.Video.id.desc())
+    results = []
+    db = SessionLocal()
+    try:
+        for depth in args.depths:
+            skip = (depth - 1) * args.limit
+            if skip >= args.rows:
+                continue
+            # The cursor a client would hold after reading `depth - 1` pages.
+            cursor = None
+            if skip:
+                created_at, video_id = db.execute(
+                    select(models.Video.created_at, models.Video.id).order_by(*ordering).offset(skip - 1).limit(1)
+                ).one()
+                cursor = encode_cursor(created_at.isoformat(), str(video_id))
+
+            def keyset():
+                return db.scalars(feed_statement(args.limit, cursor)).all()
+
+            def offset():
+                return db.scalars(feed_statement(args.limit).offset(skip)).all()
+
+            results.append(
+                {
+                    "page": depth,
+                    "keyset_ms": timed(keyset, args.repeat),
+                    "offset_ms": timed(offset, args.repeat),
+                }
+            )
+    finally:
+        db.close()
+    print(json.dumps({"rows": args.rows, "limit": args.limit, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
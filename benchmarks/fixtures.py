@@ -0,0 +1,90 @@
+"""Shared setup for the in-process benchmarks.
+
+Settings and engines are built when app/ is first imported, so a benchmark
+calls use_scratch_database() before importing anything from app. That points
+DATABASE_URL at a SQLite file in a temporary directory removed at exit, so a
+run never writes into ./app.db or whatever DATABASE_URL the shell has. Set
+BENCH_DATABASE_URL to seed and measure a specific database instead (e.g.
+Postgres); that one is left as it is afterwards.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+CHUNK = 10_000
+SKILL_LEVELS = ("beginner", "intermediate", "advanced")
+CREATED_FROM = datetime(2024, 1, 1)
+
+
+def use_scratch_database() -> str:
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if not url:
+        directory = tempfile.mkdtemp(prefix="bench-")
+        atexit.register(shutil.rmtree, directory, True)
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+@dataclass
+class Catalog:
+    creator_id: uuid.UUID
+    video_ids: list[uuid.UUID] = field(default_factory=list)
+    course_id: uuid.UUID | None = None
+
+
+def seed_catalog(engine, videos: int, course: bool = False) -> Catalog:
+    # One creator owning ``videos`` reels, optionally all in one course. A few
+    # reels share each created_at so the feed's id tiebreak is exercised.
+    # app/ is imported here rather than at module level; see the docstring.
+    from sqlalchemy import insert
+
+    from app.db import models
+    from app.db.session import Base
+
+    Base.metadata.create_all(bind=engine)
+    catalog = Catalog(creator_id=uuid.uuid4(), video_ids=[uuid.uuid4() for _ in range(videos)])
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            [
+                {
+                    "id": catalog.creator_id,
+                    "name": "bench",
+                    "email": f"{catalog.creator_id}@bench.local",
+                    "password_hash": "x",
+                    "role": "creator",
+                }
+            ],
+        )
+        for offset in range(0, videos, CHUNK):
+            conn.execute(
+                insert(models.Video),
+                [
+                    {
+                        "id": catalog.video_ids[i],
+                        "creator_id": catalog.creator_id,
+                        "title": f"Reel {i}",
+                        "skill_level": SKILL_LEVELS[i % len(SKILL_LEVELS)],
+                        "video_url": "/bench.mp4",
+                        "views": 0,
+                        "likes": 0,
+                        "created_at": CREATED_FROM + timedelta(seconds=i // 3),
+                    }
+                    for i in range(offset, min(offset + CHUNK, videos))
+                ],
+            )
+        if course:
+            catalog.course_id = uuid.uuid4()
+            conn.execute(insert(models.MicroCourse), [{"id": catalog.course_id, "creator_id": catalog.creator_id, "title": "bench"}])
+            conn.execute(
+                insert(models.CourseVideo),
+                [{"course_id": catalog.course_id, "video_id": video_id, "position": i} for i, video_id in enumerate(catalog.video_ids)],
+            )
+    return catalog
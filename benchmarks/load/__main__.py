@@ -0,0 +1,104 @@
+"""Mixed-workload load test across the API.
+
+Seeds a synthetic dataset with ``seeds.seed_data.generate`` (users,
+creators, tagged videos, courses, progress; --seed picks the dataset), then
+keeps --concurrency simulated clients running scenarios picked from a
+weighted mix for --duration seconds (or until --requests scenarios ran):
+
+    feed             scroll /videos/feed/page for a few pages
+    watch            GET /videos/{id} on a skewed set of hot videos, then
+                     revalidate with If-None-Match
+    views            a burst of /videos/increment-view plus maybe a like
+    progress         /progress/update or /progress/batch, then the overview
+    recommendations  /ai/recommend-feed
+    courses          /courses/{id}?expand=videos
+    browse           /videos?tags= or /videos/search
+    login            /auth/login (bcrypt)
+
+By default the real ``app.main.app`` runs in process over httpx's ASGI
+transport against a fresh temporary SQLite database, and every request
+also reports how many SQL statements it ran. With --base-url the same
+workload is sent to a running server instead; the dataset is then seeded
+through --database-url, which must be the server's database (and the
+server must share JWT_SECRET), and query counts are not available.
+
+Prints JSON (also written to --output) with throughput and p50/p95/p99
+latency per route, so runs can be diffed across commits with
+``python -m benchmarks.load.compare``.
+
+    python -m benchmarks.load --duration 20 --concurrency 32
+    python -m benchmarks.load --mix only:feed,watch --videos 100000
+    python -m benchmarks.load --mix login=0,recommendations=20 --output after.json
+    python -m benchmarks.load --base-url http://localhost:8000 --database-url postgresql+psycopg2://...
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", help="benchmark a running server instead of the app in process")
+    parser.add_argument("--database-url", help="database to seed (and, in process, to serve from)")
+    parser.add_argument("--async-db", action="store_true", help="in process, serve from the DB_ASYNC routers")
+    parser.add_argument("--mix", help='scenario weights, e.g. "feed=5,login=0" or "only:feed,views"')
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to measure")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many scenarios (0: run for --duration)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds to run before measuring")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--creators", type=int, default=20)
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--progress", type=int, default=2000, help="progress events seeded before the run")
+    parser.add_argument("--tags", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    if args.base_url and not args.database_url:
+        parser.error("--base-url needs --database-url pointing at the server's database")
+    if min(args.users, args.creators, args.videos, args.courses, args.tags) < 1:
+        parser.error("--users, --creators, --videos, --courses and --tags must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    # Settings and engines are built at import time, so the environment has
+    # to be in place before anything under app/ is imported.
+    scratch = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        scratch = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+    if args.async_db:
+        os.environ["DB_ASYNC"] = "true"
+
+    from benchmarks.load.runner import run
+    from benchmarks.load.workloads import parse_mix
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    try:
+        report = asyncio.run(run(args, mix))
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare two ``python -m benchmarks.load`` reports route by route.
+
+    python -m benchmarks.load.compare before.json after.json
+
+Prints a table of requests/sec, p50/p95/p99 and queries per request, with
+the relative change of each; latency changes above --threshold percent are
+flagged.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+
+COLUMNS = ("rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request")
+
+
+def change(before: float | None, after: float | None) -> str:
+    if before is None or after is None:
+        return "n/a"
+    if before == 0:
+        return "n/a" if after == 0 else "new"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(before: dict, after: dict, threshold: float) -> list[str]:
+    routes = {"*": (before["total"], after["total"])}
+    for route in sorted(set(before["routes"]) | set(after["routes"])):
+        routes[route] = (before["routes"].get(route), after["routes"].get(route))
+
+    lines = [f"{'route':44} " + " ".join(f"{column:>24}" for column in COLUMNS)]
+    for route, (old, new) in routes.items():
+        if old is None or new is None:
+            lines.append(f"{route:44} {'only in ' + ('after' if old is None else 'before'):>24}")
+            continue
+        cells, flagged = [], False
+        for column in COLUMNS:
+            delta = change(old.get(column), new.get(column))
+            cells.append(f"{old.get(column)} -> {new.get(column)} ({delta})")
+            if column.endswith("_ms") and old.get(column) and new.get(column):
+                flagged |= (new[column] - old[column]) / old[column] * 100 > threshold
+        lines.append(f"{route:44} " + " ".join(f"{cell:>24}" for cell in cells) + ("  <-- slower" if flagged else ""))
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="flag latency regressions above this percent")
+    args = parser.parse_args()
+    with open(args.before) as handle:
+        before = json.load(handle)
+    with open(args.after) as handle:
+        after = json.load(handle)
+    print(f"before: {before['git']['commit']}  after: {after['git']['commit']}")
+    print("\n".join(compare(before, after, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+
+from app.core.security import create_access_token
+from app.db.session import engine
+from seeds.seed_data import Scale, generate, synthetic_email, synthetic_id, tag_name
+
+PASSWORD = "benchmark-password"
+
+
+@dataclass
+class Learner:
+    id: uuid.UUID
+    email: str
+    token: str
+
+
+@dataclass
+class Dataset:
+    learners: list[Learner] = field(default_factory=list)
+    video_ids: list[uuid.UUID] = field(default_factory=list)
+    course_ids: list[uuid.UUID] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+
+
+def seed(scale: Scale, seed_value: int = 0) -> Dataset:
+    # The synthetic generator's ids are a function of (seed, kind, index), so
+    # the workload can address its rows without reading them back.
+    generate(engine, scale, seed=seed_value, password=PASSWORD, log=lambda message: None)
+    dataset = Dataset(
+        video_ids=[synthetic_id(seed_value, "video", index) for index in range(scale.videos)],
+        course_ids=[synthetic_id(seed_value, "course", index) for index in range(scale.courses)],
+        tags=[tag_name(seed_value, index) for index in range(scale.tags)],
+    )
+    for index in range(scale.users):
+        user_id = synthetic_id(seed_value, "learner", index)
+        token = create_access_token({"sub": str(user_id), "role": "learner", "name": f"Learner {index}"})
+        dataset.learners.append(Learner(user_id, synthetic_email(seed_value, "learner", index), token))
+    return dataset
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import platform
+import random
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import httpx
+
+from app.core.config import get_settings
+from app.db import session as db_session
+from benchmarks.load import dataset as bench_dataset
+from benchmarks.load.stats import QueryCounter, Recorder
+from benchmarks.load.workloads import SCENARIOS, BenchClient
+from seeds.seed_data import Scale
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def git_revision() -> dict:
+    def git(*command: str) -> str:
+        return subprocess.run(["git", *command], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+
+    try:
+        commit = git("rev-parse", "HEAD")
+        dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+@asynccontextmanager
+async def in_process_client():
+    # Importing the app builds its engines and routers for the configured
+    # DATABASE_URL / DB_ASYNC, so it happens only once the environment is set.
+    from app.main import app
+
+    engines = [db_session.engine]
+    if db_session.async_engine is not None:
+        engines.append(db_session.async_engine.sync_engine)
+    counter = QueryCounter(app, engines)
+    counter.install()
+    try:
+        # httpx's ASGI transport doesn't send lifespan events, so run the
+        # app's lifespan here; it starts the counter flusher.
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=counter)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+                yield http
+    finally:
+        counter.remove()
+
+
+@asynccontextmanager
+async def live_client(base_url: str, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        yield http
+
+
+async def drive(client: BenchClient, data, mix: dict[str, float], args: argparse.Namespace, seconds: float, seed_value: int) -> None:
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + seconds
+    remaining = [args.requests] if args.requests else None
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed_value * 1000 + index)
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            name = rng.choices(names, weights)[0]
+            client.recorder.scenario(name)
+            await SCENARIOS[name](client, data, rng)
+
+    await asyncio.gather(*(worker(index) for index in range(args.concurrency)))
+
+
+async def run(args: argparse.Namespace, mix: dict[str, float]) -> dict:
+    started_at = datetime.now(timezone.utc)
+    seed_started = time.perf_counter()
+    scale = Scale(
+        users=args.users,
+        creators=args.creators,
+        videos=args.videos,
+        courses=args.courses,
+        progress=args.progress,
+        tags=args.tags,
+    )
+    data = bench_dataset.seed(scale, args.seed)
+    seed_seconds = time.perf_counter() - seed_started
+
+    recorder = Recorder()
+    open_client = live_client(args.base_url, args.concurrency) if args.base_url else in_process_client()
+    async with open_client as http:
+        client = BenchClient(http, recorder)
+        if args.warmup:
+            recorder.enabled = False
+            await drive(client, data, mix, args, args.warmup, args.seed + 1)
+            recorder.enabled = True
+        measured_started = time.perf_counter()
+        await drive(client, data, mix, args, args.duration, args.seed)
+        elapsed = time.perf_counter() - measured_started
+
+    settings = get_settings()
+    return {
+        "started_at": started_at.isoformat(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "database": db_session.engine.dialect.name,
+        "db_async": settings.db_async,
+        "config": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+            "dataset": {
+                "users": args.users,
+                "creators": args.creators,
+                "videos": args.videos,
+                "courses": args.courses,
+                "progress": args.progress,
+                "tags": args.tags,
+                "seed_seconds": round(seed_seconds, 2),
+            },
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        **recorder.summary(elapsed),
+    }
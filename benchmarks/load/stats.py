@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+QUERY_HEADER = b"x-bench-queries"
+
+_queries: ContextVar[list[int] | None] = ContextVar("bench_queries", default=None)
+
+
+def _count_query(*_) -> None:
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+# ASGI wrapper for in-process runs: counts the SQL statements each request
+# executes and reports them in a response header. The counter lives in a
+# context variable, which the threadpool running sync handlers inherits, so
+# concurrent requests never see each other's queries.
+class QueryCounter:
+    def __init__(self, app, engines) -> None:
+        self.app = app
+        self.engines = engines
+
+    def install(self) -> None:
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", _count_query)
+
+    def remove(self) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", _count_query)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counter = [0]
+        token = _queries.set(counter)
+
+        async def send_with_count(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (QUERY_HEADER, str(counter[0]).encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _queries.reset(token)
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    # Nearest-rank, so small samples report a latency that was actually seen.
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+        result = {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": None,
+            "p95_ms": None,
+            "p99_ms": None,
+            "max_ms": None,
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+        }
+        if ordered:
+            result.update(
+                p50_ms=round(percentile(ordered, 0.50) * 1000, 3),
+                p95_ms=round(percentile(ordered, 0.95) * 1000, 3),
+                p99_ms=round(percentile(ordered, 0.99) * 1000, 3),
+                max_ms=round(ordered[-1] * 1000, 3),
+            )
+        return result
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.routes: dict[str, RouteStats] = {}
+        self.scenarios: dict[str, int] = {}
+        self.enabled = True
+
+    def record(self, route: str, seconds: float, status: int | None, queries: int | None) -> None:
+        if not self.enabled:
+            return
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.latencies.append(seconds)
+        if status is None or status >= 500:
+            stats.errors += 1
+        if status is not None:
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if queries is not None:
+            stats.queries.append(queries)
+
+    def scenario(self, name: str) -> None:
+        if self.enabled:
+            self.scenarios[name] = self.scenarios.get(name, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        routes = self.routes.values()
+        combined = RouteStats(
+            latencies=[seconds for stats in routes for seconds in stats.latencies],
+            queries=[count for stats in routes for count in stats.queries],
+            errors=sum(stats.errors for stats in routes),
+        )
+        total = combined.summary(elapsed)
+        del total["statuses"]
+        return {
+            "total": total,
+            "routes": {route: self.routes[route].summary(elapsed) for route in sorted(self.routes)},
+            "scenarios": dict(sorted(self.scenarios.items())),
+        }
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.load.dataset import PASSWORD, Dataset
+from benchmarks.load.stats import QUERY_HEADER, Recorder
+from seeds.seed_data import TOPICS
+
+
+class BenchClient:
+    def __init__(self, http: httpx.AsyncClient, recorder: Recorder) -> None:
+        self.http = http
+        self.recorder = recorder
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        # `route` is the path template results are grouped under.
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route, time.perf_counter() - started, None, None)
+            return None
+        queries = response.headers.get(QUERY_HEADER.decode())
+        self.recorder.record(route, time.perf_counter() - started, response.status_code, int(queries) if queries else None)
+        return response
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _hot_video(data: Dataset, rng: random.Random):
+    # Skewed towards the front of the catalog so some rows are hot.
+    return data.video_ids[min(int(rng.paretovariate(1.2)) - 1, len(data.video_ids) - 1)]
+
+
+async def feed_scroll(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    params = {"limit": 15}
+    if rng.random() < 0.3:
+        params["skill_level"] = rng.choice(("beginner", "intermediate", "advanced"))
+    for _ in range(rng.randint(1, 4)):
+        response = await client.request("GET /videos/feed/page", "GET", "/videos/feed/page", params=params)
+        if response is None or response.status_code != 200 or not response.json()["next_cursor"]:
+            return
+        params["cursor"] = response.json()["next_cursor"]
+
+
+async def watch(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    video_id = _hot_video(data, rng)
+    response = await client.request("GET /videos/{video_id}", "GET", f"/videos/{video_id}")
+    etag = response.headers.get("etag") if response is not None else None
+    if etag:
+        await client.request(
+            "GET /videos/{video_id} (revalidate)", "GET", f"/videos/{video_id}", headers={"If-None-Match": etag}
+        )
+
+
+async def view_like_burst(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    video_id = str(_hot_video(data, rng))
+    for _ in range(rng.randint(3, 8)):
+        await client.request("POST /videos/increment-view", "POST", "/videos/increment-view", json={"video_id": video_id})
+    if rng.random() < 0.5:
+        await client.request("POST /videos/like", "POST", "/videos/like", json={"video_id": video_id})
+
+
+async def progress(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    learner = rng.choice(data.learners)
+    headers = _auth(learner.token)
+    if rng.random() < 0.8:
+        event = {"user_id": str(learner.id), "video_id": str(rng.choice(data.video_ids)), "completed": rng.random() < 0.7}
+        await client.request("POST /progress/update", "POST", "/progress/update", json=event, headers=headers)
+    else:
+        events = [
+            {"user_id": str(learner.id), "video_id": str(video_id), "completed": True}
+            for video_id in rng.sample(data.video_ids, min(20, len(data.video_ids)))
+        ]
+        await client.request("POST /progress/batch", "POST", "/progress/batch", json={"events": events}, headers=headers)
+    await client.request(
+        "GET /progress/user/{user_id}/courses", "GET", f"/progress/user/{learner.id}/courses", headers=headers
+    )
+
+
+async def recommendations(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    learner = rng.choice(data.learners)
+    payload = {"user_id": str(learner.id), "recent_tags": rng.sample(data.tags, min(2, len(data.tags)))}
+    await client.request("POST /ai/recommend-feed", "POST", "/ai/recommend-feed", json=payload)
+
+
+async def courses(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    course_id = rng.choice(data.course_ids)
+    await client.request(
+        "GET /courses/{course_id}?expand=videos", "GET", f"/courses/{course_id}", params={"expand": "videos"}
+    )
+
+
+async def browse(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    if rng.random() < 0.5:
+        tags = ",".join(rng.sample(data.tags, min(2, len(data.tags))))
+        await client.request("GET /videos?tags=", "GET", "/videos", params={"tags": tags, "match": "any"})
+    else:
+        # Synthetic titles read "<Topic> in 60 seconds #<n>"; the second word
+        # is sometimes cut short to exercise prefix matching.
+        q = f"{rng.choice(TOPICS)} {rng.choice(('seconds', 'sec', str(rng.randrange(len(data.video_ids)))))}"
+        await client.request("GET /videos/search", "GET", "/videos/search", params={"q": q})
+
+
+async def login(client: BenchClient, data: Dataset, rng: random.Random) -> None:
+    learner = rng.choice(data.learners)
+    await client.request("POST /auth/login", "POST", "/auth/login", json={"email": learner.email, "password": PASSWORD})
+
+
+Scenario = Callable[[BenchClient, Dataset, random.Random], Awaitable[None]]
+
+SCENARIOS: dict[str, Scenario] = {
+    "feed": feed_scroll,
+    "watch": watch,
+    "views": view_like_burst,
+    "progress": progress,
+    "recommendations": recommendations,
+    "courses": courses,
+    "browse": browse,
+    "login": login,
+}
+
+# Relative weights of the default mixed workload.
+DEFAULT_MIX = {
+    "feed": 30,
+    "watch": 20,
+    "views": 15,
+    "progress": 15,
+    "recommendations": 8,
+    "courses": 5,
+    "browse": 4,
+    "login": 3,
+}
+
+
+def parse_mix(raw: str | None) -> dict[str, float]:
+    # "feed=5,login=1" overrides the matching defaults; "only:feed,views"
+    # runs just those scenarios with equal weight.
+    if not raw:
+        return dict(DEFAULT_MIX)
+    if raw.startswith("only:"):
+        names = [name.strip() for name in raw[5:].split(",") if name.strip()]
+        mix = {name: 1.0 for name in names}
+    else:
+        mix = dict(DEFAULT_MIX)
+        for part in raw.split(","):
+            name, _, weight = part.partition("=")
+            mix[name.strip()] = float(weight)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise ValueError("The workload mix is empty")
+    return mix
@@ -0,0 +1,117 @@
+"""Throughput of a cheap route while a login storm is in progress.
+
+Compares the process-pool bcrypt path (/auth/login) with the old behaviour of
+verifying inline in a sync handler (/legacy-login), measuring how many
+requests/sec a non-auth route still serves meanwhile.
+
+    python -m benchmarks.login_storm --logins 64 --duration 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from benchmarks.fixtures import use_scratch_database
+
+use_scratch_database()
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.security import hash_password, shutdown_password_pool, verify_password
+from app.db import models
+from app.db.deps import get_db
+from app.db.session import SessionLocal, engine
+from app.routers import auth
+from app.schemas import user as user_schema
+
+PASSWORD = "benchmark-password"
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    @app.get("/")
+    def health_check():
+        return {"status": "ok"}
+
+    @app.post("/legacy-login")
+    def legacy_login(payload: user_schema.UserLogin, db: Session = Depends(get_db)):
+        user = db.query(models.User).filter(models.User.email == payload.email).first()
+        if not user or not verify_password(payload.password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        return {"ok": True}
+
+    return app
+
+
+def seed_user() -> str:
+    models.User.__table__.create(bind=engine, checkfirst=True)
+    email = f"{uuid.uuid4().hex[:12]}@bench.example.com"
+    db = SessionLocal()
+    try:
+        db.add(models.User(name="bench", email=email, password_hash=hash_password(PASSWORD), role="learner"))
+        db.commit()
+    finally:
+        db.close()
+    return email
+
+
+async def measure(client: httpx.AsyncClient, login_path: str | None, email: str, logins: int, duration: float) -> dict:
+    stop = time.perf_counter() + duration
+    statuses: dict[int, int] = {}
+
+    async def storm():
+        while time.perf_counter() < stop:
+            response = await client.post(login_path, json={"email": email, "password": PASSWORD})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def probe() -> list[float]:
+        latencies = []
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            await client.get("/")
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    tasks = [storm() for _ in range(logins)] if login_path else []
+    results = await asyncio.gather(probe(), *tasks)
+    latencies = sorted(results[0])
+    return {
+        "login_path": login_path,
+        "concurrent_logins": logins if login_path else 0,
+        "health_rps": round(len(latencies) / duration, 1),
+        "health_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else None,
+        "login_statuses": statuses,
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    email = seed_user()
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        return [
+            await measure(client, None, email, 0, args.duration),
+            await measure(client, "/legacy-login", email, args.logins, args.duration),
+            await measure(client, "/auth/login", email, args.logins, args.duration),
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    try:
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+    finally:
+        shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Seek-heavy playback: StaticFiles mount vs. the range-aware stream endpoint.
+
+Simulates a player that seeks N times through a reel and reads a window after
+each seek. Against the static mount every seek refetches the file from the
+start; the stream endpoint answers each seek with a 206 for just the window.
+
+    python -m benchmarks.media --size-mb 50 --seeks 20 --window-kb 512
+    python -m benchmarks.media --base-url http://localhost:8000   # live server
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+
+from app.routers import videos
+from app.services.storage import STORAGE_ROOT, store_stream
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.mount("/static/videos", StaticFiles(directory=STORAGE_ROOT), name="videos")
+    app.include_router(videos.router)
+    return app
+
+
+def seed_file(size: int) -> str:
+    payload = random.Random(size).randbytes(size)
+    return store_stream(io.BytesIO(payload), ".mp4", max_bytes=size).filename
+
+
+async def playback(client: httpx.AsyncClient, url: str, size: int, seeks: int, window: int, use_ranges: bool) -> dict:
+    rng = random.Random(1)
+    transferred = 0
+    ttfb: list[float] = []
+    started = time.perf_counter()
+    for _ in range(seeks):
+        offset = rng.randrange(0, max(size - window, 1))
+        headers = {"Range": f"bytes={offset}-{offset + window - 1}"} if use_ranges else {}
+        request_started = time.perf_counter()
+        async with client.stream("GET", url, headers=headers) as response:
+            first = True
+            async for chunk in response.aiter_bytes():
+                if first:
+                    ttfb.append(time.perf_counter() - request_started)
+                    first = False
+                transferred += len(chunk)
+    elapsed = time.perf_counter() - started
+    ttfb.sort()
+    return {
+        "url": url,
+        "seeks": seeks,
+        "bytes_transferred": transferred,
+        "seconds": round(elapsed, 3),
+        "ttfb_p50_ms": round(ttfb[len(ttfb) // 2] * 1000, 2) if ttfb else None,
+        "ttfb_max_ms": round(ttfb[-1] * 1000, 2) if ttfb else None,
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    size = args.size_mb * 1024 * 1024
+    filename = seed_file(size)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app()), base_url="http://bench")
+    window = args.window_kb * 1024
+    try:
+        async with client:
+            return [
+                await playback(client, f"/static/videos/{filename}", size, args.seeks, window, use_ranges=False),
+                await playback(client, f"/videos/stream/{filename}", size, args.seeks, window, use_ranges=True),
+            ]
+    finally:
+        os.unlink(os.path.join(STORAGE_ROOT, filename))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--seeks", type=int, default=20)
+    parser.add_argument("--window-kb", type=int, default=512)
+    parser.add_argument("--base-url", default=None, help="benchmark a running server instead of in-process")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Request overhead of MetricsMiddleware and the SQL hooks at different sample rates.
+
+Builds the videos router behind the middleware once per --rates value (plus
+once without it) and times sequential GET /videos/feed requests in process.
+
+    python -m benchmarks.metrics_overhead --requests 2000 --rates 0 0.01 0.1 1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+use_scratch_database()
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.instrumentation import MetricsMiddleware, install_sql_hooks
+from app.db.session import engine
+from app.routers import videos
+
+
+async def measure(rate: float | None, requests: int) -> dict:
+    app = FastAPI()
+    app.include_router(videos.router)
+    if rate is not None:
+        app.add_middleware(MetricsMiddleware, sample_rate=rate)
+    samples = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/videos/feed")
+        for _ in range(requests):
+            started = time.perf_counter()
+            (await client.get("/videos/feed")).raise_for_status()
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "sample_rate": "off" if rate is None else rate,
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    seed_catalog(engine, 100)
+    results = [await measure(None, args.requests)]
+    install_sql_hooks()
+    for rate in args.rates:
+        results.append(await measure(rate, args.requests))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.0, 0.01, 0.1, 1.0])
+    args = parser.parse_args()
+    print(json.dumps({"requests": args.requests, "results": asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
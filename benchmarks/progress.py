@@ -0,0 +1,76 @@
+"""Progress ingestion: per-event /progress/update vs. /progress/batch.
+
+    python -m benchmarks.progress --events 2000 --batch-sizes 10 100 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+use_scratch_database()
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.security import create_access_token
+from app.db.session import engine
+from app.routers import progress
+
+
+def seed(videos: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    catalog = seed_catalog(engine, videos)
+    return catalog.creator_id, catalog.video_ids
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    app = FastAPI()
+    app.include_router(progress.router)
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        # Fresh user per run so every path starts from the same empty table state.
+        user_id, video_ids = seed(args.events)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+        events = [{"user_id": str(user_id), "video_id": str(video_id), "completed": True} for video_id in video_ids]
+        started = time.perf_counter()
+        for event in events:
+            (await client.post("/progress/update", json=event, headers=headers)).raise_for_status()
+        elapsed = time.perf_counter() - started
+        results.append({"path": "/progress/update", "events": len(events), "events_per_sec": round(len(events) / elapsed, 1)})
+
+        for batch_size in args.batch_sizes:
+            user_id, video_ids = seed(args.events)
+            headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+            events = [{"user_id": str(user_id), "video_id": str(video_id), "completed": True} for video_id in video_ids]
+            started = time.perf_counter()
+            for offset in range(0, len(events), batch_size):
+                response = await client.post(
+                    "/progress/batch", json={"events": events[offset : offset + batch_size]}, headers=headers
+                )
+                response.raise_for_status()
+            elapsed = time.perf_counter() - started
+            results.append(
+                {
+                    "path": "/progress/batch",
+                    "batch_size": batch_size,
+                    "events": len(events),
+                    "events_per_sec": round(len(events) / elapsed, 1),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Per-user collaborative-filtering recommendations at progress-table scale.
+
+Seeds a synthetic dataset (seeds.seed_data, --progress rows, about 60% of
+them completed), builds the co-occurrence model from it, then for --users
+random learners times:
+
+  history   loading the user's latest --max-history completions (the
+            bounded, indexed query recommend_videos runs)
+  score     CoOccurrenceModel.recommend over those completions, then the
+            indexed check that drops candidates the user completed earlier
+  record    applying one new completion incrementally
+
+plus the model build time and array sizes. With --budget-ms the script exits
+non-zero when p99 of history + score exceeds the budget.
+
+    python -m benchmarks.recommendations --progress 1000000 --users 500 --budget-ms 25
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.session import create_engine_for
+from app.services.ai import CANDIDATE_FACTOR, completed_among, recent_completions
+from app.services.cooccurrence import CoOccurrenceModel
+from seeds.seed_data import Scale, generate, synthetic_id
+
+
+def percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000, 3)
+
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(samples[-1] * 1000, 3)}
+
+
+def run(url: str, args: argparse.Namespace) -> dict:
+    engine = create_engine_for(url)
+    scale = Scale(users=args.learners, creators=50, videos=args.videos, courses=10, progress=args.progress, tags=100)
+    started = time.perf_counter()
+    generate(engine, scale, seed=args.seed, log=lambda message: None)
+    seed_seconds = time.perf_counter() - started
+
+    model = CoOccurrenceModel(
+        session_factory=sessionmaker(bind=engine),
+        max_history=args.max_history,
+        max_neighbors=args.max_neighbors,
+        refresh_seconds=0,
+        max_pending=10**9,
+    )
+    with Session(engine) as db:
+        started = time.perf_counter()
+        model.load(db)
+        build_seconds = time.perf_counter() - started
+    snapshot = model._snapshot
+    array_bytes = sum(array.nbytes for array in (snapshot.indptr, snapshot.neighbors, snapshot.counts, snapshot.completions))
+
+    rng = random.Random(args.seed)
+    history_times, score_times, total_times, record_times, returned = [], [], [], [], []
+    with Session(engine) as db:
+        for _ in range(args.users):
+            user_id = synthetic_id(args.seed, "learner", rng.randrange(args.learners))
+            started = time.perf_counter()
+            history = recent_completions(db, user_id, args.max_history)
+            loaded = time.perf_counter()
+            candidates = model.recommend(history, history, args.limit * CANDIDATE_FACTOR)
+            done = completed_among(db, user_id, candidates)
+            top = [video_id for video_id in candidates if video_id not in done][: args.limit]
+            finished = time.perf_counter()
+            history_times.append(loaded - started)
+            score_times.append(finished - loaded)
+            total_times.append(finished - started)
+            returned.append(len(top))
+
+            video_id = synthetic_id(args.seed, "video", rng.randrange(args.videos))
+            started = time.perf_counter()
+            model.record(user_id, [video_id])
+            record_times.append(time.perf_counter() - started)
+
+    return {
+        "seed_seconds": round(seed_seconds, 1),
+        "model": {
+            "build_seconds": round(build_seconds, 2),
+            "videos": len(snapshot.video_ids),
+            "users": len(snapshot.histories),
+            "pairs": int(len(snapshot.neighbors)),
+            "array_mb": round(array_bytes / 2**20, 1),
+        },
+        "history": percentiles(history_times),
+        "score": percentiles(score_times),
+        "history_plus_score": percentiles(total_times),
+        "record": percentiles(record_times),
+        "mean_returned": round(sum(returned) / len(returned), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL; defaults to a fresh temporary SQLite file")
+    parser.add_argument("--progress", type=int, default=1_000_000)
+    parser.add_argument("--learners", type=int, default=50_000)
+    parser.add_argument("--videos", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=500, help="recommendation requests to time")
+    parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--max-history", type=int, default=50)
+    parser.add_argument("--max-neighbors", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    if args.url:
+        result = run(args.url, args)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            result = run(f"sqlite:///{os.path.join(directory, 'bench.db')}", args)
+    print(json.dumps({"progress_rows": args.progress, "limit": args.limit, **result}, indent=2))
+    if args.budget_ms is not None and result["history_plus_score"]["p99_ms"] > args.budget_ms:
+        sys.exit(f"p99 {result['history_plus_score']['p99_ms']} ms exceeds the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
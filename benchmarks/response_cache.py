@@ -0,0 +1,92 @@
+"""Hot read endpoints with and without the response cache.
+
+Seeds a creator with one course of --videos videos, then times GET
+/videos/{id}, /courses/{id}?expand=videos and /courses/user/{id} three ways:
+with the cache cleared before every request, warm, and warm with
+If-None-Match (answered with 304). Counts SQL statements per request; a
+warm request still runs one, the check against the shared invalidation log.
+
+    python -m benchmarks.response_cache --videos 20 --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.fixtures import seed_catalog, use_scratch_database
+
+use_scratch_database()
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.routers import courses, videos
+from app.services.response_cache import response_cache
+
+
+async def measure(client: httpx.AsyncClient, path: str, mode: str, repeat: int, statements: list[int]) -> dict:
+    etag = (await client.get(path)).raise_for_status().headers["etag"]
+    headers = {"If-None-Match": etag} if mode == "not_modified" else {}
+    samples = []
+    statements[0] = 0
+    for _ in range(repeat):
+        if mode == "cold":
+            response_cache.clear()
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == (304 if mode == "not_modified" else 200), response.status_code
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "queries_per_request": statements[0] / repeat,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    app = FastAPI()
+    app.include_router(courses.router)
+    app.include_router(videos.router)
+    catalog = seed_catalog(engine, args.videos, course=True)
+    creator_id, course_id, video_id = catalog.creator_id, catalog.course_id, catalog.video_ids[0]
+    paths = {
+        "video": f"/videos/{video_id}",
+        "course_expanded": f"/courses/{course_id}?expand=videos",
+        "creator_courses": f"/courses/user/{creator_id}",
+    }
+
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            return {
+                name: {
+                    mode: await measure(client, path, mode, args.repeat, statements)
+                    for mode in ("cold", "warm", "not_modified")
+                }
+                for name, path in paths.items()
+            }
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps({"videos": args.videos, "repeat": args.repeat, "results": asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
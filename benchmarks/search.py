@@ -0,0 +1,131 @@
+"""Full-text video search vs. a LIKE scan.
+
+Seeds --rows videos with synthetic titles, descriptions and transcripts drawn
+from a Zipf-distributed vocabulary (so some terms are common and most are
+rare), inserting through Core so the index triggers fire, then times a few
+representative queries through search_statement and the equivalent
+``ILIKE '%term%'`` filter. The LIKE baseline is unranked and stops at the
+first --limit matches, so it only looks cheap for common terms; rare terms
+force it through the whole table, which is the case the index exists for.
+
+    python -m benchmarks.search --rows 100000 --repeat 20
+    python -m benchmarks.search --url postgresql+psycopg2://... --rows 1000000 --no-like
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.session import Base, create_engine_for
+from app.services.search import query_terms, search_statement
+
+VOCABULARY = 5000
+
+
+def words(rng: random.Random, weights: list[float], count: int) -> str:
+    return " ".join(f"term{index}" for index in rng.choices(range(VOCABULARY), weights, k=count))
+
+
+def seed(engine, rows: int, chunk: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    creator_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            [{"id": creator_id, "name": "bench", "email": f"{creator_id}@bench.local", "password_hash": "x", "role": "creator"}],
+        )
+    for start in range(0, rows, chunk):
+        with engine.begin() as conn:
+            conn.execute(
+                insert(models.Video),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "creator_id": creator_id,
+                        "title": words(rng, weights, 5),
+                        "description": words(rng, weights, 20),
+                        "transcript": words(rng, weights, 120),
+                        "skill_level": "beginner",
+                        "video_url": "/bench.mp4",
+                        "views": 0,
+                        "likes": 0,
+                    }
+                    for _ in range(start, min(start + chunk, rows))
+                ],
+            )
+
+
+def like_statement(q: str, limit: int):
+    columns = (models.Video.title, models.Video.description, models.Video.transcript)
+    clauses = [or_(*(column.ilike(f"%{term}%") for column in columns)) for term in query_terms(q)]
+    return select(models.Video).where(and_(*clauses)).order_by(models.Video.id).limit(limit)
+
+
+def time_query(db: Session, statement, repeat: int) -> dict:
+    hits = len(db.execute(statement).all())
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(statement).all()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "hits": hits,
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000, 3),
+    }
+
+
+def run(url: str, args: argparse.Namespace) -> dict:
+    engine = create_engine_for(url)
+    started = time.perf_counter()
+    seed(engine, args.rows, args.chunk)
+    seconds = time.perf_counter() - started
+    queries = {
+        "common": "term1",
+        "rare": "term4321",
+        "two_terms": "term3 term40",
+        "prefix": "term12",
+    }
+    results = {}
+    with Session(engine) as db:
+        for name, q in queries.items():
+            results[name] = {"q": q, "fts": time_query(db, search_statement(engine.dialect.name, q, args.limit), args.repeat)}
+            if args.like:
+                results[name]["like"] = time_query(db, like_statement(q, args.limit), args.repeat)
+    engine.dispose()
+    return {"seed_seconds": round(seconds, 1), "queries": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL; defaults to a fresh temporary SQLite file")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-like", dest="like", action="store_false", help="skip the LIKE baseline")
+    args = parser.parse_args()
+
+    if args.url:
+        result = run(args.url, args)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            result = run(f"sqlite:///{os.path.join(directory, 'bench.db')}", args)
+    print(json.dumps({"rows": args.rows, "limit": args.limit, "results": result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
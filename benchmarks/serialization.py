@@ -0,0 +1,156 @@
+"""Response serialization cost per item, FastAPI's default path vs the adapter path.
+
+Loads a small synthetic dataset (seeds.seed_data), builds each route's
+payload from the ORM once, then times only turning it into a JSON body:
+
+  before  FastAPI's serialize_response with the route's response_model
+          (validate, dump to Python objects) plus stdlib JSONResponse
+  after   the precompiled TypeAdapter the route now uses
+          (app.core.serialization.serialize: validate + dump_json)
+
+Sync routes also pay a threadpool hop for the "before" validation in
+production; that is not included here.
+
+    python -m benchmarks.serialization --repeat 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.fixtures import use_scratch_database
+
+use_scratch_database()
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.serialization import serialize
+from app.db import models
+from app.db.session import engine
+from app.routers import courses, progress, videos
+from app.services.courses import course_statement
+from app.services.search import search_page, search_statement
+from app.services.tags import trending_tags_statement
+from app.services.videos import feed_page, feed_statement
+from seeds.seed_data import TOPICS, Scale, generate
+
+
+def response_field(router, path: str):
+    return next(route for route in router.routes if route.path == path).response_field
+
+
+def payloads(db: Session) -> list[tuple[str, object, object, int]]:
+    # (route, response field, adapter, content, item count)
+    feed = feed_page(db.scalars(feed_statement(100, None, None, None)).all(), 100)
+    hits = search_page(db.execute(search_statement(db.get_bind().dialect.name, TOPICS[0], 50, None)).all(), 50)
+    trending = db.scalars(trending_tags_statement(100)).all()
+    video = db.scalars(select(models.Video).limit(1)).first()
+    course_id, video_count = db.execute(
+        select(models.CourseVideo.course_id, func.count())
+        .group_by(models.CourseVideo.course_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).one()
+    course = db.scalars(course_statement(course_id, expand_videos=True)).unique().first()
+    creator_id = db.scalar(
+        select(models.MicroCourse.creator_id).group_by(models.MicroCourse.creator_id).order_by(func.count().desc()).limit(1)
+    )
+    creator_courses = db.scalars(select(models.MicroCourse).where(models.MicroCourse.creator_id == creator_id)).all()
+    user_id = db.scalar(
+        select(models.CourseProgressSummary.user_id)
+        .group_by(models.CourseProgressSummary.user_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+    overview = db.scalars(select(models.CourseProgressSummary).where(models.CourseProgressSummary.user_id == user_id)).all()
+    return [
+        ("GET /videos/feed/page", response_field(videos.router, "/videos/feed/page"), videos.feed_page_adapter, feed, len(feed["items"])),
+        ("GET /videos/search", response_field(videos.router, "/videos/search"), videos.search_page_adapter, hits, len(hits["items"])),
+        ("GET /videos/tags/trending", response_field(videos.router, "/videos/tags/trending"), videos.tag_counts_adapter, trending, len(trending)),
+        ("GET /videos/{id}", response_field(videos.router, "/videos/{video_id}"), videos.video_adapter, video, 1),
+        (
+            "GET /courses/{id}?expand=videos",
+            response_field(courses.router, "/courses/{course_id}"),
+            courses.expanded_course_adapter,
+            course,
+            video_count,
+        ),
+        (
+            "GET /courses/user/{id}",
+            response_field(courses.router, "/courses/user/{creator_id}"),
+            courses.course_list_adapter,
+            creator_courses,
+            len(creator_courses),
+        ),
+        (
+            "GET /progress/user/{id}/courses",
+            response_field(progress.router, "/progress/user/{user_id}/courses"),
+            progress.course_progress_list_adapter,
+            overview,
+            len(overview),
+        ),
+    ]
+
+
+async def fastapi_body(field, content) -> bytes:
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def timed(fn, repeat: int) -> float:
+    await fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    scale = Scale(
+        users=args.users, creators=args.creators, videos=args.videos, courses=args.courses, progress=args.progress, tags=100
+    )
+    generate(engine, scale, seed=args.seed, log=lambda message: None)
+    results = []
+    with Session(engine) as db:
+        for route, field, adapter, content, items in payloads(db):
+            before_body = await fastapi_body(field, content)
+            after_body = serialize(adapter, content)
+            if json.loads(before_body) != json.loads(after_body):
+                raise AssertionError(f"{route}: adapter output differs from FastAPI's")
+
+            async def after():
+                return serialize(adapter, content)
+
+            before = await timed(lambda: fastapi_body(field, content), args.repeat)
+            after_seconds = await timed(after, args.repeat)
+            results.append(
+                {
+                    "route": route,
+                    "items": items,
+                    "before_us_per_item": round(before / max(items, 1) * 1e6, 2),
+                    "after_us_per_item": round(after_seconds / max(items, 1) * 1e6, 2),
+                    "speedup": round(before / after_seconds, 2),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--creators", type=int, default=5)
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--progress", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps({"repeat": args.repeat, "results": asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Content-similarity index: build cost, query latency and upload appends.
+
+Seeds a synthetic catalogue (seeds.seed_data, --videos videos), builds the
+memory-mapped hashed TF-IDF index from it into a temporary directory, then
+times:
+
+  similar   SimilarityIndex.similar for --queries random videos: the
+            block-wise matrix-vector product plus top-k over every row
+  append    SimilarityIndex.add for new videos, i.e. what an upload pays
+            (vectorize, write one row, publish index.json)
+  reopen    a second SimilarityIndex on the same directory mapping the files,
+            as another worker does on its first query
+
+With --budget-ms the script exits non-zero when p99 of similar exceeds it.
+
+    python -m benchmarks.similarity --videos 100000 --queries 300 --budget-ms 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import models
+from app.db.session import create_engine_for
+from app.services.similarity import SimilarityIndex
+from seeds.seed_data import Scale, generate
+
+
+def percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000, 3)
+
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(samples[-1] * 1000, 3)}
+
+
+def run(url: str, directory: str, args: argparse.Namespace) -> dict:
+    engine = create_engine_for(url)
+    scale = Scale(users=100, creators=50, videos=args.videos, courses=10, progress=0, tags=100)
+    started = time.perf_counter()
+    generate(engine, scale, seed=args.seed, log=lambda message: None)
+    seed_seconds = time.perf_counter() - started
+
+    root = os.path.join(directory, "similarity")
+    index = SimilarityIndex(root, args.dimensions, session_factory=sessionmaker(bind=engine))
+    started = time.perf_counter()
+    index.build()
+    build_seconds = time.perf_counter() - started
+    mapping = index.ensure_built()
+
+    rng = random.Random(args.seed)
+    similar_times, returned = [], []
+    with Session(engine) as db:
+        videos = db.scalars(select(models.Video).order_by(models.Video.id).limit(5000)).all()
+        for _ in range(args.queries):
+            video = rng.choice(videos)
+            started = time.perf_counter()
+            hits = index.similar(video, args.limit)
+            similar_times.append(time.perf_counter() - started)
+            returned.append(len(hits))
+
+    append_times = []
+    for i in range(args.appends):
+        started = time.perf_counter()
+        index.add(uuid.uuid4(), f"Synthetic upload {i} about {rng.choice(videos).title}", None, ["benchmark"])
+        append_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    SimilarityIndex(root, args.dimensions).ensure_built()
+    reopen_seconds = time.perf_counter() - started
+
+    return {
+        "seed_seconds": round(seed_seconds, 1),
+        "index": {
+            "build_seconds": round(build_seconds, 2),
+            "videos": mapping.count,
+            "capacity": mapping.capacity,
+            "dimensions": args.dimensions,
+            "matrix_mb": round(mapping.count * args.dimensions * 4 / 2**20, 1),
+        },
+        "similar": percentiles(similar_times),
+        "append": percentiles(append_times),
+        "reopen_ms": round(reopen_seconds * 1000, 1),
+        "mean_returned": round(sum(returned) / len(returned), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL; defaults to a fresh temporary SQLite file")
+    parser.add_argument("--videos", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--appends", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = run(args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}", directory, args)
+    print(json.dumps({"limit": args.limit, **result}, indent=2))
+    if args.budget_ms is not None and result["similar"]["p99_ms"] > args.budget_ms:
+        sys.exit(f"p99 {result['similar']['p99_ms']} ms exceeds the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Worker cold start: import cost of app.main and time to first response.
+
+Each measurement runs in a fresh interpreter:
+
+  import          ``python -X importtime -c "import app.main"``; reports the
+                  cumulative import time of app.main, the heaviest top-level
+                  imports, and whether the openai SDK was pulled in.
+  first response  ``uvicorn app.main:app`` on a free port, timed from spawn
+                  until ``GET /`` answers 200 (lifespan, including schema
+                  setup, runs in between).
+
+Runs against a temporary SQLite database unless --database-url is given.
+The first server start creates the schema, later starts find it in place;
+both are reported. With --max-import-ms / --max-first-response-ms the
+script exits non-zero when the median exceeds the budget, so it can guard
+startup in CI.
+
+    python -m benchmarks.startup --repeat 5 --max-import-ms 1200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    # "import time: self [us] | cumulative | imported package" lines; the
+    # indentation of the name is its nesting depth.
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def measure_import(env: dict, top: int) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    modules = parse_importtime(result.stderr)
+    app_main = next(cumulative for name, _, cumulative, _ in modules if name == "app.main")
+    # Depth 1 = what app.main (and the interpreter) imported directly.
+    direct = sorted((m for m in modules if m[3] <= 1 and m[0] != "app.main"), key=lambda m: m[2], reverse=True)
+    return {
+        "app_main_ms": round(app_main / 1000, 1),
+        "process_ms": round(wall * 1000, 1),
+        "openai_imported": any(name == "openai" for name, *_ in modules),
+        "heaviest": [{"module": name, "cumulative_ms": round(cumulative / 1000, 1)} for name, _, cumulative, _ in direct[:top]],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(env: dict, timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited early: {server.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                pass
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"no response from {url} within {timeout}s")
+            time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(args: argparse.Namespace, database_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    imports = [measure_import(env, args.top) for _ in range(args.repeat)]
+    starts = [measure_first_response(env, args.timeout) for _ in range(args.repeat + 1)]
+    return {
+        "repeat": args.repeat,
+        "import": {
+            "app_main_ms_median": statistics.median(run["app_main_ms"] for run in imports),
+            "process_ms_median": statistics.median(run["process_ms"] for run in imports),
+            "openai_imported": any(run["openai_imported"] for run in imports),
+            "heaviest": imports[-1]["heaviest"],
+        },
+        "first_response": {
+            "schema_created_ms": round(starts[0] * 1000, 1),
+            "median_ms": round(statistics.median(starts[1:]) * 1000, 1),
+            "max_ms": round(max(starts[1:]) * 1000, 1),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="defaults to a fresh temporary SQLite file")
+    parser.add_argument("--top", type=int, default=10, help="heaviest direct imports to list")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-response-ms", type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(args, args.database_url or f"sqlite:///{tmp}/startup.db")
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if args.max_import_ms is not None and report["import"]["app_main_ms_median"] > args.max_import_ms:
+        failures.append(f"import {report['import']['app_main_ms_median']} ms > {args.max_import_ms} ms")
+    if args.max_first_response_ms is not None and report["first_response"]["median_ms"] > args.max_first_response_ms:
+        failures.append(f"first response {report['first_response']['median_ms']} ms > {args.max_first_response_ms} ms")
+    if failures:
+        sys.exit("startup budget exceeded: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
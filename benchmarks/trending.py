@@ -0,0 +1,152 @@
+"""Decayed trending scores: refresh cost and GET /videos/trending query latency.
+
+Seeds a synthetic catalogue (seeds.seed_data, --videos videos), writes
+--days of hourly activity buckets for --active of them, then times:
+
+  initial    the first TrendingScorer.refresh, folding every bucket into the
+             per-window scores
+  refresh    later refreshes after a counter flush that touched --touched
+             videos (record_activity), i.e. what the background task pays
+             each interval
+  trending   the query behind GET /videos/trending: an index range over
+             video_trending_scores plus the epoch lookup
+  all_time   the old approach for comparison: ranking every video by
+             views * 0.001 + likes * 0.01 at request time
+
+    python -m benchmarks.trending --videos 100000 --active 20000 --days 30
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import models
+from app.db.session import create_engine_for
+from app.services.trending import TrendingScorer, bucket_start, epoch_statement, record_activity, trending_statement
+from seeds.seed_data import Scale, generate
+
+BUCKET_SECONDS = 3600
+
+
+def percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000, 3)
+
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(samples[-1] * 1000, 3)}
+
+
+def timed(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def seed_buckets(engine, video_ids: list, args: argparse.Namespace, now: datetime) -> int:
+    rng = random.Random(args.seed)
+    rows = []
+    for video_id in rng.sample(video_ids, min(args.active, len(video_ids))):
+        for hours in rng.sample(range(args.days * 24), min(args.buckets_per_video, args.days * 24)):
+            views = rng.randint(1, 500)
+            rows.append(
+                {
+                    "video_id": video_id,
+                    "bucket_start": bucket_start(now - timedelta(hours=hours), BUCKET_SECONDS),
+                    "views": views,
+                    "likes": rng.randint(0, views // 10),
+                    "scored_views": 0,
+                    "scored_likes": 0,
+                }
+            )
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 50_000):
+            conn.execute(insert(models.VideoActivityBucket), rows[start : start + 50_000])
+    return len(rows)
+
+
+def run(url: str, args: argparse.Namespace) -> dict:
+    engine = create_engine_for(url)
+    scale = Scale(users=100, creators=50, videos=args.videos, courses=10, progress=0, tags=100)
+    generate(engine, scale, seed=args.seed, log=lambda message: None)
+    factory = sessionmaker(bind=engine)
+    with Session(engine) as db:
+        video_ids = db.scalars(select(models.Video.id)).all()
+
+    now = datetime.utcnow()
+    buckets = seed_buckets(engine, video_ids, args, now)
+    scorer = TrendingScorer(session_factory=factory, refresh_seconds=60, bucket_seconds=BUCKET_SECONDS)
+    started = time.perf_counter()
+    scorer.refresh(now=now, force=True)
+    initial_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    refresh_times = []
+    for step in range(args.refreshes):
+        with factory() as db:
+            deltas = {video_id: [rng.randint(1, 20), rng.randint(0, 2)] for video_id in rng.sample(video_ids, args.touched)}
+            record_activity(db, deltas, now)
+            db.commit()
+        started = time.perf_counter()
+        scorer.refresh(now=now + timedelta(seconds=step + 1), force=True)
+        refresh_times.append(time.perf_counter() - started)
+
+    with Session(engine) as db:
+        trending = timed(
+            lambda: (db.execute(trending_statement("day", args.limit)).all(), db.scalar(epoch_statement())), args.queries
+        )
+        all_time = timed(
+            lambda: db.scalars(
+                select(models.Video)
+                .order_by((models.Video.views * 0.001 + models.Video.likes * 0.01).desc())
+                .limit(args.limit)
+            ).all(),
+            args.queries,
+        )
+        score_rows = db.query(models.VideoTrendingScore).count()
+
+    return {
+        "buckets": buckets,
+        "score_rows": score_rows,
+        "initial_refresh_seconds": round(initial_seconds, 2),
+        "refresh": percentiles(refresh_times),
+        "trending": percentiles(trending),
+        "all_time": percentiles(all_time),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL; defaults to a fresh temporary SQLite file")
+    parser.add_argument("--videos", type=int, default=100_000)
+    parser.add_argument("--active", type=int, default=20_000, help="videos with activity buckets")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--buckets-per-video", type=int, default=24)
+    parser.add_argument("--touched", type=int, default=500, help="videos per simulated counter flush")
+    parser.add_argument("--refreshes", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.url:
+        result = run(args.url, args)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            result = run(f"sqlite:///{os.path.join(directory, 'bench.db')}", args)
+    print(json.dumps({"videos": args.videos, "active": args.active, **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
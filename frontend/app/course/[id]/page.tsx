@@ -37,18 +37,9 @@ export default function CoursePage() {
     const load = async () => {
       setLoading(true);
       try {
-        const c = await apiFetch<Course>(`/courses/${courseId}`);
+        const c = await apiFetch<Course & { videos: Video[] }>(`/courses/${courseId}?expand=videos`);
         setCourse(c);
-        const videoDetails: Video[] = [];
-        for (const id of c.video_ids) {
-          try {
-            const v = await apiFetch<Video>(`/videos/${id}`);
-            videoDetails.push(v);
-          } catch {
-            // ignore
-          }
-        }
-        setVideos(videoDetails);
+        setVideos(c.videos);
         if (token && userId) {
           try {
             const p = await apiFetch<{ completed: number; total: number }>(
@@ -99,7 +99,7 @@ export default function FeedPage() {
             }
             fromBackend = fetched;
           } else {
-            fromBackend = await apiFetch<Video[]>("/videos/feed");
+            fromBackend = (await apiFetch<{ items: Video[] }>("/videos/feed/page")).items;
           }
         } catch {
           fromBackend = null;
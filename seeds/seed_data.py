@@ -1,10 +1,39 @@
+"""Seed the database.
+
+    python -m seeds.seed_data                      # two demo accounts and videos
+    python -m seeds.seed_data synthetic --scale 200 --seed 7
+
+``synthetic`` generates a deterministic dataset (the same --seed and sizes
+always produce the same ids, emails, tags and rows) sized by --scale, with
+each table overridable. At --scale 1 that is 1,000 learners, 50 creators,
+5,000 videos, 200 courses, 20,000 progress events and 300 tags; tags are
+assigned with a Zipf skew (--tag-skew) and video popularity is skewed too.
+Rows are streamed from generators and written in --chunk sized batches with
+Core executemany, or COPY on PostgreSQL/psycopg2, so memory stays flat.
+Every synthetic account shares one precomputed bcrypt hash of --password.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import itertools
+import random
+import time
 import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
 
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from app.core.security import hash_password
 from app.db import models
-from app.db.session import SessionLocal
+from app.db.session import Base, SessionLocal, engine as default_engine
+from app.services.progress import refresh_course_summaries
+from app.services.tags import set_video_tags
 
 
 SEED_VIDEOS = [
@@ -48,21 +77,26 @@ def run():
 
         videos: list[models.Video] = []
         for data in SEED_VIDEOS:
+            data = dict(data)
+            tags = data.pop("tags")
             video = models.Video(
                 creator_id=creator.id,
                 views=10,
                 likes=5,
                 **data,
             )
+            db.add(video)
+            set_video_tags(db, video, tags)
             videos.append(video)
-        db.add_all(videos)
         db.commit()
 
         course = models.MicroCourse(
             creator_id=creator.id,
             title="ML Crash Course",
             description="Micro-course of two videos",
-            video_ids=[str(video.id) for video in videos],
+            course_videos=[
+                models.CourseVideo(video_id=video.id, position=position) for position, video in enumerate(videos)
+            ],
             learners_enrolled=5,
         )
         db.add(course)
@@ -72,5 +106,256 @@ def run():
         db.close()
 
 
+SKILL_LEVELS = ("beginner", "intermediate", "advanced")
+TOPICS = ("python", "sql", "ml", "design", "cloud", "security", "data", "web", "mobile", "devops")
+# Synthetic timestamps count back from a fixed point so reruns match.
+EPOCH = datetime(2025, 1, 1)
+HISTORY_SECONDS = 365 * 24 * 3600
+NAMESPACE = uuid.UUID("6f1c2f4e-5d0b-4c1e-9a3e-6b7f2d8c1a90")
+
+
+@dataclass
+class Scale:
+    users: int = 1_000
+    creators: int = 50
+    videos: int = 5_000
+    courses: int = 200
+    progress: int = 20_000
+    tags: int = 300
+    tag_skew: float = 1.1
+
+    def scaled(self, factor: float) -> "Scale":
+        sizes = {f.name: max(int(getattr(self, f.name) * factor), 1) for f in fields(self) if f.name != "tag_skew"}
+        return Scale(**sizes, tag_skew=self.tag_skew)
+
+
+def synthetic_id(seed: int, kind: str, index: int) -> uuid.UUID:
+    # Ids are a pure function of (seed, kind, index), so generators never need
+    # to keep earlier ids around to reference them.
+    return uuid.uuid5(NAMESPACE, f"{seed}:{kind}:{index}")
+
+
+def synthetic_email(seed: int, kind: str, index: int) -> str:
+    return f"{kind}{index}@seed{seed}.example.com"
+
+
+def tag_name(seed: int, index: int) -> str:
+    return f"{TOPICS[index % len(TOPICS)]}-{seed}-{index}"
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    return EPOCH - timedelta(seconds=rng.randrange(HISTORY_SECONDS))
+
+
+def _skewed_index(rng: random.Random, count: int) -> int:
+    # Roughly power-law popularity in O(1): low indexes are picked far more often.
+    return min(int(count * rng.random() ** 3), count - 1)
+
+
+def user_rows(seed: int, scale: Scale, password_hash: str) -> Iterator[dict]:
+    rng = random.Random(f"{seed}:users")
+    for kind, role, count in (("creator", "creator", scale.creators), ("learner", "learner", scale.users)):
+        for index in range(count):
+            created_at = _timestamp(rng)
+            yield {
+                "id": synthetic_id(seed, kind, index),
+                "name": f"{kind.title()} {index}",
+                "email": synthetic_email(seed, kind, index),
+                "password_hash": password_hash,
+                "role": role,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+
+def tag_rows(seed: int, scale: Scale) -> Iterator[dict]:
+    for index in range(scale.tags):
+        yield {"id": synthetic_id(seed, "tag", index), "name": tag_name(seed, index), "video_count": 0}
+
+
+def video_rows(seed: int, scale: Scale) -> Iterator[dict]:
+    rng = random.Random(f"{seed}:videos")
+    for index in range(scale.videos):
+        created_at = _timestamp(rng)
+        topic = TOPICS[index % len(TOPICS)]
+        views = int(rng.paretovariate(1.2) * 20)
+        yield {
+            "id": synthetic_id(seed, "video", index),
+            "creator_id": synthetic_id(seed, "creator", rng.randrange(scale.creators)),
+            "title": f"{topic.title()} in 60 seconds #{index}",
+            "description": f"A bite-sized {topic} lesson, part {index % 12 + 1}",
+            "skill_level": rng.choice(SKILL_LEVELS),
+            "video_url": f"/videos/stream/synthetic-{index}.mp4",
+            "views": views,
+            "likes": int(views * rng.random() * 0.1),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def video_tag_rows(seed: int, scale: Scale, counts: list[int]) -> Iterator[dict]:
+    # Tallies each tag's usage into `counts` as rows are produced.
+    rng = random.Random(f"{seed}:video-tags")
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** scale.tag_skew for rank in range(scale.tags)))
+    for index in range(scale.videos):
+        video_id = synthetic_id(seed, "video", index)
+        picks = rng.choices(range(scale.tags), cum_weights=cum_weights, k=rng.randint(1, 5))
+        for position, tag_index in enumerate(dict.fromkeys(picks)):
+            counts[tag_index] += 1
+            yield {"video_id": video_id, "tag_id": synthetic_id(seed, "tag", tag_index), "position": position}
+
+
+def course_rows(seed: int, scale: Scale) -> Iterator[dict]:
+    rng = random.Random(f"{seed}:courses")
+    for index in range(scale.courses):
+        created_at = _timestamp(rng)
+        yield {
+            "id": synthetic_id(seed, "course", index),
+            "creator_id": synthetic_id(seed, "creator", rng.randrange(scale.creators)),
+            "title": f"{TOPICS[index % len(TOPICS)].title()} crash course #{index}",
+            "description": "Synthetic micro-course",
+            "learners_enrolled": rng.randrange(scale.users + 1),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def course_video_rows(seed: int, scale: Scale) -> Iterator[dict]:
+    rng = random.Random(f"{seed}:course-videos")
+    for index in range(scale.courses):
+        course_id = synthetic_id(seed, "course", index)
+        size = min(rng.randint(3, 15), scale.videos)
+        for position, video_index in enumerate(rng.sample(range(scale.videos), size)):
+            yield {"course_id": course_id, "video_id": synthetic_id(seed, "video", video_index), "position": position}
+
+
+def progress_rows(seed: int, scale: Scale) -> Iterator[dict]:
+    # Events are spread evenly over learners; each learner touches distinct
+    # videos (progress is unique per user and video), favouring popular ones.
+    rng = random.Random(f"{seed}:progress")
+    per_user, extra = divmod(scale.progress, scale.users)
+    for user_index in range(scale.users):
+        wanted = min(per_user + (user_index < extra), scale.videos)
+        if wanted * 2 > scale.videos:
+            picks = rng.sample(range(scale.videos), wanted)
+        else:
+            seen: dict[int, None] = {}
+            while len(seen) < wanted:
+                seen[_skewed_index(rng, scale.videos)] = None
+            picks = list(seen)
+        user_id = synthetic_id(seed, "learner", user_index)
+        for video_index in picks:
+            yield {
+                "id": synthetic_id(seed, f"progress:{user_index}", video_index),
+                "user_id": user_id,
+                "course_id": None,
+                "video_id": synthetic_id(seed, "video", video_index),
+                "completed": rng.random() < 0.6,
+                "updated_at": _timestamp(rng),
+            }
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _executemany(conn, table, batch: list[dict]) -> None:
+    conn.execute(insert(table), batch)
+
+
+def _copy(conn, table, batch: list[dict]) -> None:
+    # CSV COPY: None becomes an unquoted empty field, which COPY reads as NULL.
+    columns = list(batch[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def load(engine: Engine, table, rows: Iterable[dict], chunk: int) -> int:
+    write = _copy if engine.dialect.name == "postgresql" and engine.driver == "psycopg2" else _executemany
+    loaded = 0
+    for batch in _chunks(rows, chunk):
+        with engine.begin() as conn:
+            write(conn, table, batch)
+        loaded += len(batch)
+    return loaded
+
+
+def generate(engine: Engine, scale: Scale, seed: int = 0, chunk: int = 10_000, password: str = "password123", log=print) -> dict:
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(models.User.id).where(models.User.id == synthetic_id(seed, "creator", 0))).first():
+            raise RuntimeError(f"Synthetic data for seed {seed} is already loaded; use another --seed or a fresh database")
+
+    password_hash = hash_password(password)
+    counts = [0] * scale.tags
+    steps = [
+        (models.User, user_rows(seed, scale, password_hash)),
+        (models.Tag, tag_rows(seed, scale)),
+        (models.Video, video_rows(seed, scale)),
+        (models.VideoTag, video_tag_rows(seed, scale, counts)),
+        (models.MicroCourse, course_rows(seed, scale)),
+        (models.CourseVideo, course_video_rows(seed, scale)),
+        (models.Progress, progress_rows(seed, scale)),
+    ]
+    loaded = {}
+    for model, rows in steps:
+        started = time.perf_counter()
+        table = model.__table__
+        loaded[table.name] = load(engine, table, rows, chunk)
+        log(f"{table.name}: {loaded[table.name]} rows in {time.perf_counter() - started:.1f}s")
+
+    table = models.Tag.__table__
+    statement = update(table).where(table.c.id == bindparam("tag_id")).values(video_count=bindparam("count"))
+    params = ({"tag_id": synthetic_id(seed, "tag", index), "count": count} for index, count in enumerate(counts) if count)
+    for batch in _chunks(params, chunk):
+        with engine.begin() as conn:
+            conn.execute(statement, batch)
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        refresh_course_summaries(db)
+        db.commit()
+    log(f"course_progress_summaries refreshed in {time.perf_counter() - started:.1f}s")
+    return loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", nargs="?", choices=["demo", "synthetic"], default="demo")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for every table size below")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=10_000, help="rows per INSERT/COPY batch")
+    parser.add_argument("--password", default="password123", help="password of every synthetic account")
+    for name in ("users", "creators", "videos", "courses", "progress", "tags"):
+        parser.add_argument(f"--{name}", type=int, help=f"number of {name} (overrides --scale)")
+    parser.add_argument("--tag-skew", type=float, default=Scale.tag_skew, help="Zipf exponent of tag popularity")
+    args = parser.parse_args()
+
+    if args.mode == "demo":
+        run()
+        return
+    overrides = {name: getattr(args, name) for name in ("users", "creators", "videos", "courses", "progress", "tags")}
+    scale = Scale(tag_skew=args.tag_skew).scaled(args.scale)
+    scale = Scale(**{**vars(scale), **{name: value for name, value in overrides.items() if value is not None}})
+    if min(scale.users, scale.creators, scale.videos, scale.tags) < 1:
+        parser.error("--users, --creators, --videos and --tags must be at least 1")
+    started = time.perf_counter()
+    try:
+        loaded = generate(default_engine, scale, seed=args.seed, chunk=args.chunk, password=args.password)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+    print(f"Loaded {sum(loaded.values())} rows in {time.perf_counter() - started:.1f}s.")
+
+
 if __name__ == "__main__":
-    run()
+    main()